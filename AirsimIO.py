@@ -14,27 +14,96 @@
 
 
 # ===== Import libraries =====
-import airsim
 import numpy as np
-import cv2
 import logFunctions as log
 import time
-from datetime import datetime
+import os
+import math
+import threading
+from LazyImport import LazyModule
+import CameraFrames
+import PointCloud
+
+# Heavy module, imported on first use (see LazyImport.py)
+airsim = LazyModule("airsim")
+
+# airsim.LandedState values, compared without importing airsim (FakeAirsim uses the same)
+landed_state_landed = 0
+landed_state_flying = 1
+
+# Optional CameraFrames.FramePool. None: camera values are read-only views into the RPC responses;
+# a pool: frames are copied into reused, writable buffers
+camera_frame_pool = None
+
+# Lidar point processing (see PointCloud.py). voxel size None: no downsampling; max range None: no crop
+lidar_voxel_size = None # m
+lidar_min_range = 0.0   # m
+lidar_max_range = None  # m
 
 
 # ========== AirSim Client Handling ==========
 # Initialises and returns an AirSim client
-def initClient():
-    client = airsim.MultirotorClient()
+# fake: use the in-process FakeAirsim client instead of Unreal/AirSim (headless runs, CI).
+#       None: read environment variable MRS_FAKE_AIRSIM (1: fake), MRS_FAKE_AIRSIM_SPEED sets its speed multiplier
+def initClient(fake=None, speed=None):
+    if fake is None:
+        fake = os.environ.get("MRS_FAKE_AIRSIM", "0") not in ("", "0")
+    if fake:
+        import FakeAirsim
+        if speed is None:
+            speed = float(os.environ.get("MRS_FAKE_AIRSIM_SPEED", "1"))
+        client = FakeAirsim.FakeMultirotorClient(speed=speed)
+    else:
+        client = airsim.MultirotorClient()
     client.confirmConnection()
     log.logReport("INFO", "AirSim client is created")
     return client
 
 
+# Module to build requests (Vector3r, ImageRequest, ...) for client with:
+# FakeAirsim for a fake client (also through LazyClient/ProfiledClient), airsim otherwise
+def apiTypes(client):
+    return getattr(client, "api_types", None) or airsim
+
+
+# True for the in-process FakeAirsim client (also through LazyClient/ProfiledClient)
+def isFakeClient(client):
+    return getattr(client, "api_types", None) is not None
+
+
+# Client that connects on first use
+# Any attribute access (RPC call) creates the real client with factory(**kwargs), default initClient,
+# so importing a module that holds a LazyClient never contacts the simulator.
+# Usage Example
+# client = LazyClient()                  # nothing happens yet
+# client.simGetVehiclePose("UAV_1")      # connects, then calls
+class LazyClient:
+
+    def __init__(self, factory=None, **kwargs):
+        self._factory = factory if factory is not None else initClient
+        self._kwargs = kwargs
+        self._client = None
+        self._lock = threading.Lock()
+
+    # The real client, created on the first call
+    def getClient(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory(**self._kwargs)
+        return self._client
+
+    def isCreated(self):
+        return self._client is not None
+
+    def __getattr__(self, name):
+        return getattr(self.getClient(), name)
+
+
 # Arms and enables API control of uav
 def armEnableUAV(client, uav):
-    client.enableApiControl(True, uav.getName())
-    client.armDisarm(True, uav.getName())
+    client.enableApiControl(True, vehicle_name=uav.getName())
+    client.armDisarm(True, vehicle_name=uav.getName())
     # print(uav.getName() + " is armed")
     # log.logReport("INFO", uav.getName() + " is armed")
 
@@ -51,7 +120,7 @@ def armEnableAllUAVs(client, uavs):
 # Disarms, resets and disables API control of uav
 def disarmResetDisableAllUAVs(client, uavs):
     for uav in uavs:
-        client.armDisarm(False, uav.getName())
+        client.armDisarm(False, vehicle_name=uav.getName())
     log.logReport("INFO", "All UAVs are disarmed")
     resetClient(client)
 
@@ -68,7 +137,7 @@ def resetClient(client):
 def takeoffUAV(client, uav):
     command = client.takeoffAsync(vehicle_name=uav.getName())
     uav.setCurrentCommand("takeoff")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -76,7 +145,7 @@ def takeoffUAV(client, uav):
 def hoverUAV(client, uav):
     command = client.hoverAsync(vehicle_name=uav.getName())
     uav.setCurrentCommand("hover")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -84,7 +153,7 @@ def hoverUAV(client, uav):
 def landUAV(client, uav):
     command = client.landAsync(timeout_sec=600, vehicle_name=uav.getName())
     uav.setCurrentCommand("land")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -92,7 +161,7 @@ def landUAV(client, uav):
 def goHomeUAV(client, uav):
     command = client.goHomeAsync(timeout_sec=3e+38, vehicle_name=uav.getName())
     uav.setCurrentCommand("goHome")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -100,7 +169,7 @@ def goHomeUAV(client, uav):
 def rotateUAVto(client,uav,yaw):
     command = client.rotateToYawAsync(yaw, vehicle_name=uav.getName())
     uav.setCurrentCommand("rotateToYaw")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -110,7 +179,31 @@ def moveUAVto(client, uav, point, vel):
     point_bodyframe = [point[i]-uav.getInitPose()[i] for i in range(3)]
     command = client.moveToPositionAsync(point_bodyframe[0], point_bodyframe[1], point_bodyframe[2], vel, vehicle_name=uav.getName())
     uav.setCurrentCommand("moveToPosition")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
+    return command
+
+
+# Moves the uav to its waypoint 'index' at a specified velocity
+# Same as moveUAVto, with the Body frame target taken from the UAV's leg table
+def moveUAVtoWaypoint(client, uav, index, vel):
+    target = uav.getLegTable().body_target[index]
+    command = client.moveToPositionAsync(float(target[0]), float(target[1]), float(target[2]), vel, vehicle_name=uav.getName())
+    uav.setCurrentCommand("moveToPosition")
+    uav.setCurrentCommandStartTime(simTime(client))
+    return command
+
+
+# Flies the uav through its waypoints start_index ... end_index (included) without stopping, facing the
+# direction of travel. lookahead: m, distance ahead on the path that the UAV steers to (-1: AirSim default)
+def moveUAVonPath(client, uav, start_index, end_index, vel, lookahead=-1):
+    targets = uav.getLegTable().body_target[start_index:end_index+1]
+    types = apiTypes(client)
+    path = [types.Vector3r(float(p[0]), float(p[1]), float(p[2])) for p in targets]
+    command = client.moveOnPathAsync(path, vel, drivetrain=types.DrivetrainType.ForwardOnly,
+                                     yaw_mode=types.YawMode(False, 0), lookahead=lookahead,
+                                     vehicle_name=uav.getName())
+    uav.setCurrentCommand("moveOnPath")
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -119,7 +212,7 @@ def moveUAVtoZ(client, uav, z, vel):
     # World NED
     command = client.moveToZAsync(z, vel, vehicle_name=uav.getName())
     uav.setCurrentCommand("moveToZ")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
@@ -128,85 +221,164 @@ def moveUAVbyVelZ(client, uav, vx, vy, z, duration):
     # Body NED
     command = client.moveByVelocityZBodyFrameAsync(vx, vy, z, duration, vehicle_name=uav.getName())
     uav.setCurrentCommand("moveByVelZ")
-    uav.setCurrentCommandStartTime(datetime.now())
+    uav.setCurrentCommandStartTime(simTime(client))
     return command
 
 
 
 # ==== Commands to All UAVs ====
-def takeoffAllUAVs(client, uavs):
+# Every fleet command is issued to all UAVs at once and returns a FleetCommand (aggregate future).
+# wait=True blocks until every UAV has completed the command, or until timeout (s).
+
+# Aggregate future of one command sent to several UAVs.
+# A UAV is done when its own future reports completion (clients whose futures expose done(), e.g. FakeAirsim)
+# or when its state condition(client, uav) is met. AirSim futures only progress inside join(),
+# which blocks other threads, so with AirSim the state condition is what resolves the command.
+class FleetCommand:
+    def __init__(self, client, uavs, futures, condition=None, name="command"):
+        self.client = client
+        self.name = name
+        self.condition = condition
+        self.pending = dict(zip([uav.getName() for uav in uavs], zip(uavs, futures)))
+
+    # Non-blocking check. Removes the UAVs that have completed and returns True when none is left
+    def done(self):
+        for uav_name, (uav, future) in list(self.pending.items()):
+            future_done = getattr(future, "done", None)
+            if (future_done is not None and future_done()) or (self.condition is not None and self.condition(self.client, uav)):
+                del self.pending[uav_name]
+        return not self.pending
+
+    # Waits until all UAVs are done or timeout (s, None: no limit) has passed. Returns True if all are done
+    def join(self, timeout=None, poll_interval=0.1):
+        start_time = simTime(self.client)
+        while not self.done():
+            if timeout is not None and simTime(self.client)-start_time >= timeout:
+                return False
+            simSleep(self.client, poll_interval)
+        return True
+
+    # Names of the UAVs that have not completed yet
+    def getPendingUAVs(self):
+        return list(self.pending)
+
+
+# Simulation time (s). FakeAirsim clients carry their own clock, AirSim runs in real time
+def simTime(client):
+    clock = getattr(client, "clock", None)
+    return clock.now() if clock is not None else time.monotonic()
+
+
+def simSleep(client, seconds):
+    clock = getattr(client, "clock", None)
+    if clock is not None:
+        clock.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+# ===== Completion conditions =====
+# Taken off: flying and above min_alt (m) in its own frame
+def isTakenOff(client, uav, min_alt=1.0):
+    state = client.getMultirotorState(vehicle_name=uav.getName())
+    return state.landed_state == landed_state_flying and -getUAVpos(client, uav)[2] >= min_alt
+
+
+def isLanded(client, uav):
+    state = client.getMultirotorState(vehicle_name=uav.getName())
+    return state.landed_state == landed_state_landed
+
+
+# Home: within dist_tol (m) of its start point, horizontally
+def isHome(client, uav, dist_tol=1.0):
+    pos = getUAVpos(client, uav)
+    return math.hypot(pos[0], pos[1]) < dist_tol
+
+
+# Reached target yaw (World frame) within angle_tol (deg)
+def isAtTargetYaw(client, uav, angle_tol=5):
+    yaw_err = (uav.getTargetYaw()-getUAVorientationWorld(client, uav)[2]+180) % 360 - 180
+    return abs(yaw_err) < angle_tol
+
+
+# Reports the result of a fleet command
+def reportFleetCommand(fleet_command, completed, msg_done):
+    if completed:
+        print(msg_done)
+        log.logReport("INFO", msg_done)
+    else:
+        msg = "Timeout: " + ", ".join(fleet_command.getPendingUAVs()) + " did not complete " + fleet_command.name
+        print(msg)
+        log.logReport("WARNING", msg)
+
+
+def takeoffAllUAVs(client, uavs, wait=True, timeout=20):
     print("All UAVs start to take off")
     log.logReport("INFO", "All UAVs start to take off")
-    for uav in uavs:
-        command = takeoffUAV(client, uav)
-    # command.join()  # Waite untill the last UAV finished this command
-    time.sleep(5) # Allow running other threads 
-    print("All UAVs have taken off")
-    log.logReport("INFO", "All UAVs have taken off")
+    futures = [takeoffUAV(client, uav) for uav in uavs]
+    fleet_command = FleetCommand(client, uavs, futures, isTakenOff, "take off")
+    if wait:
+        reportFleetCommand(fleet_command, fleet_command.join(timeout), "All UAVs have taken off")
+    return fleet_command
 
 
-def landAllUAVs(client, uavs):
+def landAllUAVs(client, uavs, wait=True, timeout=60):
     # UAVs should Go Home first before landing
     print("All UAVs start to land")
     log.logReport("INFO", "All UAVs start to land")
-    for uav in uavs:
-        command = landUAV(client, uav)
-    # command.join()  # Waite untill the last UAV has finished this command
-    time.sleep(3) # Allow running other threads 
-    print("All UAVs have landed")
-    log.logReport("INFO", "All UAVs have landed")
+    futures = [landUAV(client, uav) for uav in uavs]
+    fleet_command = FleetCommand(client, uavs, futures, isLanded, "landing")
+    if wait:
+        reportFleetCommand(fleet_command, fleet_command.join(timeout), "All UAVs have landed")
+    return fleet_command
 
 
 def hoverAllUAVs(client, uavs):
     print("All UAVs start to hover")
     log.logReport("INFO", "All UAVs start to hover")
-    for uav in uavs:
-        command = hoverUAV(client, uav)
+    futures = [hoverUAV(client, uav) for uav in uavs]
+    # Hover takes effect immediately
+    return FleetCommand(client, uavs, futures, lambda client, uav: True, "hover")
     
 
-def rotateAllUAVsTo(client, uavs, yaw):
+def rotateAllUAVsTo(client, uavs, yaw, wait=True, timeout=10):
     print("All UAVs start to rotate to "+str(yaw)+" degree")
     log.logReport("INFO", "All UAVs start to rotate to "+str(yaw)+" degree")
+    futures = []
     for uav in uavs:
-        command = rotateUAVto(client, uav, yaw)
-    # command.join()  # Waite untill the last UAV has finished this command
-    time.sleep(2) # Allow running other threads
-    print("All UAVs have finished rotating")
-    log.logReport("INFO", "All UAVs have finished rotating")
+        uav.setTargetYaw(yaw)
+        futures.append(rotateUAVto(client, uav, yaw))
+    fleet_command = FleetCommand(client, uavs, futures, isAtTargetYaw, "rotation")
+    if wait:
+        reportFleetCommand(fleet_command, fleet_command.join(timeout), "All UAVs have finished rotating")
+    return fleet_command
 
 
-def goHomeAllUAVs(client, uavs):
-    # Extra waiting time is needed. The amount of time can be calculated according to distance from home.
+def goHomeAllUAVs(client, uavs, wait=True, timeout=60):
     print("All UAVs start to go home")
     log.logReport("INFO", "All UAVs start to go home")
-    for uav in uavs:
-        command = goHomeUAV(client, uav)
-    # command.join()  # Waite untill the last UAV has finished this command
-    time.sleep(2) # Allow running other threads
-    # print("All UAVs have returned home")
-    # log.logReport("INFO", "All UAVs have returned home")
+    futures = [goHomeUAV(client, uav) for uav in uavs]
+    fleet_command = FleetCommand(client, uavs, futures, isHome, "go home")
+    if wait:
+        reportFleetCommand(fleet_command, fleet_command.join(timeout), "All UAVs have returned home")
+    return fleet_command
 
 
 # ========== Get Data from Airsim ==========
 # Updates UAV object parameters based on airsim inputs
-# Max frequency 10hz, based on 10 UAVs
-def updateUAVsStatus(client, uavs):
+# Pose and collision are fetched once per UAV per tick (see getUAVtelemetry)
+# recorder: optional FlightRecorder, records the fleet state after the update
+def updateUAVsStatus(client, uavs, recorder=None):
+    t = simTime(client)
     for uav in uavs:
-        # Updates current pose of the UAV
-        # NOTE: CurrPose = current position/orientation relative to the UAV start coordinate frame
-        # NOTE: CurrWorldPose = current position/orientation relative to the world frame - calculate using a custom function in this file
-        uav.setCurrPose(np.append(getUAVpos(client, uav), getUAVorientation(client, uav)))
-        uav.setCurrWorldPose(np.append(getUAVposWorld(client, uav), getUAVorientationWorld(client, uav)))
-
-        # Updates whether or not the UAV is currently colliding with anything, True/False
-        uav.setCollision(getUAVcollision(client, uav).has_collided)
-
-        # Update the data collected from each sensor
-        # NOTE: sensor data = entire data object obtained from airsim
-        # NOTE: sensor value = useful value from the data object, ex. just the distance measurement from a distance sensor
-        for s in range(0,len(uav.getSensors())):
-            uav.sensors[s].setData(getSensorData(client, uav, uav.getSensors()[s]))
-            uav.sensors[s].setValue(getSensorValue(client, uav, uav.getSensors()[s]))
+        # One snapshot per UAV: 2 RPCs instead of 5 (4x simGetVehiclePose + simGetCollisionInfo)
+        pose, collision = getUAVtelemetry(client, uav)
+        applyUAVtelemetry(uav, pose, collision)
+
+        # Update the sensors that are due at their sample rate (one acquisition per sensor, one for all cameras)
+        applySensorReadings(uav, readUAVsensors(client, uav, t), t)
+    if recorder is not None:
+        recorder.record(t)
 
 # Get world pose only for speeding up
 def updateUAVsWorldPose(client, uavs):
@@ -214,32 +386,113 @@ def updateUAVsWorldPose(client, uavs):
         updateUAVWorldPose(client, uav)
 
 # Update single UAV
-def updateUAVWorldPose(client, uav):
-    uav.setCurrWorldPose(np.append(getUAVposWorld(client, uav), getUAVorientationWorld(client, uav)))
+# pose: optional simGetVehiclePose result already fetched this tick
+def updateUAVWorldPose(client, uav, pose=None):
+    if pose is None:
+        pose = getUAVpose(client, uav)
+    uav.setCurrWorldPose(np.append(getUAVposWorld(client, uav, pose), getUAVorientationWorld(client, uav, pose)))
+
+
+# ===== Parallel Polling =====
+# Same as updateUAVsStatus, but vehicles are fetched concurrently by a ClientPool (one client per thread).
+# Nothing is written to the UAV objects until every vehicle has been fetched; the results are then written
+# from the calling thread, one UAV after the other. Like updateUAVsStatus on a timer, the update is not
+# atomic: a reader on another thread may see some UAVs already updated and others not yet.
+def updateUAVsStatusParallel(pool, uavs, recorder=None):
+    results = pool.map(fetchUAVstatus, uavs)
+    tick_time = None
+    for uav, (pose, collision, readings, t) in zip(uavs, results):
+        applyUAVtelemetry(uav, pose, collision)
+        applySensorReadings(uav, readings, t)
+        tick_time = t if tick_time is None else min(tick_time, t)
+    if recorder is not None:
+        # Sim time at the start of the first fetch, like updateUAVsStatus
+        recorder.record(tick_time)
+
+
+# World pose only, fetched concurrently by a ClientPool
+def updateUAVsWorldPoseParallel(pool, uavs):
+    poses = pool.map(getUAVpose, uavs)
+    for uav, pose in zip(uavs, poses):
+        updateUAVWorldPose(None, uav, pose)
+
+
+# Fetches pose, collision and the readings of the sensors due of one UAV without touching the UAV object
+def fetchUAVstatus(client, uav):
+    t = simTime(client)
+    pose, collision = getUAVtelemetry(client, uav)
+    readings = readUAVsensors(client, uav, t)
+    return pose, collision, readings, t
+
+
+# ===== Telemetry Snapshot =====
+# Fetches everything updateUAVsStatus needs from one vehicle: one pose RPC and one collision RPC.
+# Body and world pose are both derived from the same pose object.
+def getUAVtelemetry(client, uav):
+    pose = getUAVpose(client, uav)
+    collision = getUAVcollision(client, uav)
+    return pose, collision
+
+
+# Writes a telemetry snapshot into the UAV object
+# NOTE: CurrPose = current position/orientation relative to the UAV start coordinate frame
+# NOTE: CurrWorldPose = current position/orientation relative to the world frame
+def applyUAVtelemetry(uav, pose, collision):
+    curr_pose = np.append(poseToPos(pose), poseToOrientation(pose))
+    uav.setCurrPose(curr_pose)
+    uav.setCurrWorldPose(np.add(curr_pose, uav.getInitPose()[0:6]))
+    # Whether or not the UAV is currently colliding with anything, True/False
+    uav.setCollision(collision.has_collided)
+
 
 # ===== Vehicle Pose =====
+# Returns the raw airsim pose of uav (one RPC)
+def getUAVpose(client, uav):
+    return client.simGetVehiclePose(vehicle_name=uav.getName())
+
+
+# Converts an airsim pose to a position vector [x, y, z]
+def poseToPos(pose):
+    return [pose.position.x_val, pose.position.y_val, pose.position.z_val]
+
+
+# Converts an airsim pose to an orientation vector in degrees [pitch, roll, yaw]
+def poseToOrientation(pose):
+    return np.rad2deg(quaternionToEuler(pose.orientation))
+
+
+# Quaternion -> (pitch, roll, yaw) in radians, same as airsim.to_eularian_angles (no airsim import)
+def quaternionToEuler(q):
+    x, y, z, w = q.x_val, q.y_val, q.z_val, q.w_val
+    roll = math.atan2(2.0*(w*x + y*z), 1.0 - 2.0*(x*x + y*y))
+    pitch = math.asin(max(-1.0, min(1.0, 2.0*(w*y - z*x))))
+    yaw = math.atan2(2.0*(w*z + x*y), 1.0 - 2.0*(y*y + z*z))
+    return (pitch, roll, yaw)
+
+
 # Returns position vector of uav relative to initial starting pose
-def getUAVpos(client, uav):
-    current_pose = client.simGetVehiclePose(vehicle_name=uav.getName())
-    current_pos = [current_pose.position.x_val, current_pose.position.y_val, current_pose.position.z_val]
-    return current_pos
+# pose: optional, reuse a pose already fetched this tick instead of a new RPC
+def getUAVpos(client, uav, pose=None):
+    if pose is None:
+        pose = getUAVpose(client, uav)
+    return poseToPos(pose)
 
 
 # Returns position vector of uav in world frame, by adding the initial UAV position to its current position
-def getUAVposWorld(client, uav):
-    return (np.add(getUAVpos(client, uav), uav.getInitPose()[0:3]))
+def getUAVposWorld(client, uav, pose=None):
+    return (np.add(getUAVpos(client, uav, pose), uav.getInitPose()[0:3]))
 
 
 # Returns orientation of uav relative to initial starting pose
-def getUAVorientation(client, uav):
-    current_pose = client.simGetVehiclePose(vehicle_name=uav.getName())
-    current_or = np.rad2deg(airsim.to_eularian_angles(current_pose.orientation))
-    return current_or
+def getUAVorientation(client, uav, pose=None):
+    if pose is None:
+        pose = getUAVpose(client, uav)
+    return poseToOrientation(pose)
 
 
 # Returns orientation of uav in world frame, by adding the initial UAV orientation to its current orientation
-def getUAVorientationWorld(client, uav):
-    return (np.add(getUAVorientation(client,uav), uav.getInitPose()[3:6]))
+def getUAVorientationWorld(client, uav, pose=None):
+    return (np.add(getUAVorientation(client, uav, pose), uav.getInitPose()[3:6]))
 
 # Returns collision info
 def getUAVcollision(client, uav):
@@ -247,41 +500,178 @@ def getUAVcollision(client, uav):
 
 
 # ===== Sensor Data =====
-# Returns data of uav sensor
-def getSensorData(client, uav, sensor):
-    if(sensor.getSensorType() == "Distance"):
-        data = client.getDistanceSensorData(distance_sensor_name = sensor.getName(), vehicle_name=uav.getName())
-    elif(sensor.getSensorType() == "Camera"):
-        datas = client.simGetImages([airsim.ImageRequest("0", airsim.ImageType.Scene, False, False)], vehicle_name=uav.getName(), external=False)
-        data = datas[0]
+# Each sensor type has one reader that makes a single acquisition and returns (data, value)
+# NOTE: sensor data = entire data object obtained from airsim
+# NOTE: sensor value = useful value extracted from that same data object
 
-    # ... elif for any other type of sensor needed ...
+# Distance sensor: the distance measurement is considered as its 'value'
+def readDistanceSensor(client, uav, sensor):
+    data = client.getDistanceSensorData(distance_sensor_name = sensor.getName(), vehicle_name=uav.getName())
+    return data, data.distance
 
-    else:
-        data = 0
 
-    return data
+# Camera: the raw (height, width, 3) uint8 BGR frame is considered as its 'value' (see CameraFrames.py)
+# The sensor name is the camera name in settings.json (see JsonSettings.py)
+def readCameraSensor(client, uav, sensor):
+    return readCameraSensors(client, uav, [sensor])[0]
 
 
-# Returns value of uav sensor
-def getSensorValue(client, uav, sensor):
-    if(sensor.getSensorType() == "Distance"):
-        # For a distance sensor, the distance measurement is considered as its 'value'
-        data = client.getDistanceSensorData(distance_sensor_name = sensor.getName(), vehicle_name=uav.getName())
-        value = data.distance
-    elif(sensor.getSensorType() == "Camera"):
-        # For a camera, the image is considered as its 'value'
-        data = client.simGetImage("front_center", 0, vehicle_name=uav.getName())
-        value = np.asarray(bytearray(data), dtype="uint8")
-        value = cv2.imdecode(value, cv2.IMREAD_COLOR)
-
-    # ... elif for any other type of sensor needed ...
+# All cameras of uav with one simGetImages call. Returns [(data, value)] in the order of sensors
+def readCameraSensors(client, uav, sensors):
+    return CameraFrames.captureFrames(client, uav.getName(), [sensor.getName() for sensor in sensors], camera_frame_pool)
 
-    else:
+
+# Lidar: (N,3) float32 points in the World frame, cropped and downsampled, are considered as its 'value' (see PointCloud.py)
+# data.point_cloud is replaced by the (N,3) float32 array of the raw points (vehicle frame), much smaller than the list
+def readLidarSensor(client, uav, sensor):
+    data = client.getLidarData(lidar_name=sensor.getName(), vehicle_name=uav.getName())
+    data.point_cloud = PointCloud.toPoints(data.point_cloud)
+    value = PointCloud.processPointCloud(data, uav.getInitPose(), lidar_voxel_size, lidar_min_range, lidar_max_range)
+    return data, value
+
+
+# Barometer: the altitude (m) is considered as its 'value'
+def readBarometerSensor(client, uav, sensor):
+    data = client.getBarometerData(barometer_name=sensor.getName(), vehicle_name=uav.getName())
+    return data, data.altitude
+
+
+# IMU: [ax, ay, az, wx, wy, wz] (linear acceleration m/s^2, angular velocity rad/s) is considered as its 'value'
+def readImuSensor(client, uav, sensor):
+    data = client.getImuData(imu_name=sensor.getName(), vehicle_name=uav.getName())
+    a, w = data.linear_acceleration, data.angular_velocity
+    return data, [a.x_val, a.y_val, a.z_val, w.x_val, w.y_val, w.z_val]
+
+
+# GPS: [latitude, longitude, altitude] is considered as its 'value'
+def readGpsSensor(client, uav, sensor):
+    data = client.getGpsData(gps_name=sensor.getName(), vehicle_name=uav.getName())
+    geo_point = data.gnss.geo_point
+    return data, [geo_point.latitude, geo_point.longitude, geo_point.altitude]
+
+
+# Magnetometer: the body frame magnetic field [x, y, z] (gauss) is considered as its 'value'
+def readMagnetometerSensor(client, uav, sensor):
+    data = client.getMagnetometerData(magnetometer_name=sensor.getName(), vehicle_name=uav.getName())
+    field = data.magnetic_field_body
+    return data, [field.x_val, field.y_val, field.z_val]
+
+
+# ===== Sensor Handlers =====
+# Sensor type -> reader and sample rate. On each status update only the sensors that are due are read
+# (see isSensorDue), the others keep their last data/value/timestamp.
+# Usage Example
+# AirsimIO.setSensorRate("Lidar", 2)     # Hz, lidar read every 5th tick of a 10 Hz update
+# AirsimIO.setSensorRate("Distance", None) # every tick
+# AirsimIO.registerSensorHandler("Thermal", readThermalSensor, rate=1)
+class SensorHandler:
+
+    # ===== Constructor =====
+    # reader: function(client, uav, sensor) -> (data, value)
+    # rate: Hz, None: read on every status update
+    def __init__(self, reader, rate=None):
+        self.reader = reader
+        self.rate = rate
+
+    def setReader(self, reader):
+        self.reader = reader
+
+    def getReader(self):
+        return self.reader
+
+    def setRate(self, rate):
+        self.rate = rate
+
+    def getRate(self):
+        return self.rate
+
+    # s, minimum time between two readings (0: every update)
+    def getPeriod(self):
+        return 1.0/self.rate if self.rate else 0.0
+
+
+# ... add a handler here for any other type of sensor needed ...
+sensor_handlers = {"Distance": SensorHandler(readDistanceSensor),
+                   "Imu": SensorHandler(readImuSensor),
+                   "Barometer": SensorHandler(readBarometerSensor, rate=5),
+                   "Gps": SensorHandler(readGpsSensor, rate=5),
+                   "Magnetometer": SensorHandler(readMagnetometerSensor, rate=5),
+                   "Camera": SensorHandler(readCameraSensor, rate=5),
+                   "Lidar": SensorHandler(readLidarSensor, rate=5)}
+
+# A sensor is due once this fraction of its period has elapsed, so that update jitter does not skip a reading
+due_tolerance = 0.9
+
+
+def registerSensorHandler(sensor_type, reader, rate=None):
+    sensor_handlers[sensor_type] = SensorHandler(reader, rate)
+
+
+def setSensorRate(sensor_type, rate):
+    sensor_handlers[sensor_type].setRate(rate)
+
+
+# Whether sensor must be read at time t (s, simTime): never read, no rate, or a period has elapsed
+def isSensorDue(sensor, t):
+    handler = sensor_handlers.get(sensor.getSensorType())
+    last = sensor.getTimestamp()
+    if handler is None or last is None or t is None:
+        return True
+    return t - last >= due_tolerance*handler.getPeriod()
+
+
+# Returns [(data, value)] of the sensors of uav that are due at time t, in the order of uav.getSensors()
+# Sensors not due are None. t None: all sensors
+# Cameras are batched: one simGetImages call per UAV, whatever the number of cameras
+def readUAVsensors(client, uav, t=None):
+    sensors = uav.getSensors()
+    due = [isSensorDue(sensor, t) for sensor in sensors]
+    cameras = [s for s, sensor in enumerate(sensors) if due[s] and sensor.getSensorType() == "Camera"]
+    readings = [None]*len(sensors)
+    if len(cameras) > 1:
+        for s, reading in zip(cameras, readCameraSensors(client, uav, [sensors[s] for s in cameras])):
+            readings[s] = reading
+            due[s] = False
+    for s, sensor in enumerate(sensors):
+        if due[s]:
+            readings[s] = readSensor(client, uav, sensor)
+    return readings
+
+
+# Stores the readings of readUAVsensors on the Sensor objects, with their time t
+def applySensorReadings(uav, readings, t):
+    for sensor, reading in zip(uav.getSensors(), readings):
+        if reading is not None:
+            sensor.setData(reading[0])
+            sensor.setValue(reading[1])
+            sensor.setTimestamp(t)
+
+
+# Returns (data, value) of uav sensor with one acquisition
+def readSensor(client, uav, sensor):
+    handler = sensor_handlers.get(sensor.getSensorType())
+    if handler is None:
         # TODO exception handling if needed
-        value = 0
+        return 0, 0
+    return handler.reader(client, uav, sensor)
+
 
-    return value
+# Reads the sensor once and stores data, value and time on the Sensor object
+def updateSensor(client, uav, sensor):
+    data, value = readSensor(client, uav, sensor)
+    sensor.setData(data)
+    sensor.setValue(value)
+    sensor.setTimestamp(simTime(client))
+
+
+# Returns data of uav sensor
+def getSensorData(client, uav, sensor):
+    return readSensor(client, uav, sensor)[0]
+
+
+# Returns value of uav sensor
+def getSensorValue(client, uav, sensor):
+    return readSensor(client, uav, sensor)[1]
 
 
 # ========== Set Simulation Weather ==========
@@ -356,7 +746,7 @@ def plotUAVwaypontsLabels(client, uav, label_scale=1, color_rgba=[0.0, 0.0, 1.0,
 # Plot all UAVs waypoints labels
 def plotAllUAVsWaypontsLabels(client, uavs, label_scale=1, color_rgba=[0.0, 0.0, 1.0, 1.0], duration=-1.0):
     for uav in uavs:
-        if uav.getWaypoints():
+        if len(uav.getWaypoints()) > 0:
             plotUAVwaypontsLabels(client, uav, label_scale, color_rgba, duration)
 
 # Plot UAV path
@@ -366,10 +756,36 @@ def plotUAVpath(client, uav, waypoint_size=5, path_thickness=2, duration=-1.0, i
 
 
 # Plot All UAVs' paths
+# UAVs sharing the same colour are merged: one simPlotPoints per waypoint colour and
+# one simPlotLineList per path colour, instead of two RPCs per UAV. Returns the number of RPCs sent.
 def plotAllUAVsPaths(client, uavs, waypoint_size=5, path_thickness=2, duration=-1.0, is_persistent=False):
+    points_by_color = {}
+    segments_by_color = {}
     for uav in uavs:
-        if uav.getWaypoints():
-            plotUAVpath(client, uav, waypoint_size, path_thickness, duration, is_persistent)
+        waypoints = uav.getWaypoints()
+        if len(waypoints) == 0:
+            continue
+        points_by_color.setdefault(tuple(uav.getWaypointColor()), []).extend(waypoints)
+        segments = segments_by_color.setdefault(tuple(uav.getPathColor()), [])
+        for i in range(len(waypoints)-1):
+            segments.append(waypoints[i])
+            segments.append(waypoints[i+1])
+    return plotGroupedPaths(client, points_by_color, segments_by_color, waypoint_size, path_thickness, duration, is_persistent)
+
+
+# Sends one simPlotPoints per colour in points_by_color and one simPlotLineList per colour in segments_by_color
+# segments: flat list of point pairs [a0, b0, a1, b1, ...]. Returns the number of RPCs sent.
+def plotGroupedPaths(client, points_by_color, segments_by_color, waypoint_size=5, path_thickness=2, duration=-1.0, is_persistent=False):
+    n_rpcs = 0
+    for color, points in points_by_color.items():
+        if len(points) > 0:
+            plotPoints(client, points, list(color), waypoint_size, duration, is_persistent)
+            n_rpcs += 1
+    for color, segments in segments_by_color.items():
+        if len(segments) > 0:
+            plotLineList(client, segments, list(color), path_thickness, duration, is_persistent)
+            n_rpcs += 1
+    return n_rpcs
 
 
 # Plot All UAVs' names
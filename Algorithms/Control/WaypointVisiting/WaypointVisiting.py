@@ -3,7 +3,6 @@
 # Cranfield University - DARTeC                  
 # ========================================================= #
 
-from datetime import datetime
 import AirsimIO
 import math
 
@@ -54,17 +53,14 @@ def waypointVisiting(client, uav, taskpoint_hover_time=0, dist_err_tol=0.5, angl
         |
         Check taskpoint hover 
         |
-        Rotate (Calculate and update target_yaw)
+        Rotate (target_yaw: leg heading from the leg table)
         |
-        moveToPosition (PID update UAV speed according to real-time distance)
+        moveToPosition (P control of the UAV speed on the leg length)
     """
 
     is_completed = False # flag of completing the final waypoint
     
-    # PID parameters (PID not working well!)
-    Kp_vel = 0.5
-    # Limit the min velocity for moveXX cmd. Don't be too slow.
-    min_vel = 0.1 # m/s 
+    # PID parameters (PID not working well!): Kp_vel and min_vel in LegTable.py
     # Rotate time unit:s (let UAV yaw converge to target_yaw)
     rotate_time = 1.5
     
@@ -75,8 +71,7 @@ def waypointVisiting(client, uav, taskpoint_hover_time=0, dist_err_tol=0.5, angl
     # Update UAV status (single UAV)
     AirsimIO.updateUAVWorldPose(client, uav)
     # Calculate the command time difference
-    curr_time = datetime.now()
-    time_diff = (curr_time-uav.getCurrentCommandStartTime()).total_seconds()
+    time_diff = AirsimIO.simTime(client) - uav.getCurrentCommandStartTime()
     
     # cmd: empty (initial, before takeoff)
     if uav.getCurrentCommand() == "":
@@ -93,20 +88,19 @@ def waypointVisiting(client, uav, taskpoint_hover_time=0, dist_err_tol=0.5, angl
     
     # cmd: hover
     elif uav.getCurrentCommand() == "hover":
-        # curr_time = datetime.now()
-        # time_diff = (curr_time-uav.getCurrentCommandStartTime()).total_seconds()
+        # time_diff = AirsimIO.simTime(client) - uav.getCurrentCommandStartTime()
         # Taskpoint hover for a certain duration. Only hover when all these conditions are met
-        if taskpoint_hover_time > 0 and uav.getWaypointIndex() in uav.getTaskPointsIndices() and time_diff < taskpoint_hover_time:
+        if taskpoint_hover_time > 0 and uav.isTaskPoint(uav.getWaypointIndex()) and time_diff < taskpoint_hover_time:
             # Hover not completed
             return False
         else:
             # Final waypoint?
-            if uav.getWaypointIndex() >= len(uav.getWaypoints())-1:
+            if uav.getWaypointIndex() >= uav.getLegTable().getNumLegs()-1:
                 is_completed = True
                 return is_completed
             else:
-                # Calculate target yaw
-                target_yaw = uav.calculateTargetYaw()
+                # Target yaw: heading of the next leg (precomputed, see LegTable.py)
+                target_yaw = uav.getLegTable().heading[uav.getWaypointIndex()+1]
                 uav.setTargetYaw(target_yaw)
                 # Rotate to target yaw
                 AirsimIO.rotateUAVto(client, uav, target_yaw)
@@ -120,13 +114,9 @@ def waypointVisiting(client, uav, taskpoint_hover_time=0, dist_err_tol=0.5, angl
         if abs(uav.getTargetYaw()-uav.getCurrWorldPose()[5]) < angle_err_tol:
             print('{} reached yaw angle {} deg'.format(uav.getName(), round(uav.getTargetYaw(),1)))
             # Move to the next waypoint with speed control (PID).
-            next_waypoint = uav.getWaypoints()[uav.getWaypointIndex()+1]
-            uav_curr_world_pos = uav.getCurrWorldPose()[:3]
-            dist = math.dist(next_waypoint, uav_curr_world_pos)
-            # PID control (P only)
-            vel = min(Kp_vel*dist, max_vel) # limit max speed
-            vel = max(vel, min_vel) # limit min
-            AirsimIO.moveUAVto(client, uav, next_waypoint, vel)
+            # PID control (P only) on the leg length, precomputed in the leg table
+            vel = uav.getLegTable().getSpeed(uav.getWaypointIndex()+1, max_vel)
+            AirsimIO.moveUAVtoWaypoint(client, uav, uav.getWaypointIndex()+1, vel)
             print('{} starts to move to waypoint {}'.format(uav.getName(), uav.getWaypointIndex()+1))
         # No completion under this cmd
         return False
@@ -134,7 +124,7 @@ def waypointVisiting(client, uav, taskpoint_hover_time=0, dist_err_tol=0.5, angl
     # cmd: moveToPosition
     elif uav.getCurrentCommand() == "moveToPosition":
         # Get distance between UAV current location and next waypoint.
-        next_waypoint = uav.getWaypoints()[uav.getWaypointIndex()+1]
+        next_waypoint = uav.getLegTable().waypoints[uav.getWaypointIndex()+1]
         uav_curr_world_pos = uav.getCurrWorldPose()[:3]
         dist = math.dist(next_waypoint, uav_curr_world_pos)
         # Check arrival
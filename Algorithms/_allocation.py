@@ -0,0 +1,231 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Multi-UAV task allocation
+# Assigns M task points to N UAVs, minimising either the
+# longest route (makespan) or the sum of all routes (total).
+#   exact:  M <= N, at most one task per UAV. Optimal
+#           assignment (Hungarian for total, bottleneck
+#           assignment for makespan). O(N^3): "auto" uses it
+#           only up to exact_max_cells (N*M), greedy above.
+#   greedy: any size. Tasks are handed out one at a time
+#           from vectorized distance arrays. Thousands of
+#           tasks in well under a second.
+# Usage Example
+# allocation = allocateTasks(starts, task_points, objective="makespan")
+# allocation[0] -> task indices of UAV 0, in visiting order
+# ========================================================= #
+
+import numpy as np
+
+
+# Largest N*M cost matrix solved exactly by method="auto" (makespan: about 0.3 s without scipy), greedy above
+exact_max_cells = 100*100
+
+
+# ===== Distances =====
+# (N,3) x (M,3) -> (N,M) euclidean distance matrix
+def distanceMatrix(a, b):
+    a = np.asarray(a, dtype=float)[:, 0:3]
+    b = np.asarray(b, dtype=float)[:, 0:3]
+    d2 = (a*a).sum(1)[:, np.newaxis] + (b*b).sum(1)[np.newaxis, :] - 2.0*(a @ b.T)
+    return np.sqrt(np.maximum(d2, 0.0))
+
+
+# Length of start -> tasks[order[0]] -> tasks[order[1]] ...
+def routeLength(start, tasks, order):
+    if len(order) == 0:
+        return 0.0
+    points = np.vstack((np.asarray(start, dtype=float)[0:3], np.asarray(tasks, dtype=float)[order, 0:3]))
+    return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+# ===== Allocation =====
+# starts: (N,3) UAV start positions, World frame
+# tasks: (M,3) task points, World frame
+# objective: "makespan" (shortest longest route) or "total" (shortest sum of routes)
+# method: "auto" (exact if M <= N and N*M <= exact_max_cells, else greedy), "exact" or "greedy"
+# Returns a list of N lists of task indices, in visiting order
+def allocateTasks(starts, tasks, objective="makespan", method="auto"):
+    if objective not in ("makespan", "total"):
+        raise ValueError("Unknown objective: " + str(objective))
+    starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+    tasks = np.asarray(tasks, dtype=float).reshape(-1, 3)
+    n_uavs, n_tasks = len(starts), len(tasks)
+    if n_uavs == 0:
+        raise ValueError("No UAV to allocate tasks to")
+    if n_tasks == 0:
+        return [[] for _ in range(n_uavs)]
+    if method == "auto":
+        method = "exact" if n_tasks <= n_uavs and n_tasks*n_uavs <= exact_max_cells else "greedy"
+    if method == "exact":
+        if n_tasks > n_uavs:
+            raise ValueError("Exact allocation needs at most one task per UAV (M <= N)")
+        return allocateExact(distanceMatrix(starts, tasks), objective)
+    elif method == "greedy":
+        return allocateGreedy(starts, tasks, objective)
+    raise ValueError("Unknown method: " + str(method))
+
+
+# Optimal one-task-per-UAV assignment from an (N,M) cost matrix, M <= N
+def allocateExact(cost, objective="makespan"):
+    n_uavs, n_tasks = cost.shape
+    if objective == "total":
+        task_to_uav = hungarian(cost.T)
+    else:
+        task_to_uav = bottleneckAssignment(cost.T)
+    allocation = [[] for _ in range(n_uavs)]
+    for task, uav in enumerate(task_to_uav):
+        allocation[uav].append(task)
+    return allocation
+
+
+# Min-cost assignment of every row to a distinct column, rows <= columns (Hungarian algorithm, O(rows^2 * columns))
+# Returns the column of each row
+def hungarian(cost):
+    try:
+        from scipy.optimize import linear_sum_assignment
+        rows, cols = linear_sum_assignment(cost)
+        result = np.zeros(cost.shape[0], dtype=np.int64)
+        result[rows] = cols
+        return result
+    except ImportError:
+        pass
+    n, m = cost.shape
+    u = np.zeros(n+1)
+    v = np.zeros(m+1)
+    p = np.zeros(m+1, dtype=np.int64)    # p[j]: row assigned to column j (1-based, 0: none)
+    way = np.zeros(m+1, dtype=np.int64)
+    for i in range(1, n+1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m+1, np.inf)
+        used = np.zeros(m+1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0-1, :] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1-1]
+            used_cols = np.flatnonzero(used)
+            u[p[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    result = np.zeros(n, dtype=np.int64)
+    for j in range(1, m+1):
+        if p[j] != 0:
+            result[p[j]-1] = j-1
+    return result
+
+
+# Assignment minimising the largest cost, rows <= columns. Returns the column of each row
+def bottleneckAssignment(cost):
+    n, m = cost.shape
+    thresholds = np.unique(cost)
+    lo, hi = 0, len(thresholds)-1
+    best = None
+    # Smallest threshold that still allows a complete matching
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        matching = _perfectMatching(cost <= thresholds[mid])
+        if matching is not None:
+            best = (thresholds[mid], matching)
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    # Among the matchings under the bottleneck, take the cheapest in total
+    limit = best[0]
+    return hungarian(np.where(cost <= limit, cost, cost.max()*n*10 + 1.0))
+
+
+# Matches every row to a distinct allowed column (augmenting paths). None if impossible
+def _perfectMatching(allowed):
+    n, m = allowed.shape
+    col_owner = np.full(m, -1, dtype=np.int64)
+    for row in range(n):
+        if not _augment(row, allowed, col_owner, np.zeros(m, dtype=bool)):
+            return None
+    return col_owner
+
+
+# Depth-first search for an augmenting path from root, with an explicit stack (no recursion limit)
+# stack[k]: (row, its candidate columns), path[k]: column taken from stack[k] to reach stack[k+1]
+def _augment(root, allowed, col_owner, visited):
+    stack = [(root, iter(np.flatnonzero(allowed[root] & ~visited)))]
+    path = []
+    while stack:
+        row, cols = stack[-1]
+        for col in cols:
+            if visited[col]:
+                continue
+            visited[col] = True
+            path.append(col)
+            if col_owner[col] < 0:
+                # Free column: shift every column on the path to the row that reached it
+                for (path_row, _), path_col in zip(stack, path):
+                    col_owner[path_col] = path_row
+                return True
+            owner = col_owner[col]
+            stack.append((owner, iter(np.flatnonzero(allowed[owner] & ~visited))))
+            break
+        else:
+            # Dead end: back to the previous row
+            stack.pop()
+            if path:
+                path.pop()
+    return False
+
+
+# Greedy allocation for any number of tasks
+#   makespan: the UAV with the shortest route so far takes its nearest free task
+#   total:    the (UAV, task) pair with the smallest added distance is taken
+# Each UAV keeps a distance row from its current route end to all tasks. Only rows that changed are recomputed.
+def allocateGreedy(starts, tasks, objective="makespan"):
+    n_uavs, n_tasks = len(starts), len(tasks)
+    tx, ty, tz = [np.ascontiguousarray(tasks[:, k]) for k in range(3)]
+    ends = starts[:, 0:3].copy()            # Current end of each route
+    lengths = np.zeros(n_uavs)              # Current length of each route
+    allocation = [[] for _ in range(n_uavs)]
+    rows = distanceMatrix(ends, tasks)**2   # (N,M) squared distance from route ends to free tasks (inf: taken)
+    best_task = np.argmin(rows, axis=1)
+    best_dist = np.sqrt(rows[np.arange(n_uavs), best_task])
+
+    for n_assigned in range(1, n_tasks+1):
+        if objective == "makespan":
+            # Shortest route after adding its nearest task
+            uav = int(np.argmin(lengths + best_dist))
+        else:
+            uav = int(np.argmin(best_dist))
+        task = int(best_task[uav])
+        allocation[uav].append(task)
+        lengths[uav] += best_dist[uav]
+        ends[uav] = tasks[task, 0:3]
+        if n_assigned == n_tasks:
+            break
+        # Refresh the row of the UAV that moved and of the UAVs whose nearest task was just taken
+        stale = set(np.flatnonzero(best_task == task).tolist())
+        rows[:, task] = np.inf
+        taken = np.isinf(rows[uav])
+        row = (tx-ends[uav, 0])**2 + (ty-ends[uav, 1])**2 + (tz-ends[uav, 2])**2
+        row[taken] = np.inf
+        rows[uav] = row
+        stale.add(uav)
+        for i in stale:
+            best_task[i] = int(np.argmin(rows[i]))
+            best_dist[i] = np.sqrt(rows[i, best_task[i]])
+    return allocation
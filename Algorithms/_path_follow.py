@@ -2,9 +2,10 @@ import os, sys
 import time
 import math
 import numpy as np
-from datetime import datetime
 import AirsimIO
 import logFunctions as log
+from FleetState import FleetState
+from LoopTimer import LoopStats, FixedRateLoop
 
 parent_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 sys.path.append(parent_dir)
@@ -13,12 +14,28 @@ sys.path.append(parent_dir)
 # === Basic class for hard-coded waypoint following ====
 class Follow_Path:
 
-    def __init__(self, client = None, uavs = None):
+    def __init__(self, client = None, uavs = None, vectorized = False, recorder = None, separation = None,
+                 continuous = False, lookahead = -1, tick_period = 0.1):
 
         self.client = client
         self.uavs = uavs
         self.is_complete = np.zeros(len(uavs))
         # self.waypoints = waypoints
+        # vectorized: keep the fleet in a FleetState and step all UAVs at once (stepAllUAVs)
+        self.fleet_state = FleetState(uavs) if vectorized else None
+        # recorder: optional FlightRecorder, records the fleet after every control tick (see Replay.py)
+        self.recorder = recorder
+        # separation: optional Separation.SeparationMonitor. UAVs on the yielding side of a predicted
+        # conflict are held in hover and do not start a new leg until the conflict clears
+        self.separation = separation
+        # continuous: fly through non-task waypoints without stopping (pathFollow instead of waypointFollow)
+        # lookahead: m, path lookahead of moveOnPath in continuous mode (-1: AirSim default)
+        self.continuous = continuous
+        self.lookahead = lookahead
+        # tick_period: s, control loop period of runSimulation (fixed rate, see LoopTimer.py)
+        # loop_stats: tick timing, jitter, overruns and time per UAV in waypointFollow/pathFollow
+        self.tick_period = tick_period
+        self.loop_stats = LoopStats(tick_period, len(uavs))
 
     def waypointFollow(self, uav, taskpoint_hover_time=0, dist_err_tol=1.0, angle_err_tol=10, max_vel=5):
 
@@ -39,17 +56,14 @@ class Follow_Path:
         |    | - Check if waypoints are set - No -> Continue
         |    | - Check if finish taskpoint hover time - No -> Continue
         |    | - Check if all waypoints done - Yes - > Land
-        |    Set next waypoint & Rotate (Calculate and update target_yaw)
+        |    Set next waypoint & Rotate (target_yaw: leg heading from the leg table)
         |    |
-        |    moveToPosition (PID update UAV speed according to real-time distance)
+        |    moveToPosition (P control of the UAV speed on the leg length)
         |    | - Check if arrive waypoint (Update waypoint_index) - No -> Continue
         <--- Hover
         """
 
-        # PID parameters (PID not working well!)
-        Kp_vel = 0.5
-        # Limit the min velocity for moveXX cmd. Don't be too slow.
-        min_vel = 0.1 # m/s 
+        # PID parameters (PID not working well!): Kp_vel and min_vel in LegTable.py
         # Rotate time unit:s (let UAV yaw converge to target_yaw)
         rotate_time = 1.5
         
@@ -60,22 +74,21 @@ class Follow_Path:
         # Update UAV status (single UAV)
         AirsimIO.updateUAVWorldPose(self.client, uav)
         # Calculate the command time difference
-        curr_time = datetime.now()
-        time_diff = (curr_time-uav.getCurrentCommandStartTime()).total_seconds()
+        time_diff = AirsimIO.simTime(self.client) - uav.getCurrentCommandStartTime()
 
 
         if uav.getCurrentCommand() == 'hover':
 
-            if taskpoint_hover_time > 0 and uav.getWaypointIndex() in uav.getTaskPointsIndices() and time_diff < taskpoint_hover_time:
+            if taskpoint_hover_time > 0 and uav.isTaskPoint(uav.getWaypointIndex()) and time_diff < taskpoint_hover_time:
                 # Hover not completed
                 return False
             else:
-                if uav.getWaypointIndex() >= len(uav.getWaypoints()):
+                if uav.getWaypointIndex() >= uav.getLegTable().getNumLegs():
                     is_completed = True
                     return is_completed
                 else:
-                    # Calculate target yaw
-                    target_yaw = round(uav.calculateTargetYaw(),0)
+                    # Target yaw: heading of the leg (precomputed, see LegTable.py)
+                    target_yaw = round(uav.getLegTable().heading[uav.getWaypointIndex()],0)
                     uav.setTargetYaw(target_yaw)
                     # Rotate to target yaw
                     AirsimIO.rotateUAVto(self.client, uav, target_yaw)
@@ -89,13 +102,9 @@ class Follow_Path:
             if abs(uav.getTargetYaw()-uav.getCurrWorldPose()[5]) < angle_err_tol:
                 print('{} reached yaw angle {} deg'.format(uav.getName(), uav.getTargetYaw()))
                 # Move to the next waypoint with speed control (PID).
-                next_waypoint = uav.getWaypoints()[uav.getWaypointIndex()]
-                uav_curr_world_pos = uav.getCurrWorldPose()[:3]
-                dist = math.dist(next_waypoint, uav_curr_world_pos)
-                # PID control (P only)
-                vel = min(Kp_vel*dist, max_vel) # limit max speed
-                vel = max(vel, min_vel) # limit min
-                AirsimIO.moveUAVto(self.client, uav, next_waypoint, vel)
+                # PID control (P only) on the leg length, precomputed in the leg table
+                vel = uav.getLegTable().getSpeed(uav.getWaypointIndex(), max_vel)
+                AirsimIO.moveUAVtoWaypoint(self.client, uav, uav.getWaypointIndex(), vel)
                 print('{} starts to move to waypoint {}'.format(uav.getName(), uav.getWaypointIndex()))
             # No completion under this cmd
             return False
@@ -103,7 +112,7 @@ class Follow_Path:
         elif uav.getCurrentCommand() == 'moveToPosition':
             # pull out states to confirm where the drone is at
             uav_curr_world_pos = uav.getCurrWorldPose()[0:3]
-            uav_waypoint = uav.getWaypoints()[uav.getWaypointIndex()][0:3]
+            uav_waypoint = uav.getLegTable().waypoints[uav.getWaypointIndex()]
             proximity_to_waypoint = math.dist(uav_curr_world_pos, uav_waypoint)
             
             # switch the waypoint if arrives at the last one
@@ -114,15 +123,126 @@ class Follow_Path:
             return False
 
 
-    def takeoffAllUAVs(self):
-        # Take off UAVs for those haven't
-        fs = []
-        for uav in self.uavs:
-            if not uav.getTakenOff():
-                fs.append(AirsimIO.takeoffUAV(self.client, uav))
-                uav.setTakenOff(True) 
-        for f in fs:
-            f.join() # wait util all drones take off
+    def pathFollow(self, uav, taskpoint_hover_time=0, dist_err_tol=1.0, angle_err_tol=10, max_vel=5):
+
+        """ 
+        Continuous mode of waypointFollow: the UAV flies through all waypoints up to the
+        next task point (or the last waypoint) in one moveOnPath command, facing the
+        direction of travel, and only stops at task points.
+        Same parameters as waypointFollow (angle_err_tol is not used: no rotate stops).
+
+        Outputs:
+        #   is_completed: whether all the waypoints have been visited
+
+        Mission Process: 
+        ---> Start with hover
+        |    | - Check if finish taskpoint hover time (at the task point just reached) - No -> Continue
+        |    | - Check if all waypoints done - Yes -> Continue
+        |    moveOnPath through waypoint_index ... next stop (leg table)
+        |    | - Update waypoint_index as waypoints are passed
+        |    | - Check if arrive at the stop - No -> Continue
+        <--- Hover
+        """
+
+        dist_err_tol= max(2.0, dist_err_tol)
+
+        # Update UAV status (single UAV)
+        AirsimIO.updateUAVWorldPose(self.client, uav)
+        leg_table = uav.getLegTable()
+
+        if uav.getCurrentCommand() == 'hover':
+            time_diff = AirsimIO.simTime(self.client) - uav.getCurrentCommandStartTime()
+            if taskpoint_hover_time > 0 and leg_table.isTaskPoint(uav.getWaypointIndex()-1) and time_diff < taskpoint_hover_time:
+                # Hover not completed
+                return False
+            if uav.getWaypointIndex() >= leg_table.getNumLegs():
+                is_completed = True
+                return is_completed
+            start = uav.getWaypointIndex()
+            stop = int(leg_table.next_stop[start])
+            vel = leg_table.getPathSpeed(start, stop, max_vel)
+            AirsimIO.moveUAVonPath(self.client, uav, start, stop, vel, self.lookahead)
+            print('{} starts to fly through waypoints {} to {}'.format(uav.getName(), start, stop))
+            return False
+
+        elif uav.getCurrentCommand() == 'moveOnPath':
+            uav_curr_world_pos = uav.getCurrWorldPose()[0:3]
+            index = uav.getWaypointIndex()
+            stop = int(leg_table.next_stop[index])
+            # Waypoints passed on the way to the stop
+            while index < stop and leg_table.isPassed(index, uav_curr_world_pos, dist_err_tol):
+                index += 1
+            if index != uav.getWaypointIndex():
+                uav.setWaypointIndex(index)
+            # Arrived at the stop
+            if index == stop and math.dist(uav_curr_world_pos, leg_table.waypoints[stop]) < dist_err_tol:
+                uav.setWaypointIndex(stop + 1)
+                AirsimIO.hoverUAV(self.client, uav)
+            return False
+
+        return False
+
+
+    def stepAllUAVs(self, taskpoint_hover_time=0, dist_err_tol=1.0, angle_err_tol=10, max_vel=5):
+
+        """ 
+        Vectorized waypointFollow for the whole fleet (needs vectorized=True).
+        Same mission process and parameters as waypointFollow. Distances, yaw errors
+        and arrivals of all UAVs are computed in one pass by FleetState.step();
+        only the UAVs that change command are then handled one by one.
+
+        Outputs:
+        #   is_complete: array, whether each UAV has visited all its waypoints
+        """
+
+        # PID parameters (PID not working well!): Kp_vel and min_vel in LegTable.py
+        dist_err_tol= max(2.0, dist_err_tol)
+
+        # Update UAV status (all UAVs, written into the fleet state arrays)
+        AirsimIO.updateUAVsWorldPose(self.client, self.uavs)
+        step = self.fleet_state.step(0, dist_err_tol, angle_err_tol)
+        curr_time = AirsimIO.simTime(self.client)
+
+        # cmd: hover
+        for slot in np.flatnonzero(self.fleet_state.commandIs("hover") & ~self.getHeld()):
+            uav = self.uavs[slot]
+            time_diff = curr_time - uav.getCurrentCommandStartTime()
+            if taskpoint_hover_time > 0 and uav.isTaskPoint(uav.getWaypointIndex()) and time_diff < taskpoint_hover_time:
+                # Hover not completed
+                continue
+            if step["finished"][slot]:
+                self.is_complete[slot] = True
+                continue
+            # Rotate to target yaw: heading of the leg (precomputed, see LegTable.py)
+            uav.setTargetYaw(round(uav.getLegTable().heading[uav.getWaypointIndex()],0))
+            AirsimIO.rotateUAVto(self.client, uav, uav.getTargetYaw())
+            print('{} starts to rotate to yaw angle {} deg'.format(uav.getName(), round(uav.getTargetYaw(),1)))
+
+        # cmd: rotate, reached target yaw
+        for slot in np.flatnonzero(step["rotated"] & ~self.getHeld()):
+            uav = self.uavs[slot]
+            print('{} reached yaw angle {} deg'.format(uav.getName(), uav.getTargetYaw()))
+            # PID control (P only) on the leg length, precomputed in the leg table
+            vel = uav.getLegTable().getSpeed(uav.getWaypointIndex(), max_vel)
+            AirsimIO.moveUAVtoWaypoint(self.client, uav, uav.getWaypointIndex(), vel)
+            print('{} starts to move to waypoint {}'.format(uav.getName(), uav.getWaypointIndex()))
+
+        # cmd: moveToPosition, arrived at waypoint
+        for slot in np.flatnonzero(step["arrived"]):
+            uav = self.uavs[slot]
+            uav.setWaypointIndex(uav.getWaypointIndex() + 1)
+            AirsimIO.hoverUAV(self.client, uav)
+
+        return self.is_complete
+
+
+    def takeoffAllUAVs(self, timeout=20):
+        # Take off UAVs for those haven't, all at once, and wait until all of them have taken off
+        uavs = [uav for uav in self.uavs if not uav.getTakenOff()]
+        if uavs:
+            AirsimIO.takeoffAllUAVs(self.client, uavs, timeout=timeout)
+            for uav in uavs:
+                uav.setTakenOff(True)
         print('all uavs have taken off.')
 
 
@@ -146,14 +266,60 @@ class Follow_Path:
         self.takeoffAllUAVs()
         self.hoverAllUAVs()
 
-        # Waypoint Following
-        while self.getSimCompleted() == False:
+        # Waypoint Following: one step per tick_period, sleeping only for what is left of the period
+        loop = FixedRateLoop(self.tick_period, self.loop_stats,
+                             lambda: AirsimIO.simTime(self.client), lambda dt: AirsimIO.simSleep(self.client, dt),
+                             "Follow_Path", uav_names=[uav.getName() for uav in self.uavs])
+        loop.run(self.stepSimulation)
 
-            for idx, uav in enumerate(self.uavs):
-                is_complete = self.waypointFollow(uav)
-                self.is_complete[idx] = is_complete
+        return self.getSimCompleted()
+
+    # Mask of the UAVs held by the separation monitor (none without monitor)
+    def getHeld(self):
+        if self.separation is None:
+            return np.zeros(len(self.uavs), dtype=bool)
+        return self.separation.getHeld()
 
-            # Delay
-            time.sleep(0.1)
+    # Checks separation with the poses of this tick and holds the yielding UAVs:
+    # moving/rotating ones are stopped in hover, hovering ones are skipped until the conflict clears
+    def checkSeparation(self):
+        if self.fleet_state is not None:
+            positions = self.fleet_state.curr_world_pose[:, 0:3]
+        else:
+            positions = [uav.getCurrWorldPose()[0:3] for uav in self.uavs]
+        self.separation.update(positions, AirsimIO.simTime(self.client))
+        for slot in np.flatnonzero(self.separation.getHeld()):
+            uav = self.uavs[slot]
+            if uav.getCurrentCommand() in ("rotateToYaw", "moveToPosition", "moveOnPath"):
+                AirsimIO.hoverUAV(self.client, uav)
+                print('{} holds for separation'.format(uav.getName()))
 
+    # One control tick for all UAVs
+    # follow_kwargs: parameters of waypointFollow/stepAllUAVs/pathFollow (taskpoint_hover_time, dist_err_tol, ...)
+    def stepSimulation(self, **follow_kwargs):
+        if self.continuous:
+            held = self.getHeld()
+            for idx, uav in enumerate(self.uavs):
+                if held[idx]:
+                    AirsimIO.updateUAVWorldPose(self.client, uav)
+                    continue
+                t0 = time.perf_counter()
+                self.is_complete[idx] = self.pathFollow(uav, **follow_kwargs)
+                self.loop_stats.addUAVTime(idx, time.perf_counter() - t0)
+        elif self.fleet_state is not None:
+            self.stepAllUAVs(**follow_kwargs)
+        else:
+            held = self.getHeld()
+            for idx, uav in enumerate(self.uavs):
+                if held[idx]:
+                    AirsimIO.updateUAVWorldPose(self.client, uav)
+                    continue
+                t0 = time.perf_counter()
+                is_complete = self.waypointFollow(uav, **follow_kwargs)
+                self.loop_stats.addUAVTime(idx, time.perf_counter() - t0)
+                self.is_complete[idx] = is_complete
+        if self.separation is not None:
+            self.checkSeparation()
+        if self.recorder is not None:
+            self.recorder.record(AirsimIO.simTime(self.client))
         return self.getSimCompleted()
\ No newline at end of file
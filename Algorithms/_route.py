@@ -0,0 +1,150 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Per-UAV route optimisation
+# Reorders the waypoints of a route to shorten it, keeping
+# the first and last points in place (open TSP path).
+#   1. nearest-neighbour seed
+#   2. 2-opt (reverse a segment) and Or-opt (move a segment of
+#      1 to 3 points, optionally reversed) local search until
+#      no move shortens the route
+# The distance matrix is computed once per route and every
+# move is evaluated against all positions at once in NumPy.
+# Usage Example
+# order = optimiseRoute(points)             # points[order] is the new route
+# optimiseUAVRoute(uav, fixed_start=2)      # also remaps the task point indices
+# ========================================================= #
+
+import time
+import numpy as np
+
+from Algorithms._allocation import distanceMatrix
+
+
+EPS = 1e-9   # Minimum gain (m) for a move to be applied
+
+
+# ===== Route =====
+# Length of the route visiting points in 'order'
+def pathLength(dist, order):
+    order = np.asarray(order)
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+# Nearest-neighbour order from order[0] to order[-1] (both fixed)
+def nearestNeighbourOrder(dist):
+    n = len(dist)
+    if n <= 3:
+        return np.arange(n)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = visited[n-1] = True
+    order = np.empty(n, dtype=np.int64)
+    order[0], order[n-1] = 0, n-1
+    current = 0
+    for k in range(1, n-1):
+        row = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(row))
+        visited[current] = True
+        order[k] = current
+    return order
+
+
+# One pass of 2-opt over every position. Returns the new order and the number of applied moves
+# Reversing order[i+1:j+1] replaces edges (a,b) + (c,d) by (a,c) + (b,d)
+def twoOptPass(dist, order):
+    n = len(order)
+    moves = 0
+    for i in range(0, n-3):
+        a, b = order[i], order[i+1]
+        c = order[i+2:n-1]
+        d = order[i+3:n]
+        gain = dist[a, b] + dist[c, d] - dist[a].take(c) - dist[b].take(d)
+        k = int(np.argmax(gain))
+        if gain[k] > EPS:
+            j = i + 2 + k
+            order[i+1:j+1] = order[i+1:j+1][::-1].copy()
+            moves += 1
+    return order, moves
+
+
+# One pass of Or-opt over every position. Returns the new order and the number of applied moves
+# The segment order[i:i+length] is removed and inserted, forwards or reversed, in another edge (c,d) of the route
+def orOptPass(dist, order, max_segment=3):
+    moves = 0
+    for length in range(1, max_segment+1):
+        c, d = order[:-1], order[1:]
+        edge = dist[c, d]
+        i = 1
+        while i + length <= len(order) - 1:
+            s0, s1 = order[i], order[i+length-1]
+            prev, nxt = order[i-1], order[i+length]
+            removal_gain = edge[i-1] + edge[i+length-1] - dist[prev, nxt]
+            # Rows of the (symmetric) matrix: contiguous reads instead of 2D fancy indexing
+            forward = dist[s0].take(c) + dist[s1].take(d) - edge
+            backward = dist[s1].take(c) + dist[s0].take(d) - edge
+            cost = np.minimum(forward, backward)
+            cost[i-1:i+length] = np.inf   # Edges touching the segment
+            k = int(np.argmin(cost))
+            if removal_gain - cost[k] > EPS:
+                segment = order[i:i+length]
+                if backward[k] < forward[k]:
+                    segment = segment[::-1]
+                if k < i:
+                    order = np.concatenate((order[:k+1], segment, order[k+1:i], order[i+length:]))
+                else:
+                    order = np.concatenate((order[:i], order[i+length:k+1], segment, order[k+1:]))
+                c, d = order[:-1], order[1:]
+                edge = dist[c, d]
+                moves += 1
+            else:
+                i += 1
+    return order, moves
+
+
+# Optimised visiting order of 'points' (K,3+) with points[0] and points[-1] fixed
+# max_passes: limit of 2-opt + Or-opt passes, time_limit: seconds (None: until no move improves the route)
+def optimiseRoute(points, max_passes=50, time_limit=None, dist=None):
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n <= 3:
+        return np.arange(n)
+    if dist is None:
+        dist = distanceMatrix(points, points)
+    order = nearestNeighbourOrder(dist)
+    t_start = time.perf_counter()
+    for _ in range(max_passes):
+        order, two_opt_moves = twoOptPass(dist, order)
+        order, or_opt_moves = orOptPass(dist, order)
+        if two_opt_moves + or_opt_moves == 0:
+            break
+        if time_limit is not None and time.perf_counter() - t_start > time_limit:
+            break
+    return order
+
+
+# ===== UAV =====
+# Reorders the waypoints of a UAV. The first 'fixed_start' and last 'fixed_end' waypoints keep their place
+# (e.g. fixed_start=2 for a route starting on the ground and climbing above its start point).
+# Task point indices are remapped to the new positions of the same points.
+# Must be called before the mission starts (the waypoint index is not remapped).
+# Returns the new order: new waypoint k is old waypoint order[k]
+def optimiseUAVRoute(uav, fixed_start=1, fixed_end=1, **kwargs):
+    waypoints = uav.getWaypoints()
+    n = len(waypoints)
+    fixed_start, fixed_end = max(fixed_start, 1), max(fixed_end, 1)
+    if n - fixed_start - fixed_end < 2:
+        return np.arange(n)
+    # Sub-route from the last fixed start point to the first fixed end point
+    first, last = fixed_start - 1, n - fixed_end
+    points = np.asarray([wp[0:3] for wp in waypoints[first:last+1]], dtype=float)
+    sub_order = optimiseRoute(points, **kwargs) + first
+    order = np.concatenate((np.arange(first), sub_order, np.arange(last+1, n)))
+
+    new_index = np.empty(n, dtype=np.int64)
+    new_index[order] = np.arange(n)
+    uav.setWaypoints([waypoints[k] for k in order])
+    uav.setTaskPointsIndices(sorted(int(new_index[k]) for k in uav.getTaskPointsIndices()))
+    return order
@@ -3,16 +3,27 @@
 # Cranfield University - DARTeC                  
 # ========================================================= #
 import os, sys
+import numpy as np
 
 parent_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 sys.path.append(parent_dir)
 
+from Algorithms._allocation import allocateTasks
+from Algorithms._route import optimiseUAVRoute
+import MissionFile
+
 
 class Get_Waypoints:
     def __init__(self, uavs):
         self.uavs = uavs
+        self.mission = None
     
     def initWaypoints(self, waypoint_file=None):
+        # waypoint_file: mission file (.csv, .json or .mission, see MissionFile.py)
+        if waypoint_file is not None:
+            self.mission = MissionFile.loadMission(waypoint_file)
+            return
+
         # hand code the waypoints
         point_1_0 = [0,0,0]
         point_1_1 = [0,0,-3]
@@ -35,6 +46,11 @@ class Get_Waypoints:
     
     def initPathForAllUavs(self):
 
+        if self.mission is not None:
+            n_set = self.mission.applyToUAVs(self.uavs)
+            print('route for {} uavs is initiated from the mission file.'.format(n_set))
+            return
+
         self.uavs[0].setWaypoints(self.points_1)
         self.uavs[1].setWaypoints(self.points_2)
 
@@ -44,3 +60,25 @@ class Get_Waypoints:
         print('route for each uav is initiated.')
 
 
+    def initPathsFromTasks(self, task_points, objective="makespan", method="auto", altitude=-3):
+        # Allocate task points (World frame NED) to all UAVs and set their routes:
+        # start (ground) -> above start -> allocated task points -> above start
+        # objective: "makespan" or "total", method: "auto", "exact" or "greedy" (see _allocation.py)
+        starts = np.array([uav.getInitPose()[0:3] for uav in self.uavs], dtype=float)
+        tasks = np.asarray(task_points, dtype=float)
+        allocation = allocateTasks(starts, tasks, objective, method)
+        for uav, start, task_indices in zip(self.uavs, starts, allocation):
+            above_start = [start[0], start[1], altitude]
+            waypoints = [list(start), above_start] + [list(tasks[t, 0:3]) for t in task_indices] + [above_start]
+            uav.setWaypoints(waypoints)
+            uav.setTaskPointsIndices(list(range(2, 2+len(task_indices))))
+        print('tasks are allocated to {} uavs.'.format(len(self.uavs)))
+        return allocation
+
+
+    def optimisePaths(self, fixed_start=2, fixed_end=1, **kwargs):
+        # Reorder the waypoints of every UAV to shorten its route (see _route.py)
+        # The first 'fixed_start' and last 'fixed_end' waypoints keep their place
+        for uav in self.uavs:
+            optimiseUAVRoute(uav, fixed_start, fixed_end, **kwargs)
+        print('route for each uav is optimised.')
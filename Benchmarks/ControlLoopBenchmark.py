@@ -0,0 +1,195 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Control loop benchmark
+# Runs the Follow_Path and waypointVisitingAllUAVs control
+# loops against FakeAirsim (ManualClock, no simulator) for
+# growing fleet sizes and reports per-tick latency
+# percentiles, RPCs per tick, allocations and mission time
+# (mission_sim_s: simulated mission duration, e.g. stop-and-go
+# Follow_Path vs Follow_Path_continuous on the same routes).
+# Usage Example (from the repository root)
+# python Benchmarks/ControlLoopBenchmark.py --sizes 5,50,200,1000 --output bench.json
+# ========================================================= #
+
+import os, sys
+import argparse
+import contextlib
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(parent_dir)
+
+import AirsimIO
+import FakeAirsim
+import UAV
+from Algorithms._path_follow import Follow_Path
+from Algorithms.Control.WaypointVisiting.WaypointVisiting import waypointVisitingAllUAVs
+
+
+# ===== Fleet and mission =====
+# Same start grid as init.createUAVs, same square route for every UAV around its start point
+def createFleet(n_uavs):
+    uavs = []
+    for u in range(n_uavs):
+        X = 5*int(u/5)
+        Y = 5*(u%5)
+        uavs.append(UAV.UAV(u+1, "UAV_"+str(u+1), [X,Y,0,0,0,0]))
+    return uavs
+
+
+def assignSquareRoutes(uavs, side=10, alt=-3):
+    for uav in uavs:
+        x, y = uav.getInitPose()[0], uav.getInitPose()[1]
+        uav.setWaypoints([[x, y, 0], [x, y, alt], [x+side, y, alt], [x+side, y+side, alt], [x, y+side, alt], [x, y, alt]])
+        uav.setTaskPointsIndices([2, 4])
+
+
+# ===== Statistics =====
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values)-1, max(0, int(round(p/100.0*(len(sorted_values)-1)))))
+    return sorted_values[k]
+
+
+def summariseTicks(tick_times):
+    values = sorted(tick_times)
+    return {"ticks": len(values),
+            "mean_ms": 1000*sum(values)/len(values) if values else 0.0,
+            "p50_ms": 1000*percentile(values, 50),
+            "p90_ms": 1000*percentile(values, 90),
+            "p99_ms": 1000*percentile(values, 99),
+            "max_ms": 1000*values[-1] if values else 0.0}
+
+
+# ===== Control loops =====
+# One tick of Follow_Path.runSimulation (without its fixed sleep)
+def followPathTick(path_following):
+    return path_following.stepSimulation()
+
+
+def runFollowPath(client, uavs, tick_dt, max_ticks, tick_times, vectorized=False, continuous=False):
+    path_following = Follow_Path(client, uavs, vectorized, continuous=continuous)
+    AirsimIO.armEnableAllUAVs(client, uavs)
+    path_following.takeoffAllUAVs()
+    path_following.hoverAllUAVs()
+    completed = False
+    while not completed and len(tick_times) < max_ticks:
+        t0 = time.perf_counter()
+        completed = followPathTick(path_following)
+        tick_times.append(time.perf_counter()-t0)
+        client.clock.advance(tick_dt)
+    return completed
+
+
+def runFollowPathVectorized(client, uavs, tick_dt, max_ticks, tick_times):
+    return runFollowPath(client, uavs, tick_dt, max_ticks, tick_times, vectorized=True)
+
+
+def runFollowPathContinuous(client, uavs, tick_dt, max_ticks, tick_times):
+    return runFollowPath(client, uavs, tick_dt, max_ticks, tick_times, continuous=True)
+
+
+def runWaypointVisiting(client, uavs, tick_dt, max_ticks, tick_times):
+    AirsimIO.armEnableAllUAVs(client, uavs)
+    for f in [AirsimIO.takeoffUAV(client, uav) for uav in uavs]:
+        f.join()
+    AirsimIO.hoverAllUAVs(client, uavs)
+    completed = False
+    while not completed and len(tick_times) < max_ticks:
+        t0 = time.perf_counter()
+        completed = waypointVisitingAllUAVs(client, uavs)
+        tick_times.append(time.perf_counter()-t0)
+        client.clock.advance(tick_dt)
+    return completed
+
+
+entry_points = {"Follow_Path": runFollowPath,
+                "Follow_Path_vectorized": runFollowPathVectorized,
+                "Follow_Path_continuous": runFollowPathContinuous,
+                "waypointVisitingAllUAVs": runWaypointVisiting}
+
+
+# ===== Benchmark =====
+# Runs one entry point for one fleet size. Allocations are measured in a separate, shorter traced run
+# so that tracemalloc does not distort the latency figures.
+def benchmark(entry_point, n_uavs, tick_dt=0.1, max_ticks=5000, alloc_ticks=20):
+    run = entry_points[entry_point]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # Timed run
+        client = FakeAirsim.FakeMultirotorClient(clock=FakeAirsim.ManualClock())
+        uavs = createFleet(n_uavs)
+        assignSquareRoutes(uavs)
+        tick_times = []
+        t0 = time.perf_counter()
+        completed = run(client, uavs, tick_dt, max_ticks, tick_times)
+        wall_time = time.perf_counter()-t0
+        loop_rpcs = sum(client.rpc_counts.values())
+
+        # Allocation run
+        client_alloc = FakeAirsim.FakeMultirotorClient(clock=FakeAirsim.ManualClock())
+        uavs_alloc = createFleet(n_uavs)
+        assignSquareRoutes(uavs_alloc)
+        alloc_tick_times = []
+        tracemalloc.start()
+        run(client_alloc, uavs_alloc, tick_dt, alloc_ticks, alloc_tick_times)
+        alloc_current, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = {"entry_point": entry_point,
+              "n_uavs": n_uavs,
+              "completed": bool(completed),
+              "mission_wall_s": wall_time,
+              "mission_sim_s": client.clock.now(),
+              "rpcs_total": loop_rpcs,
+              "rpcs_per_tick": loop_rpcs/len(tick_times) if tick_times else 0.0,
+              "rpc_counts": dict(client.rpc_counts),
+              "alloc_peak_kb": alloc_peak/1024,
+              "alloc_ticks": len(alloc_tick_times)}
+    result.update(summariseTicks(tick_times))
+    return result
+
+
+def printResult(result):
+    print("{:<24} {:>5} UAVs  ticks {:>5}  p50 {:>8.2f} ms  p99 {:>8.2f} ms  rpc/tick {:>8.1f}  peak {:>9.1f} KiB  wall {:>7.2f} s  mission {:>7.1f} s{}".format(
+        result["entry_point"], result["n_uavs"], result["ticks"], result["p50_ms"], result["p99_ms"],
+        result["rpcs_per_tick"], result["alloc_peak_kb"], result["mission_wall_s"], result["mission_sim_s"],
+        "" if result["completed"] else "  (not completed)"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Control loop benchmark against FakeAirsim")
+    parser.add_argument("--sizes", default="5,50,200,1000", help="comma separated fleet sizes")
+    parser.add_argument("--entry-points", default=",".join(entry_points), help="comma separated: " + ", ".join(entry_points))
+    parser.add_argument("--tick", type=float, default=0.1, help="simulated seconds per control tick")
+    parser.add_argument("--max-ticks", type=int, default=5000)
+    parser.add_argument("--output", default=None, help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for entry_point in args.entry_points.split(","):
+        for n_uavs in [int(n) for n in args.sizes.split(",")]:
+            result = benchmark(entry_point, n_uavs, args.tick, args.max_ticks)
+            printResult(result)
+            results.append(result)
+
+    report = {"timestamp": str(datetime.now()),
+              "python": platform.python_version(),
+              "machine": platform.machine(),
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Import-time budget check
+# Imports each framework module in a fresh interpreter and
+# checks that:
+#   - the import takes less than the budget
+#   - no heavy module (airsim, cv2, ...) is imported
+#   - importing init does not connect to the simulator
+# Exits with status 1 on any violation, so it can run in CI.
+# Usage Example (from the repository root)
+# python Benchmarks/ImportBudget.py --budget 0.5
+# python -X importtime -c "import init"   # to find the culprit
+# ========================================================= #
+
+import os, sys
+import argparse
+import json
+import subprocess
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+modules = ["AirsimIO", "UAV", "Sensor", "FakeAirsim", "FleetState", "Separation", "MissionFile",
+           "FlightRecorder", "Replay", "init", "Algorithms._path_follow", "Algorithms._wpts"]
+heavy_modules = ["airsim", "cv2", "msgpackrpc", "tornado"]
+
+# Run in the child interpreter: time of the import, heavy modules loaded, client connected (init only)
+probe = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module} as m
+t = time.perf_counter() - t0
+client = getattr(m, "client", None)
+connected = client.isCreated() if hasattr(client, "isCreated") else None
+print(json.dumps({{"seconds": t, "heavy": [name for name in {heavy} if name in sys.modules], "connected": connected}}))
+"""
+
+
+def measure(module):
+    code = probe.format(module=module, heavy=repr(heavy_modules))
+    output = subprocess.run([sys.executable, "-c", code], cwd=parent_dir, capture_output=True, text=True)
+    if output.returncode != 0:
+        return {"seconds": None, "heavy": [], "connected": None, "error": output.stderr.strip().splitlines()[-1:]}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--budget", type=float, default=0.5, help="max seconds per module import")
+    parser.add_argument("--modules", default=",".join(modules), help="comma separated modules")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module in args.modules.split(","):
+        result = measure(module)
+        problems = []
+        if result.get("error"):
+            problems.append("import failed: " + " ".join(result["error"]))
+        else:
+            if result["seconds"] > args.budget:
+                problems.append("over budget")
+            if result["heavy"]:
+                problems.append("imports " + ", ".join(result["heavy"]))
+            if result["connected"]:
+                problems.append("connects to the simulator")
+        failures += bool(problems)
+        seconds = "{:7.3f} s".format(result["seconds"]) if result["seconds"] is not None else "      -  "
+        print("{:<28} {}  {}".format(module, seconds, "; ".join(problems) if problems else "ok"))
+    print("{} module(s) failed the import budget of {} s".format(failures, args.budget) if failures else "all imports within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Monte Carlo mission sweep
+# Runs many missions against FakeAirsim (ManualClock, no
+# simulator), spread over a process pool. Every run has its
+# own seed (random routes and pose noise) and parameter set,
+# and returns one row of the results table:
+#   mission time, arrival errors, near misses, min separation
+#   (min_separation: closest pair distance below near_miss,
+#   inf if no pair ever came that close)
+# Grid: "name=v1,v2;name=v1,v2", every combination is run
+# once per seed. Parameters (defaults in default_params):
+#   controller: Follow_Path, Follow_Path_continuous, waypointVisiting
+#   taskpoint_hover_time, dist_err_tol, angle_err_tol, max_vel, Kp_vel (UAV.setKpVel),
+#   n_uavs, n_waypoints, n_tasks, position_noise, near_miss, ...
+# NOTE: the controllers clamp dist_err_tol (Follow_Path: 2 m
+# minimum, waypointVisiting: 0.5 m), smaller values change nothing.
+# Usage Example (from the repository root)
+# python Benchmarks/MissionSweep.py --grid "controller=Follow_Path,Follow_Path_continuous;max_vel=3,5,8;Kp_vel=0.3,0.5,1" --seeds 10 --output sweep.csv
+# ========================================================= #
+
+import os, sys
+import argparse
+import csv
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(parent_dir)
+
+import AirsimIO
+import FakeAirsim
+import logFunctions as log
+import numpy as np
+import UAV
+from Separation import SpatialGrid
+from Algorithms._path_follow import Follow_Path
+from Algorithms.Control.WaypointVisiting.WaypointVisiting import waypointVisitingAllUAVs
+
+
+default_params = {"controller": "Follow_Path",
+                  "n_uavs": 5,
+                  "n_waypoints": 6,        # random waypoints per UAV (plus climb and return above the start)
+                  "n_tasks": 2,            # task points among them
+                  "route_radius": 15.0,    # m, waypoints are drawn within this distance of the start point
+                  "taskpoint_hover_time": 0.0,  # s (simulation time)
+                  "dist_err_tol": 1.0,
+                  "angle_err_tol": 10.0,
+                  "max_vel": 5.0,
+                  "Kp_vel": 0.5,
+                  "position_noise": 0.05,  # m, std of the reported position noise
+                  "near_miss": 2.0,        # m, pairs closer than this count as a near miss
+                  "tick": 0.1,             # s, simulated time per control tick
+                  "max_ticks": 5000}
+
+
+# ===== Configurations =====
+def parseValue(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+# "a=1,2;b=x" -> {"a": [1, 2], "b": ["x"]}
+def parseGrid(text):
+    grid = {}
+    for item in filter(None, [part.strip() for part in (text or "").split(";")]):
+        name, values = item.split("=", 1)
+        grid[name.strip()] = [parseValue(v.strip()) for v in values.split(",")]
+    return grid
+
+
+# One config per combination of grid values and seed
+def expandConfigs(grid, seeds, base_seed=0):
+    names = list(grid)
+    configs = []
+    for values in itertools.product(*[grid[name] for name in names]):
+        for s in range(seeds):
+            config = dict(default_params)
+            config.update(zip(names, values))
+            config["run"] = len(configs)
+            config["seed"] = base_seed + s
+            configs.append(config)
+    return configs
+
+
+# ===== Mission =====
+# Same start grid as init.createUAVs, random route per UAV: climb, n_waypoints points around the start, return
+def createMission(config, rng):
+    uavs = []
+    for u in range(config["n_uavs"]):
+        x, y = 5*int(u/5), 5*(u%5)
+        uav = UAV.UAV(u+1, "UAV_"+str(u+1), [x, y, 0, 0, 0, 0])
+        waypoints = [[x, y, -3.0]]
+        for _ in range(config["n_waypoints"]):
+            r = config["route_radius"]*math.sqrt(rng.random())
+            a = rng.uniform(-math.pi, math.pi)
+            waypoints.append([x + r*math.cos(a), y + r*math.sin(a), -rng.uniform(3.0, 6.0)])
+        waypoints.append([x, y, -3.0])
+        uav.setWaypoints(waypoints)
+        uav.setTaskPointsIndices(sorted(rng.sample(range(1, config["n_waypoints"]+1), min(config["n_tasks"], config["n_waypoints"]))))
+        uav.setKpVel(config["Kp_vel"])   # Per UAV: the LegTable.Kp_vel default is left untouched
+        uavs.append(uav)
+    return uavs
+
+
+def truePositions(client, uavs):
+    return np.array([[client.vehicles[uav.getName()].pos[i] + uav.getInitPose()[i] for i in range(3)] for uav in uavs])
+
+
+# Runs one mission and returns its row of the results table
+def runMission(config):
+    rng = random.Random(config["seed"])
+    t0 = time.perf_counter()
+    client = FakeAirsim.FakeMultirotorClient(clock=FakeAirsim.ManualClock(), position_noise=config["position_noise"],
+                                             seed=config["seed"])
+    uavs = createMission(config, rng)
+    follow_kwargs = {"taskpoint_hover_time": config["taskpoint_hover_time"], "dist_err_tol": config["dist_err_tol"], "angle_err_tol": config["angle_err_tol"],
+                     "max_vel": config["max_vel"]}
+    controller = config["controller"]
+    AirsimIO.armEnableAllUAVs(client, uavs)
+    if controller == "waypointVisiting":
+        for f in [AirsimIO.takeoffUAV(client, uav) for uav in uavs]:
+            f.join()
+        AirsimIO.hoverAllUAVs(client, uavs)
+        step = lambda: waypointVisitingAllUAVs(client, uavs, **follow_kwargs)
+        reached_offset = 0   # waypoint index = last waypoint reached
+    else:
+        path_following = Follow_Path(client, uavs, continuous=(controller == "Follow_Path_continuous"))
+        path_following.takeoffAllUAVs()
+        path_following.hoverAllUAVs()
+        step = lambda: path_following.stepSimulation(**follow_kwargs)
+        reached_offset = -1  # waypoint index = waypoint heading to
+    t_start = client.clock.now()
+
+    grid = SpatialGrid(config["near_miss"])
+    close_pairs = set()
+    near_misses = 0
+    min_separation = float("inf")
+    arrival_errors = []
+    last_index = [uav.getWaypointIndex() for uav in uavs]
+    completed = False
+    ticks = 0
+    while not completed and ticks < config["max_ticks"]:
+        completed = step()
+        ticks += 1
+        positions = truePositions(client, uavs)
+        client.clock.advance(config["tick"])
+        # Arrival error: true distance to each waypoint when the controller counts it as reached
+        for u, uav in enumerate(uavs):
+            index = uav.getWaypointIndex()
+            for k in range(last_index[u] + 1 + reached_offset, index + 1 + reached_offset):
+                arrival_errors.append(math.dist(positions[u], uav.getLegTable().waypoints[k]))
+            last_index[u] = index
+        # Near misses: pairs entering the near_miss distance
+        grid.build(positions)
+        i, j, dist = grid.queryPairs(config["near_miss"])
+        pairs = set(zip(i.tolist(), j.tolist()))
+        near_misses += len(pairs - close_pairs)
+        close_pairs = pairs
+        if len(dist):
+            min_separation = min(min_separation, float(dist.min()))
+
+    result = {name: config[name] for name in config}
+    result.update({"completed": bool(completed),
+                   "ticks": ticks,
+                   "mission_time_s": client.clock.now() - t_start,
+                   "arrival_err_mean": float(np.mean(arrival_errors)) if arrival_errors else float("nan"),
+                   "arrival_err_max": float(np.max(arrival_errors)) if arrival_errors else float("nan"),
+                   "arrivals": len(arrival_errors),
+                   "near_misses": near_misses,
+                   "min_separation": min_separation,
+                   "wall_s": time.perf_counter() - t0})
+    return result
+
+
+# ===== Sweep =====
+# Worker processes: no console output from the UAVs/controllers, only errors in the log
+def _initWorker():
+    sys.stdout = open(os.devnull, "w")
+    log.configure(level="ERROR")
+
+
+# Runs all configs on n_workers processes (1: in this process). Returns the rows in config order
+def sweep(configs, n_workers=None, progress=None):
+    n_workers = n_workers or os.cpu_count() or 1
+    results = []
+    if n_workers == 1:
+        # Same as _initWorker, restored afterwards
+        stdout = sys.stdout
+        level = log.min_level
+        try:
+            sys.stdout = open(os.devnull, "w")
+            log.configure(level="ERROR")
+            for result in map(runMission, configs):
+                results.append(result)
+                if progress:
+                    progress(len(results), len(configs))
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+            log.setLevel(level)
+        return results
+    chunksize = max(1, len(configs) // (n_workers*8))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_initWorker) as executor:
+        for result in executor.map(runMission, configs, chunksize=chunksize):
+            results.append(result)
+            if progress:
+                progress(len(results), len(configs))
+    return results
+
+
+def writeTable(results, path):
+    columns = list(results[0]) if results else []
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+# Mean of the metrics over seeds, one row per parameter set, sorted by mission time
+def summarise(results, grid_names):
+    groups = {}
+    for result in results:
+        groups.setdefault(tuple(result[name] for name in grid_names), []).append(result)
+    summary = []
+    for key, rows in groups.items():
+        row = dict(zip(grid_names, key))
+        row.update({"runs": len(rows),
+                    "completed": sum(r["completed"] for r in rows),
+                    "mission_time_s": float(np.mean([r["mission_time_s"] for r in rows])),
+                    "arrival_err_max": float(np.nanmax([r["arrival_err_max"] for r in rows])),
+                    "near_misses": float(np.mean([r["near_misses"] for r in rows]))})
+        summary.append(row)
+    summary.sort(key=lambda row: (-row["completed"], row["mission_time_s"]))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo mission sweep against FakeAirsim")
+    parser.add_argument("--grid", default="", help='parameter grid, e.g. "max_vel=3,5,8;taskpoint_hover_time=0,2"')
+    parser.add_argument("--seeds", type=int, default=5, help="runs per parameter set")
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--output", default="sweep.csv", help="results table (CSV, one row per run)")
+    parser.add_argument("--top", type=int, default=10, help="parameter sets printed")
+    args = parser.parse_args(argv)
+
+    grid = parseGrid(args.grid)
+    configs = expandConfigs(grid, args.seeds, args.base_seed)
+    t0 = time.perf_counter()
+    results = sweep(configs, args.workers)
+    wall = time.perf_counter() - t0
+    writeTable(results, args.output)
+    print("{} runs in {:.1f} s -> {}".format(len(results), wall, args.output))
+    for row in summarise(results, list(grid))[:args.top]:
+        print("  ".join("{}={}".format(k, round(v, 3) if isinstance(v, float) else v) for k, v in row.items()))
+    return results
+
+
+if __name__ == "__main__":
+    main()
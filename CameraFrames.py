@@ -0,0 +1,99 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Raw camera frames
+# Frames are requested uncompressed (no PNG encode in the
+# simulator, no cv2.imdecode here) and the returned bytes are
+# wrapped with np.frombuffer + reshape: (height, width, 3)
+# uint8 BGR, no copy. All cameras of one vehicle are fetched
+# with a single simGetImages call.
+# A FramePool keeps a ring of preallocated buffers per
+# (vehicle, camera): frames are copied into the next buffer
+# of the ring (one memcpy, no allocation), so they are
+# writable and stay valid for depth-1 further captures.
+# Usage Example
+# pool = FramePool(depth=2)
+# frames = captureFrames(client, "UAV_1", ["Camera_1"], pool)
+# response, frame = frames[0]   # frame.shape == (144, 256, 3)
+# NOTE: without a pool, frames are read-only views into the
+# RPC response.
+# ========================================================= #
+
+import threading
+import numpy as np
+from LazyImport import LazyModule
+
+airsim = LazyModule("airsim")
+
+
+class FramePool:
+
+    # ===== Constructor =====
+    # depth: buffers per camera. A frame is overwritten depth captures later
+    def __init__(self, depth=2):
+        self.depth = max(1, int(depth))
+        self._rings = {}   # (vehicle, camera) -> [buffers, next slot]
+        self._lock = threading.Lock()
+
+    def getDepth(self):
+        return self.depth
+
+    # Next buffer of the ring of key, (re)allocated only when the frame shape changes
+    def getBuffer(self, key, shape):
+        ring = self._rings.get(key)
+        if ring is None or ring[0][0].shape != shape:
+            with self._lock:
+                ring = [[np.empty(shape, dtype=np.uint8) for _ in range(self.depth)], 0]
+                self._rings[key] = ring
+        buffer = ring[0][ring[1]]
+        ring[1] = (ring[1] + 1) % self.depth
+        return buffer
+
+    # Bytes held by the pool
+    def getNumBytes(self):
+        return sum(buffer.nbytes for buffers, _ in self._rings.values() for buffer in buffers)
+
+    def clear(self):
+        with self._lock:
+            self._rings.clear()
+
+
+# Uncompressed scene request of one camera
+# types: module of the request types, airsim or FakeAirsim (see AirsimIO.apiTypes)
+def rawRequest(camera_name, image_type=None, types=None):
+    if types is None:
+        types = airsim
+    if image_type is None:
+        image_type = types.ImageType.Scene
+    return types.ImageRequest(camera_name, image_type, False, False)
+
+
+# (height, width, channels) uint8 view of an uncompressed response, no copy.
+# None if the simulator returned no image (unknown camera, zero size)
+def frameView(response):
+    data = response.image_data_uint8
+    pixels = response.height * response.width
+    if pixels <= 0 or len(data) < pixels:
+        return None
+    return np.frombuffer(data, dtype=np.uint8).reshape(response.height, response.width, len(data) // pixels)
+
+
+# Captures all cameras of one vehicle with one RPC
+# Returns [(response, frame)] in the order of camera_names
+# pool: optional FramePool, frames are copied into its buffers instead of viewing the response
+def captureFrames(client, vehicle_name, camera_names, pool=None, image_type=None):
+    types = getattr(client, "api_types", None) or airsim
+    requests = [rawRequest(camera_name, image_type, types) for camera_name in camera_names]
+    responses = client.simGetImages(requests, vehicle_name=vehicle_name)
+    frames = []
+    for camera_name, response in zip(camera_names, responses):
+        frame = frameView(response)
+        if frame is not None and pool is not None:
+            buffer = pool.getBuffer((vehicle_name, camera_name), frame.shape)
+            np.copyto(buffer, frame)
+            frame = buffer
+        frames.append((response, frame))
+    return frames
@@ -0,0 +1,83 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Pool of AirSim client connections for concurrent polling
+# The msgpack-rpc client inside airsim is not thread safe, so
+# every worker thread owns its own MultirotorClient.
+# The in-process FakeAirsim client is thread safe and holds
+# the whole simulated world: pass it to every worker
+# (client_factory=lambda: fake_client), see init.initClientPool.
+# Usage Example
+# pool = ClientPool(8)
+# AirsimIO.updateUAVsStatusParallel(pool, init.uavs)
+# ...
+# pool.close()
+# ========================================================= #
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import logFunctions as log
+
+
+# Default worker connection. Silent version of AirsimIO.initClient()
+def newAirsimClient():
+    import airsim
+    client = airsim.MultirotorClient()
+    client.confirmConnection()
+    return client
+
+
+class ClientPool:
+
+    # ===== Constructor =====
+    # n_workers: number of threads/connections
+    # client_factory: callable returning the client of a worker, called once in each worker thread
+    def __init__(self, n_workers=8, client_factory=None):
+        self.n_workers = max(1, int(n_workers))
+        self.client_factory = client_factory if client_factory is not None else newAirsimClient
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=self.n_workers,
+                                            thread_name_prefix="AirsimClientPool",
+                                            initializer=self._initWorker)
+        log.logReport("INFO", "AirSim client pool is created with " + str(self.n_workers) + " workers")
+
+    # Runs once in each worker thread
+    def _initWorker(self):
+        self._local.client = self.client_factory()
+
+    # Returns the client owned by the calling worker thread
+    def getClient(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self.client_factory()
+            self._local.client = client
+        return client
+
+    def getNumWorkers(self):
+        return self.n_workers
+
+    def _runChunk(self, function, items):
+        client = self.getClient()
+        return [function(client, item) for item in items]
+
+    # Calls function(client, item) for every item across the workers.
+    # Items are split into one contiguous chunk per worker; results keep the order of items.
+    def map(self, function, items):
+        items = list(items)
+        if not items:
+            return []
+        n_chunks = min(self.n_workers, len(items))
+        chunk_size = -(-len(items) // n_chunks) # ceil
+        futures = [self._executor.submit(self._runChunk, function, items[i:i+chunk_size])
+                   for i in range(0, len(items), chunk_size)]
+        results = []
+        for f in futures:
+            results.extend(f.result())
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        log.logReport("INFO", "AirSim client pool is closed")
@@ -0,0 +1,559 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# In-process stand-in for airsim.MultirotorClient
+# Runs missions headless (no Unreal/AirSim, no GPU) with
+# point-mass kinematics. Only the API surface used by this
+# framework is implemented.
+# Usage Example
+# client = FakeAirsim.FakeMultirotorClient(speed=10)  # 10x faster than real time
+# client = AirsimIO.initClient(fake=True)             # same, through AirsimIO
+# Vehicle poses are relative to each vehicle's start point,
+# exactly like AirSim, so uav.init_pose is still added in AirsimIO.
+# ========================================================= #
+
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# ===== AirSim data types (attribute names match airsim.types) =====
+class Vector3r:
+    def __init__(self, x_val=0.0, y_val=0.0, z_val=0.0):
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+
+
+class Quaternionr:
+    def __init__(self, x_val=0.0, y_val=0.0, z_val=0.0, w_val=1.0):
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+        self.w_val = w_val
+
+
+class Pose:
+    def __init__(self, position_val=None, orientation_val=None):
+        self.position = position_val if position_val is not None else Vector3r()
+        self.orientation = orientation_val if orientation_val is not None else Quaternionr()
+
+
+class CollisionInfo:
+    def __init__(self, has_collided=False):
+        self.has_collided = has_collided
+        self.normal = Vector3r()
+        self.impact_point = Vector3r()
+        self.position = Vector3r()
+        self.penetration_depth = 0.0
+        self.time_stamp = 0
+        self.object_name = ""
+        self.object_id = -1
+
+
+class DistanceSensorData:
+    def __init__(self, time_stamp, distance, min_distance, max_distance):
+        self.time_stamp = time_stamp
+        self.distance = distance
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+
+
+class BarometerData:
+    def __init__(self, time_stamp, altitude, pressure, qnh=1013.25):
+        self.time_stamp = time_stamp
+        self.altitude = altitude
+        self.pressure = pressure
+        self.qnh = qnh
+
+
+class ImuData:
+    def __init__(self, time_stamp, orientation, angular_velocity, linear_acceleration):
+        self.time_stamp = time_stamp
+        self.orientation = orientation
+        self.angular_velocity = angular_velocity
+        self.linear_acceleration = linear_acceleration
+
+
+class GeoPoint:
+    def __init__(self, latitude=0.0, longitude=0.0, altitude=0.0):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+
+
+class GnssReport:
+    def __init__(self, geo_point, time_utc):
+        self.geo_point = geo_point
+        self.eph = 0.0
+        self.epv = 0.0
+        self.velocity = Vector3r()
+        self.fix_type = 3
+        self.time_utc = time_utc
+
+
+class GpsData:
+    def __init__(self, time_stamp, gnss, is_valid=True):
+        self.time_stamp = time_stamp
+        self.gnss = gnss
+        self.is_valid = is_valid
+
+
+class MagnetometerData:
+    def __init__(self, time_stamp, magnetic_field_body):
+        self.time_stamp = time_stamp
+        self.magnetic_field_body = magnetic_field_body
+        self.magnetic_field_covariance = []
+
+
+class LidarData:
+    def __init__(self, point_cloud, time_stamp, pose):
+        self.point_cloud = point_cloud
+        self.time_stamp = time_stamp
+        self.pose = pose
+        self.segmentation = []
+
+
+class ImageResponse:
+    def __init__(self, image_data_uint8, camera_name, width, height, time_stamp, compress=False, image_type=0):
+        self.image_data_uint8 = image_data_uint8
+        self.image_data_float = []
+        self.camera_name = camera_name
+        self.camera_position = Vector3r()
+        self.camera_orientation = Quaternionr()
+        self.time_stamp = time_stamp
+        self.message = ""
+        self.pixels_as_float = False
+        self.compress = compress
+        self.width = width
+        self.height = height
+        self.image_type = image_type
+
+
+class LandedState:
+    Landed = 0
+    Flying = 1
+
+
+class ImageType:
+    Scene = 0
+
+
+class ImageRequest:
+    def __init__(self, camera_name, image_type, pixels_as_float=False, compress=True):
+        self.camera_name = camera_name
+        self.image_type = image_type
+        self.pixels_as_float = pixels_as_float
+        self.compress = compress
+
+
+class DrivetrainType:
+    MaxDegreeOfFreedom = 0
+    ForwardOnly = 1
+
+
+class YawMode:
+    def __init__(self, is_rate=True, yaw_or_rate=0.0):
+        self.is_rate = is_rate
+        self.yaw_or_rate = yaw_or_rate
+
+
+class MultirotorState:
+    def __init__(self, landed_state, timestamp):
+        self.landed_state = landed_state
+        self.timestamp = timestamp
+
+
+# ===== Clocks =====
+# Wall clock scaled by 'speed' (speed=10 runs ten times faster than real time)
+class ScaledClock:
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self._start = time.monotonic()
+
+    def now(self):
+        return (time.monotonic() - self._start) * self.speed
+
+    def sleep(self, dt):
+        time.sleep(dt / self.speed)
+
+
+# Simulation time only moves when advance()/sleep() is called. Deterministic, as fast as the CPU allows
+class ManualClock:
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def advance(self, dt):
+        self.t += dt
+
+    def sleep(self, dt):
+        self.advance(dt)
+
+
+# ===== Futures =====
+# Returned by every *Async call. join() waits (in simulation time) until the command completes
+# or is replaced by a newer command for the same vehicle, like AirSim.
+class FakeFuture:
+    def __init__(self, client, vehicle, cmd_id):
+        self._client = client
+        self._vehicle = vehicle
+        self._cmd_id = cmd_id
+
+    def done(self):
+        with self._client._lock:
+            self._client._advance()
+            return self._vehicle.cmd_id != self._cmd_id or self._vehicle.cmd_done
+
+    def join(self):
+        while not self.done():
+            self._client.clock.sleep(self._client.join_step)
+
+    def result(self):
+        self.join()
+        return True
+
+    get = result
+
+
+# ===== Vehicle state =====
+class _Vehicle:
+    def __init__(self):
+        self.pos = [0.0, 0.0, 0.0]  # Body frame NED, relative to the start point
+        self.yaw = 0.0              # deg
+        self.target = [0.0, 0.0, 0.0]
+        self.path = []              # Points still to fly through after target (moveOnPath)
+        self.face_motion = False    # Yaw follows the direction of travel (moveOnPath)
+        self.target_yaw = None      # deg, None: keep current yaw
+        self.speed = 0.0            # m/s
+        self.landed = True
+        self.landing = False
+        self.cmd_id = 0
+        self.cmd_done = True
+
+
+class FakeMultirotorClient:
+
+    # Module with the request types (Vector3r, ImageRequest, ...) to call this client with, see AirsimIO.apiTypes
+    api_types = sys.modules[__name__]
+
+    # ===== Constructor =====
+    # speed: simulation speed multiplier (ignored if clock is given)
+    # clock: ScaledClock/ManualClock, or any object with now() and sleep(dt)
+    def __init__(self, speed=1.0, clock=None, takeoff_alt=3.0, takeoff_speed=2.0, land_speed=1.0,
+                 home_alt=0.5, yaw_rate=90.0, max_sensor_distance=50.0, position_noise=0.0, seed=None,
+                 camera_width=256, camera_height=144, lidar_points=2000):
+        self.clock = clock if clock is not None else ScaledClock(speed)
+        self.takeoff_alt = takeoff_alt     # m
+        self.takeoff_speed = takeoff_speed # m/s
+        self.land_speed = land_speed       # m/s
+        self.home_alt = home_alt           # m, goHome hovers at this height above home
+        self.yaw_rate = yaw_rate           # deg/s
+        self.max_sensor_distance = max_sensor_distance # m
+        self.position_noise = position_noise # m, std of the Gaussian noise on reported positions
+        self.camera_width = camera_width   # px, frames returned by simGetImages
+        self.camera_height = camera_height # px
+        self.lidar_points = lidar_points   # points per getLidarData scan
+        self.home_geo_point = (47.641468, -122.140165, 122.0)  # latitude, longitude (deg), altitude (m) of z = 0
+        self._rng = random.Random(seed)
+        self.join_step = 0.05              # s (simulation time) between checks in FakeFuture.join()
+        self.vehicles = {}
+        self.rpc_counts = Counter()        # method name -> number of calls
+        self._last_t = self.clock.now()
+        self._lock = threading.RLock()
+
+    # ===== Internals =====
+    def _count(self, method):
+        self.rpc_counts[method] += 1
+
+    def _vehicle(self, vehicle_name):
+        vehicle = self.vehicles.get(vehicle_name)
+        if vehicle is None:
+            vehicle = _Vehicle()
+            self.vehicles[vehicle_name] = vehicle
+        return vehicle
+
+    # Integrates all vehicles up to the current clock time. Constant speed towards the target, so exact for any step.
+    def _advance(self):
+        t = self.clock.now()
+        dt = t - self._last_t
+        if dt <= 0:
+            return
+        self._last_t = t
+        for vehicle in self.vehicles.values():
+            if vehicle.cmd_done:
+                continue
+            # Position (path points are flown through without stopping)
+            step = vehicle.speed * dt
+            while True:
+                delta = [vehicle.target[i] - vehicle.pos[i] for i in range(3)]
+                dist = math.sqrt(delta[0]**2 + delta[1]**2 + delta[2]**2)
+                if vehicle.face_motion and dist > 0:
+                    vehicle.yaw = math.degrees(math.atan2(delta[1], delta[0]))
+                if dist <= step or dist == 0:
+                    vehicle.pos = list(vehicle.target)
+                    if vehicle.path:
+                        step -= dist
+                        vehicle.target = vehicle.path.pop(0)
+                        continue
+                    at_target = True
+                else:
+                    vehicle.pos = [vehicle.pos[i] + delta[i] * step / dist for i in range(3)]
+                    at_target = False
+                break
+            # Yaw
+            if vehicle.target_yaw is not None:
+                yaw_err = (vehicle.target_yaw - vehicle.yaw + 180.0) % 360.0 - 180.0
+                yaw_step = self.yaw_rate * dt
+                if abs(yaw_err) <= yaw_step:
+                    vehicle.yaw = vehicle.target_yaw
+                    at_target_yaw = True
+                else:
+                    vehicle.yaw += math.copysign(yaw_step, yaw_err)
+                    at_target_yaw = False
+            else:
+                at_target_yaw = True
+            if at_target and at_target_yaw:
+                vehicle.cmd_done = True
+                if vehicle.landing:
+                    vehicle.landing = False
+                    vehicle.landed = True
+
+    # Starts a new command on a vehicle. The previous command of that vehicle is replaced.
+    def _command(self, vehicle_name, target=None, speed=0.0, target_yaw=None, landing=False, path=None):
+        with self._lock:
+            self._advance()
+            vehicle = self._vehicle(vehicle_name)
+            vehicle.target = list(target) if target is not None else list(vehicle.pos)
+            vehicle.path = [list(point) for point in path] if path else []
+            vehicle.face_motion = path is not None
+            vehicle.speed = max(float(speed), 0.0)
+            vehicle.target_yaw = target_yaw
+            vehicle.landing = landing
+            if not landing:
+                vehicle.landed = False
+            vehicle.cmd_id += 1
+            vehicle.cmd_done = False
+            self._completeIfAtTarget(vehicle)
+            return FakeFuture(self, vehicle, vehicle.cmd_id)
+
+    # Commands that are already satisfied complete immediately
+    def _completeIfAtTarget(self, vehicle):
+        if vehicle.pos == vehicle.target and not vehicle.path and (vehicle.target_yaw is None or vehicle.target_yaw == vehicle.yaw):
+            vehicle.cmd_done = True
+            if vehicle.landing:
+                vehicle.landing = False
+                vehicle.landed = True
+
+    # ===== Connection / control =====
+    def confirmConnection(self):
+        self._count("confirmConnection")
+        print("Connected to FakeAirsim (headless)")
+
+    def enableApiControl(self, is_enabled, vehicle_name=''):
+        self._count("enableApiControl")
+
+    def armDisarm(self, arm, vehicle_name=''):
+        self._count("armDisarm")
+        return True
+
+    def reset(self):
+        self._count("reset")
+        with self._lock:
+            self.vehicles.clear()
+            self._last_t = self.clock.now()
+
+    # ===== Motions =====
+    def takeoffAsync(self, timeout_sec=20, vehicle_name=''):
+        self._count("takeoffAsync")
+        with self._lock:
+            vehicle = self._vehicle(vehicle_name)
+            target = [vehicle.pos[0], vehicle.pos[1], min(vehicle.pos[2], -self.takeoff_alt)]
+            return self._command(vehicle_name, target, self.takeoff_speed)
+
+    def landAsync(self, timeout_sec=60, vehicle_name=''):
+        self._count("landAsync")
+        with self._lock:
+            vehicle = self._vehicle(vehicle_name)
+            return self._command(vehicle_name, [vehicle.pos[0], vehicle.pos[1], 0.0], self.land_speed, landing=True)
+
+    def hoverAsync(self, vehicle_name=''):
+        self._count("hoverAsync")
+        return self._command(vehicle_name)
+
+    def goHomeAsync(self, timeout_sec=3e+38, vehicle_name=''):
+        self._count("goHomeAsync")
+        return self._command(vehicle_name, [0.0, 0.0, -self.home_alt], self.takeoff_speed)
+
+    def rotateToYawAsync(self, yaw, timeout_sec=3e+38, margin=5, vehicle_name=''):
+        self._count("rotateToYawAsync")
+        return self._command(vehicle_name, target_yaw=float(yaw))
+
+    def moveToPositionAsync(self, x, y, z, velocity, timeout_sec=3e+38, drivetrain=None, yaw_mode=None,
+                            lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        self._count("moveToPositionAsync")
+        return self._command(vehicle_name, [x, y, z], velocity)
+
+    # Flies through the points at constant speed, facing the direction of travel
+    def moveOnPathAsync(self, path, velocity, timeout_sec=3e+38, drivetrain=None, yaw_mode=None,
+                        lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        self._count("moveOnPathAsync")
+        points = [[p.x_val, p.y_val, p.z_val] for p in path]
+        if not points:
+            return self._command(vehicle_name)
+        return self._command(vehicle_name, points[0], velocity, path=points[1:])
+
+    def moveToZAsync(self, z, velocity, timeout_sec=3e+38, yaw_mode=None, lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        self._count("moveToZAsync")
+        with self._lock:
+            vehicle = self._vehicle(vehicle_name)
+            return self._command(vehicle_name, [vehicle.pos[0], vehicle.pos[1], z], velocity)
+
+    # Approximated as a straight move to where the velocity would take the vehicle after 'duration'
+    def moveByVelocityZBodyFrameAsync(self, vx, vy, z, duration, drivetrain=None, yaw_mode=None, vehicle_name=''):
+        self._count("moveByVelocityZBodyFrameAsync")
+        with self._lock:
+            vehicle = self._vehicle(vehicle_name)
+            yaw = math.radians(vehicle.yaw)
+            dx = (vx * math.cos(yaw) - vy * math.sin(yaw)) * duration
+            dy = (vx * math.sin(yaw) + vy * math.cos(yaw)) * duration
+            return self._command(vehicle_name, [vehicle.pos[0] + dx, vehicle.pos[1] + dy, z], math.hypot(vx, vy))
+
+    # ===== State =====
+    def simGetVehiclePose(self, vehicle_name=''):
+        self._count("simGetVehiclePose")
+        with self._lock:
+            self._advance()
+            vehicle = self._vehicle(vehicle_name)
+            half_yaw = math.radians(vehicle.yaw) / 2
+            pos = vehicle.pos
+            if self.position_noise > 0:
+                pos = [p + self._rng.gauss(0.0, self.position_noise) for p in pos]
+            return Pose(Vector3r(*pos), Quaternionr(0.0, 0.0, math.sin(half_yaw), math.cos(half_yaw)))
+
+    def getMultirotorState(self, vehicle_name=''):
+        self._count("getMultirotorState")
+        with self._lock:
+            self._advance()
+            landed = self._vehicle(vehicle_name).landed
+        return MultirotorState(LandedState.Landed if landed else LandedState.Flying, int(self.clock.now() * 1e9))
+
+    def simGetCollisionInfo(self, vehicle_name=''):
+        self._count("simGetCollisionInfo")
+        return CollisionInfo(False)
+
+    # Downward range finder: distance to the ground (z = 0)
+    def getDistanceSensorData(self, distance_sensor_name='', vehicle_name=''):
+        self._count("getDistanceSensorData")
+        with self._lock:
+            self._advance()
+            altitude = -self._vehicle(vehicle_name).pos[2]
+        distance = min(max(altitude, 0.0), self.max_sensor_distance)
+        return DistanceSensorData(int(self.clock.now() * 1e9), distance, 0.0, self.max_sensor_distance)
+
+    # Barometer: altitude above the start point, standard atmosphere pressure
+    def getBarometerData(self, barometer_name='', vehicle_name=''):
+        self._count("getBarometerData")
+        with self._lock:
+            self._advance()
+            altitude = -self._vehicle(vehicle_name).pos[2]
+        pressure = 101325.0 * (1.0 - 2.25577e-5 * altitude) ** 5.25588  # Pa
+        return BarometerData(int(self.clock.now() * 1e9), altitude, pressure)
+
+    # IMU: at rest (gravity only, NED body frame), yaw from the vehicle
+    def getImuData(self, imu_name='', vehicle_name=''):
+        self._count("getImuData")
+        with self._lock:
+            self._advance()
+            half_yaw = math.radians(self._vehicle(vehicle_name).yaw) / 2
+        return ImuData(int(self.clock.now() * 1e9), Quaternionr(0.0, 0.0, math.sin(half_yaw), math.cos(half_yaw)),
+                       Vector3r(), Vector3r(0.0, 0.0, -9.80665))
+
+    # GPS: position around the AirSim default home point (flat earth)
+    def getGpsData(self, gps_name='', vehicle_name=''):
+        self._count("getGpsData")
+        with self._lock:
+            self._advance()
+            pos = list(self._vehicle(vehicle_name).pos)
+        latitude = self.home_geo_point[0] + math.degrees(pos[0] / 6378137.0)
+        longitude = self.home_geo_point[1] + math.degrees(pos[1] / (6378137.0 * math.cos(math.radians(self.home_geo_point[0]))))
+        geo_point = GeoPoint(latitude, longitude, self.home_geo_point[2] - pos[2])
+        return GpsData(int(self.clock.now() * 1e9), GnssReport(geo_point, int(self.clock.now() * 1e3)))
+
+    # Magnetometer: constant field pointing north, rotated into the body frame
+    def getMagnetometerData(self, magnetometer_name='', vehicle_name=''):
+        self._count("getMagnetometerData")
+        with self._lock:
+            self._advance()
+            yaw = math.radians(self._vehicle(vehicle_name).yaw)
+        return MagnetometerData(int(self.clock.now() * 1e9), Vector3r(0.25*math.cos(yaw), -0.25*math.sin(yaw), 0.4))
+
+    # Lidar hitting flat ground (z = 0): points spread over the disk of the ground within max_sensor_distance,
+    # flat list in the vehicle frame like DataFrame "VehicleInertialFrame". [0.0] when the ground is out of range
+    def getLidarData(self, lidar_name='', vehicle_name=''):
+        self._count("getLidarData")
+        with self._lock:
+            self._advance()
+            pos = list(self._vehicle(vehicle_name).pos)
+        altitude = max(-pos[2], 0.0)
+        time_stamp = int(self.clock.now() * 1e9)
+        pose = Pose(Vector3r(*pos), Quaternionr())
+        if altitude >= self.max_sensor_distance:
+            return LidarData([0.0], time_stamp, pose)
+        radius = math.sqrt(self.max_sensor_distance**2 - altitude**2)
+        point_cloud = []
+        for k in range(self.lidar_points):
+            r = radius * math.sqrt((k + 0.5) / self.lidar_points)
+            a = k * 2.399963229728653  # golden angle, rad
+            point_cloud.extend((pos[0] + r*math.cos(a), pos[1] + r*math.sin(a), 0.0))
+        return LidarData(point_cloud, time_stamp, pose)
+
+    # Uncompressed BGR frames, uniform grey shade getting darker with altitude (compressed requests are not supported)
+    def simGetImages(self, requests, vehicle_name='', external=False):
+        self._count("simGetImages")
+        with self._lock:
+            self._advance()
+            altitude = -self._vehicle(vehicle_name).pos[2]
+        shade = int(255 * (1.0 - min(max(altitude, 0.0), self.max_sensor_distance) / self.max_sensor_distance))
+        n_bytes = self.camera_width * self.camera_height * 3
+        time_stamp = int(self.clock.now() * 1e9)
+        return [ImageResponse(bytes([shade]) * n_bytes, request.camera_name, self.camera_width, self.camera_height,
+                              time_stamp, image_type=request.image_type) for request in requests]
+
+    # ===== Plots (recorded in rpc_counts only) =====
+    def simPlotPoints(self, points, color_rgba=[1.0, 0.0, 0.0, 1.0], size=10.0, duration=-1.0, is_persistent=False):
+        self._count("simPlotPoints")
+
+    def simPlotLineStrip(self, points, color_rgba=[1.0, 0.0, 0.0, 1.0], thickness=5.0, duration=-1.0, is_persistent=False):
+        self._count("simPlotLineStrip")
+
+    def simPlotLineList(self, points, color_rgba=[1.0, 0.0, 0.0, 1.0], thickness=5.0, duration=-1.0, is_persistent=False):
+        self._count("simPlotLineList")
+
+    def simPlotStrings(self, strings, positions, scale=5, color_rgba=[1.0, 0.0, 0.0, 1.0], duration=-1.0):
+        self._count("simPlotStrings")
+
+    def simFlushPersistentMarkers(self):
+        self._count("simFlushPersistentMarkers")
+
+    # ===== Weather (no effect) =====
+    def simEnableWeather(self, enable):
+        self._count("simEnableWeather")
+
+    def simSetWeatherParameter(self, param, val):
+        self._count("simSetWeatherParameter")
+
+    def simSetWind(self, wind):
+        self._count("simSetWind")
+
+    def simSetTimeOfDay(self, is_enabled, start_datetime="", is_start_datetime_dst=False, celestial_clock_speed=1,
+                        update_interval_secs=60, move_sun=True):
+        self._count("simSetTimeOfDay")
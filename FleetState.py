@@ -0,0 +1,107 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Structure-of-arrays state of a whole fleet
+# Poses, target yaws, waypoint indices and commands of all
+# UAVs live in contiguous NumPy arrays (one row per UAV).
+# Once attached, the UAV getters return views into these
+# arrays and the setters write into them, so existing code
+# keeps working while step() evaluates the whole fleet in
+# one vectorized pass.
+# Usage Example
+# fleet_state = FleetState(init.uavs)
+# AirsimIO.updateUAVsWorldPose(init.client, init.uavs)
+# step = fleet_state.step(dist_err_tol=2.0, angle_err_tol=10)
+# arrived_slots = np.flatnonzero(step["arrived"])
+# ========================================================= #
+
+import numpy as np
+
+
+# UAV command string <-> integer code
+# New commands are appended so that recorded codes keep their meaning
+commands = ["", "takeoff", "hover", "rotateToYaw", "moveToPosition", "land", "goHome", "moveToZ", "moveByVelZ", "moveOnPath"]
+command_codes = {cmd: code for code, cmd in enumerate(commands)}
+
+
+class FleetState:
+
+    # ===== Constructor =====
+    def __init__(self, uavs):
+        self.uavs = list(uavs)
+        n = len(self.uavs)
+        self.init_pose = np.zeros((n, 6))          # World frame (NED)
+        self.curr_pose = np.zeros((n, 6))          # Body frame (NED), relative to the initial pose
+        self.curr_world_pose = np.zeros((n, 6))    # World frame (NED)
+        self.target_yaw = np.zeros(n)              # deg, World frame
+        self.waypoint_index = np.zeros(n, dtype=np.int64)
+        self.command = np.zeros(n, dtype=np.int16) # see command_codes
+        self.collision = np.zeros(n, dtype=bool)
+        # All waypoints of all UAVs in one (M,3) array. UAV i owns rows wp_start[i] : wp_start[i]+wp_count[i]
+        self.waypoints = np.zeros((0, 3))
+        self.wp_start = np.zeros(n, dtype=np.int64)
+        self.wp_count = np.zeros(n, dtype=np.int64)
+        self.waypoints_dirty = True
+        for slot, uav in enumerate(self.uavs):
+            uav.attachFleetState(self, slot)
+
+    def getNumUAVs(self):
+        return len(self.uavs)
+
+    # Called by UAV.setWaypoints/addWaypoint. The waypoint array is rebuilt on the next step()
+    def markWaypointsDirty(self):
+        self.waypoints_dirty = True
+
+    def rebuildWaypoints(self):
+        counts = np.array([len(uav.getWaypoints()) for uav in self.uavs], dtype=np.int64)
+        self.wp_count = counts
+        self.wp_start = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64) if len(counts) else counts
+        if counts.sum() > 0:
+            self.waypoints = np.concatenate([np.asarray(uav.getWaypoints(), dtype=float)[:, 0:3]
+                                             if len(uav.getWaypoints()) > 0 else np.zeros((0, 3))
+                                             for uav in self.uavs])
+        else:
+            self.waypoints = np.zeros((0, 3))
+        self.waypoints_dirty = False
+
+    # Boolean mask of UAVs running 'cmd'
+    def commandIs(self, cmd):
+        return self.command == command_codes[cmd]
+
+    # ===== Batched mission step =====
+    # Evaluates the whole fleet in one pass.
+    # index_offset: target waypoint = waypoints[waypoint_index + index_offset]
+    #               0 for Follow_Path (index = waypoint heading to), 1 for waypointVisiting (index = last waypoint reached)
+    # Returns a dict of arrays, one entry per UAV:
+    #   has_target:     a target waypoint exists
+    #   target:         (N,3) target waypoint, World frame (NED)
+    #   dist:           distance to the target (inf without target)
+    #   target_heading: heading to the target, deg (same as UAV.calculateTargetYaw)
+    #   yaw_err:        target_yaw - current yaw, deg
+    #   arrived:        moveToPosition and within dist_err_tol of the target
+    #   rotated:        rotateToYaw and within angle_err_tol of target_yaw
+    #   finished:       no waypoint left after the current index
+    def step(self, index_offset=0, dist_err_tol=0.5, angle_err_tol=10):
+        if self.waypoints_dirty:
+            self.rebuildWaypoints()
+        target_index = self.waypoint_index + index_offset
+        has_target = target_index < self.wp_count
+        rows = self.wp_start + np.clip(target_index, 0, np.maximum(self.wp_count - 1, 0))
+        target = np.zeros((len(self.uavs), 3))
+        if len(self.waypoints) > 0:
+            target[has_target] = self.waypoints[rows[has_target]]
+        delta = target - self.curr_world_pose[:, 0:3]
+        dist = np.where(has_target, np.sqrt(np.einsum("ij,ij->i", delta, delta)), np.inf)
+        target_heading = np.rad2deg(np.arctan2(delta[:, 1], delta[:, 0]))
+        yaw_err = self.target_yaw - self.curr_world_pose[:, 5]
+        return {"has_target": has_target,
+                "target": target,
+                "dist": dist,
+                "target_heading": target_heading,
+                "yaw_err": yaw_err,
+                "arrived": self.commandIs("moveToPosition") & (dist < dist_err_tol),
+                "rotated": self.commandIs("rotateToYaw") & (np.abs(yaw_err) < angle_err_tol),
+                "finished": ~has_target}
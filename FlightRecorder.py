@@ -0,0 +1,225 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Telemetry flight recorder
+# record() copies the fleet state of one tick into
+# preallocated chunk buffers (one row per tick, one column
+# per UAV). Full chunks are written by a background thread
+# as one .npy file per column, so the control loop never
+# waits for the disk and RAM holds at most n_buffers chunks.
+# If the writer falls that far behind, ticks are dropped
+# (counted in dropped_ticks, meta.json) until a buffer is free.
+# Files (columnar, memory-mappable with np.load(mmap_mode="r")):
+#   <folder>/meta.json
+#   <folder>/<column>_<chunk>.npy   e.g. world_pose_00003.npy
+# Columns (T: ticks in chunk, N: UAVs, S: max sensors per UAV,
+#          K: widest sensor value, see sensor_widths):
+#   time (T,)  world_pose (T,N,6)  pose (T,N,6)  collision (T,N)
+#   waypoint_index (T,N)  command (T,N)  sensor_value (T,N,S,K)
+# Scalar values (Distance, Barometer) are in [..., 0], vectors
+# (Imu, Gps, Magnetometer) in [..., 0:width], the rest is NaN.
+# Images and point clouds are not recorded (logged once per type).
+# Usage Example
+# recorder = FlightRecorder("flight_logs/run_1", init.uavs)
+# AirsimIO.updateUAVsStatus(init.client, init.uavs, recorder)
+# ...
+# recorder.close()
+# flight_log = FlightLog("flight_logs/run_1")
+# flight_log.getUAVColumn("world_pose", "UAV_1")
+# ========================================================= #
+
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+import logFunctions as log
+import FleetState
+
+
+# Column name -> (shape per UAV, dtype). None: one value per tick
+columns = {"time": (None, np.float64),
+           "world_pose": ((6,), np.float64),
+           "pose": ((6,), np.float64),
+           "collision": ((), np.bool_),
+           "waypoint_index": ((), np.int32),
+           "command": ((), np.int16),
+           "sensor_value": ("sensors", np.float64)}
+
+# Values per reading of the vector sensors (see the readers in AirsimIO.py), other types: 1
+sensor_widths = {"Imu": 6,          # [ax, ay, az, wx, wy, wz]
+                 "Gps": 3,          # [latitude, longitude, altitude]
+                 "Magnetometer": 3} # [x, y, z]
+
+
+class FlightRecorder:
+
+    # ===== Constructor =====
+    # folder: output folder, created if needed
+    # chunk_ticks: ticks per file
+    # n_buffers: chunk buffers in RAM, at most (1 being filled, the others waiting for the writer)
+    def __init__(self, folder, uavs, chunk_ticks=1000, n_buffers=4):
+        self.folder = folder
+        self.uavs = list(uavs)
+        self.chunk_ticks = chunk_ticks
+        self.n_sensors = max([len(uav.getSensors()) for uav in self.uavs] + [0])
+        self.sensor_width = max([sensor_widths.get(sensor.getSensorType(), 1) for uav in self.uavs
+                                 for sensor in uav.getSensors()] + [1])
+        self._skipped_types = set()   # Sensor types whose values could not be recorded (logged once)
+        self.n_chunks = 0
+        self.n_ticks = 0
+        self.dropped_ticks = 0   # Ticks not recorded because every buffer was waiting for the writer
+        os.makedirs(folder, exist_ok=True)
+        self._free = queue.Queue()
+        for _ in range(n_buffers):
+            self._free.put(self._newBuffer())
+        self._buffer = self._free.get()
+        self._row = 0
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._writerLoop, name="FlightRecorder", daemon=True)
+        self._writer.start()
+        self._writeMeta()
+        log.logReport("INFO", "Flight recorder started: " + folder)
+
+    def _newBuffer(self):
+        n = len(self.uavs)
+        buffer = {}
+        for name, (shape, dtype) in columns.items():
+            if shape is None:
+                buffer[name] = np.zeros(self.chunk_ticks, dtype=dtype)
+            elif shape == "sensors":
+                buffer[name] = np.full((self.chunk_ticks, n, self.n_sensors, self.sensor_width), np.nan, dtype=dtype)
+            else:
+                buffer[name] = np.zeros((self.chunk_ticks, n) + shape, dtype=dtype)
+        return buffer
+
+    # Copies the current state of every UAV into the next row.
+    # t: time stamp of the tick (s), default: time.monotonic() (same clock as AirsimIO.simTime for AirSim)
+    def record(self, t=None):
+        if self._buffer is None:
+            try:
+                self._buffer = self._free.get_nowait()
+            except queue.Empty:
+                # Writer is behind and RAM is capped: drop the tick rather than block the control loop
+                self.dropped_ticks += 1
+                return
+        b = self._buffer
+        row = self._row
+        b["time"][row] = time.monotonic() if t is None else t
+        world_pose = b["world_pose"][row]
+        pose = b["pose"][row]
+        sensor_value = b["sensor_value"][row]
+        for i, uav in enumerate(self.uavs):
+            world_pose[i] = uav.getCurrWorldPose()[0:6]
+            pose[i] = uav.getCurrPose()[0:6]
+            b["collision"][row, i] = uav.getCollision()
+            b["waypoint_index"][row, i] = uav.getWaypointIndex()
+            b["command"][row, i] = FleetState.command_codes.get(uav.getCurrentCommand(), -1)
+            for s, sensor in enumerate(uav.getSensors()):
+                value = getattr(sensor, "value", None)
+                if not storeValue(sensor_value[i, s], value) and value is not None:
+                    self._skipSensorType(sensor.getSensorType())
+        self._row += 1
+        self.n_ticks += 1
+        if self._row == self.chunk_ticks:
+            self._submit()
+
+    def _skipSensorType(self, sensor_type):
+        if sensor_type not in self._skipped_types:
+            self._skipped_types.add(sensor_type)
+            log.logReport("WARNING", "Flight recorder: " + sensor_type + " values are not recorded (not numeric or wider than "
+                          + str(self.sensor_width) + ")")
+
+    # Hands the current buffer to the writer and continues in a free one (None: none free yet, see record)
+    def _submit(self):
+        self._pending.put((self.n_chunks, self._buffer, self._row))
+        self.n_chunks += 1
+        try:
+            self._buffer = self._free.get_nowait()
+        except queue.Empty:
+            self._buffer = None
+        self._row = 0
+
+    def _writerLoop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            chunk, buffer, n_rows = item
+            for name, data in buffer.items():
+                np.save(os.path.join(self.folder, "{}_{:05d}.npy".format(name, chunk)), data[:n_rows])
+            if "sensor_value" in buffer:
+                buffer["sensor_value"].fill(np.nan)
+            self._free.put(buffer)
+
+    def _writeMeta(self):
+        meta = {"uavs": [uav.getName() for uav in self.uavs],
+                "init_poses": [list(map(float, uav.getInitPose()[0:6])) for uav in self.uavs],
+                "sensors": [[sensor.getName() for sensor in uav.getSensors()] for uav in self.uavs],
+                "commands": FleetState.commands,
+                "columns": list(columns),
+                "sensor_width": self.sensor_width,
+                "chunk_ticks": self.chunk_ticks,
+                "n_chunks": self.n_chunks,
+                "n_ticks": self.n_ticks,
+                "dropped_ticks": self.dropped_ticks}
+        with open(os.path.join(self.folder, "meta.json"), "w") as file:
+            json.dump(meta, file, indent=4)
+
+    # Writes the partial chunk, waits for the writer and finalises meta.json
+    def close(self):
+        if self._row > 0:
+            self._submit()
+        self._pending.put(None)
+        self._writer.join()
+        self._writeMeta()
+        log.logReport("INFO", "Flight recorder closed: " + str(self.n_ticks) + " ticks in " + str(self.n_chunks) + " chunks, "
+                      + str(self.dropped_ticks) + " dropped")
+
+
+# Copies a numeric sensor value into row (K,): a number into row[0], a list/1-D array of at most K numbers
+# into row[0:len]. Returns False for anything else (images, point clouds, data objects), row is left NaN
+def storeValue(row, value):
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        row[0] = value
+        return True
+    if isinstance(value, (list, tuple, np.ndarray)) and 0 < len(value) <= len(row):
+        values = np.asarray(value)
+        if values.ndim == 1 and values.dtype.kind in "iuf":
+            row[0:len(values)] = values
+            return True
+    return False
+
+
+# ===== Reader =====
+class FlightLog:
+
+    # ===== Constructor =====
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, "meta.json")) as file:
+            self.meta = json.load(file)
+        self.uav_names = self.meta["uavs"]
+
+    def getNumTicks(self):
+        return self.meta["n_ticks"]
+
+    # Memory-mapped chunks of a column, in order
+    def getChunks(self, column):
+        return [np.load(os.path.join(self.folder, "{}_{:05d}.npy".format(column, chunk)), mmap_mode="r")
+                for chunk in range(self.meta["n_chunks"])]
+
+    # Whole column as one array (copies the chunks into RAM)
+    def getColumn(self, column):
+        chunks = self.getChunks(column)
+        return np.concatenate(chunks) if chunks else np.zeros(0)
+
+    # Column of one UAV, e.g. getUAVColumn("world_pose", "UAV_1") -> (T,6)
+    def getUAVColumn(self, column, uav_name):
+        i = self.uav_names.index(uav_name)
+        chunks = self.getChunks(column)
+        return np.concatenate([chunk[:, i] for chunk in chunks]) if chunks else np.zeros(0)
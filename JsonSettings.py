@@ -11,7 +11,6 @@
 # ========================================================= #
 
 # Sensor parameter settings are not ready. 
-# No camera yet. Cameras need special settings
 # Do NOT import init here, otherwise, this file will try to connect with airsim in UE.
 
 import json
@@ -27,6 +26,9 @@ gps_en = 0
 magnetometer_en = 0
 distance_en = 0
 lidar_en = 0
+# Camera resolution, px
+camera_width = 256
+camera_height = 144
 
 settings = {
     "SeeDocsAt":"https://github.com/Microsoft/AirSim/blob/main/docs/settings.md",
@@ -58,8 +60,22 @@ for u in range(n_uavs):
     if camera_en:
         sensor_name = "Camera_" + str(u+1)
         # Modify sensor parameter here
+        # Frames are read uncompressed (width*height*3 bytes per frame and UAV): keep the resolution small for large fleets
         settings["Vehicles"][uav_name]["Cameras"] = {
-            # Camera settings
+            sensor_name: {
+                "CaptureSettings": [{
+                    "ImageType": 0,
+                    "Width": camera_width,
+                    "Height": camera_height,
+                    "FOV_Degrees": 90
+                }],
+                "X": 0.0,
+                "Y": 0.0,
+                "Z": 0.0,
+                "Yaw": 0.0,
+                "Pitch": 0.0,
+                "Roll": 0.0
+            }
         }
     if distance_en:
         sensor_name = "Distance_" + str(u+1)
@@ -77,6 +93,28 @@ for u in range(n_uavs):
             "Roll": 0.0,
             "DrawDebugPoints": False
         }
+    if lidar_en:
+        sensor_name = "Lidar_" + str(u+1)
+        # Modify sensor parameter here
+        # Points in the vehicle frame (start point of the UAV), see PointCloud.py
+        settings["Vehicles"][uav_name]["Sensors"][sensor_name] = {
+            "SensorType": 6,
+            "Enabled": True,
+            "NumberOfChannels": 16,
+            "RotationsPerSecond": 10,
+            "PointsPerSecond": 100000,
+            "Range": 50.0,
+            "VerticalFOVUpper": 15,
+            "VerticalFOVLower": -25,
+            "DataFrame": "VehicleInertialFrame",
+            "X": 0.0,
+            "Y": 0.0,
+            "Z": 0.0,
+            "Yaw": 0.0,
+            "Pitch": 0.0,
+            "Roll": 0.0,
+            "DrawDebugPoints": False
+        }
 
 # Generate json file
 settings_json = json.dumps(settings, indent=4)
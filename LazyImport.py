@@ -0,0 +1,41 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Deferred imports
+# A LazyModule stands in for a heavy module (airsim, cv2) and
+# imports it on first attribute access, so importing the
+# framework does not pay for modules a run never uses.
+# Usage Example
+# cv2 = LazyModule("cv2")
+# image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)   # cv2 is imported here
+# ========================================================= #
+
+import importlib
+import threading
+
+
+class LazyModule:
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def isLoaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return "<lazy module '{}' ({})>".format(self._name, "loaded" if self._module is not None else "not loaded")
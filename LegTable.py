@@ -0,0 +1,92 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Leg table of a UAV route
+# Compiled once when the waypoints (or task points, or the
+# initial pose) change, so that the control loops look up
+# per-leg values instead of recomputing them every tick.
+# Leg k ends at waypoint k and starts at waypoint k-1 (leg 0
+# starts at the initial position):
+#   waypoints   (K,3) World frame (NED)
+#   body_target (K,3) waypoints - init_pose, for moveToPosition
+#   length      (K,)  m
+#   heading     (K,)  deg, World frame, same convention as
+#                     UAV.calculateTargetYaw
+#   direction   (K,3) unit vector of the leg
+#   is_task     (K,)  bool, task point bitmap
+#   next_stop   (K,)  first task point at or after k (last
+#                     waypoint if none), for continuous mode
+# Commanded speeds (P control on the leg length, gain kp_vel
+# of the table, Kp_vel by default) are cached per max_vel.
+# Usage Example
+# leg_table = uav.getLegTable()
+# yaw = leg_table.heading[uav.getWaypointIndex()]
+# vel = leg_table.getSpeed(uav.getWaypointIndex(), max_vel=5)
+# ========================================================= #
+
+import numpy as np
+
+
+# P control of the leg speed, same gains as the control loops
+Kp_vel = 0.5
+min_vel = 0.1   # m/s
+
+
+class LegTable:
+
+    # ===== Constructor =====
+    # kp_vel: speed gain of this route, None: Kp_vel
+    def __init__(self, waypoints, init_pose, task_points_indices, kp_vel=None):
+        if len(waypoints) > 0:
+            self.waypoints = np.array(waypoints, dtype=float)[:, 0:3]
+        else:
+            self.waypoints = np.zeros((0, 3))
+        origin = np.asarray(init_pose, dtype=float)[0:3]
+        self.body_target = self.waypoints - origin
+        starts = np.vstack((origin, self.waypoints[:-1])) if len(self.waypoints) else np.zeros((0, 3))
+        delta = self.waypoints - starts
+        self.length = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        self.heading = np.rad2deg(np.arctan2(delta[:, 1], delta[:, 0]))
+        self.direction = delta / np.maximum(self.length, 1e-9)[:, np.newaxis]
+        self.cum_length = np.cumsum(self.length)
+        self.is_task = np.zeros(len(self.waypoints), dtype=bool)
+        indices = np.asarray(task_points_indices, dtype=np.int64)
+        self.is_task[indices[(indices >= 0) & (indices < len(self.waypoints))]] = True
+        # Next stop: reverse running minimum of the task indices
+        k = len(self.waypoints)
+        stops = np.where(self.is_task, np.arange(k), k-1)
+        self.next_stop = np.minimum.accumulate(stops[::-1])[::-1] if k else np.zeros(0, dtype=np.int64)
+        self.kp_vel = Kp_vel if kp_vel is None else kp_vel
+        self._speeds = {}
+
+    def getNumLegs(self):
+        return len(self.waypoints)
+
+    # Commanded speeds of all legs for max_vel, computed once per max_vel
+    def getSpeeds(self, max_vel):
+        speeds = self._speeds.get(max_vel)
+        if speeds is None:
+            speeds = np.clip(self.kp_vel*self.length, min_vel, max_vel)
+            self._speeds[max_vel] = speeds
+        return speeds
+
+    def getSpeed(self, index, max_vel):
+        return float(self.getSpeeds(max_vel)[index])
+
+    # Commanded speed of a continuous flight through legs start ... end (P control on the total length)
+    def getPathSpeed(self, start, end, max_vel):
+        length = self.cum_length[end] - (self.cum_length[start-1] if start > 0 else 0.0)
+        return float(np.clip(self.kp_vel*length, min_vel, max_vel))
+
+    # Whether a UAV at World position pos has passed waypoint index: within tol of it,
+    # or beyond it along its leg (corners may be cut when flying through)
+    def isPassed(self, index, pos, tol):
+        delta = np.asarray(pos, dtype=float)[0:3] - self.waypoints[index]
+        return bool(np.dot(delta, delta) < tol*tol or np.dot(delta, self.direction[index]) >= 0)
+
+    # Task point test without scanning the indices list. False outside the route
+    def isTaskPoint(self, index):
+        return 0 <= index < len(self.is_task) and bool(self.is_task[index])
@@ -0,0 +1,157 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Control loop timing
+# FixedRateLoop runs a step function on a fixed-rate grid of
+# deadlines (start + k*period, like Scheduler.py) and sleeps
+# only for what is left of the period after each tick. Ticks
+# that run past the next deadline are overruns; the deadlines
+# they missed are skipped, the loop continues on the grid.
+# LoopStats keeps rolling statistics over the last ticks:
+#   achieved rate, jitter (std of the tick start intervals),
+#   tick wall time (mean/p99/max), overruns, missed deadlines,
+#   time per UAV spent in the control function
+# and FixedRateLoop logs them every log_interval seconds.
+# Usage Example
+# loop = FixedRateLoop(0.1, LoopStats(0.1, len(uavs)), name="Follow_Path")
+# loop.run(path_following.stepSimulation)   # until it returns True
+# print(loop.getStats().getStats())
+# ========================================================= #
+
+import math
+import time
+from collections import deque
+import numpy as np
+import logFunctions as log
+
+
+class LoopStats:
+
+    # ===== Constructor =====
+    # period: s, target tick period
+    # n_uavs: number of UAVs timed with addUAVTime (0: none)
+    # window: ticks in the rolling statistics
+    def __init__(self, period, n_uavs=0, window=100):
+        self.period = period
+        self.window = window
+        self.tick_times = deque(maxlen=window)      # s, wall time of the last ticks
+        self.start_times = deque(maxlen=window+1)   # s, loop clock at the start of the last ticks
+        self.ticks = 0
+        self.overruns = 0        # Ticks that ended after the next deadline
+        self.missed = 0          # Deadlines skipped because of overruns
+        self.max_lateness = 0.0  # s, tick start - deadline
+        self.uav_time = np.zeros(n_uavs)       # s, total time in the control function per UAV
+        self.uav_max_time = np.zeros(n_uavs)   # s
+        self.uav_calls = np.zeros(n_uavs, dtype=np.int64)
+
+    # start: loop clock at the start of the tick, tick_time: wall time of the tick
+    def addTick(self, start, tick_time, lateness=0.0, overrun=False, missed=0):
+        self.ticks += 1
+        self.tick_times.append(tick_time)
+        self.start_times.append(start)
+        self.overruns += overrun
+        self.missed += missed
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+
+    def addUAVTime(self, slot, seconds):
+        self.uav_time[slot] += seconds
+        self.uav_calls[slot] += 1
+        if seconds > self.uav_max_time[slot]:
+            self.uav_max_time[slot] = seconds
+
+    # Achieved rate over the window, Hz (0: less than two ticks)
+    def getRate(self):
+        if len(self.start_times) < 2 or self.start_times[-1] <= self.start_times[0]:
+            return 0.0
+        return (len(self.start_times)-1)/(self.start_times[-1]-self.start_times[0])
+
+    # Std of the intervals between tick starts over the window, s
+    def getJitter(self):
+        if len(self.start_times) < 3:
+            return 0.0
+        return float(np.std(np.diff(np.array(self.start_times))))
+
+    def getStats(self):
+        tick_times = np.array(self.tick_times) if self.tick_times else np.zeros(1)
+        calls = np.maximum(self.uav_calls, 1)
+        stats = {"ticks": self.ticks,
+                 "target_hz": 1.0/self.period if self.period > 0 else 0.0,
+                 "rate_hz": self.getRate(),
+                 "jitter_ms": 1000*self.getJitter(),
+                 "tick_mean_ms": 1000*float(tick_times.mean()),
+                 "tick_p99_ms": 1000*float(np.percentile(tick_times, 99)),
+                 "tick_max_ms": 1000*float(tick_times.max()),
+                 "overruns": self.overruns,
+                 "missed": self.missed,
+                 "max_lateness_ms": 1000*self.max_lateness}
+        if len(self.uav_time):
+            slowest = int(np.argmax(self.uav_time/calls))
+            stats.update({"uav_mean_ms": 1000*float(self.uav_time.sum()/calls.sum()),
+                          "uav_max_ms": 1000*float(self.uav_max_time.max()),
+                          "slowest_uav": slowest,
+                          "slowest_uav_mean_ms": 1000*float(self.uav_time[slowest]/calls[slowest])})
+        return stats
+
+    # One log line. uav_names: names of the UAV slots, for the slowest UAV
+    def summary(self, name="Loop", uav_names=None):
+        s = self.getStats()
+        line = "{}: {:.2f} Hz (target {:.2f}), jitter {:.2f} ms, tick mean {:.2f} ms p99 {:.2f} ms max {:.2f} ms, overruns {} (missed {})".format(
+            name, s["rate_hz"], s["target_hz"], s["jitter_ms"], s["tick_mean_ms"], s["tick_p99_ms"], s["tick_max_ms"],
+            s["overruns"], s["missed"])
+        if "uav_mean_ms" in s:
+            slowest = uav_names[s["slowest_uav"]] if uav_names is not None else s["slowest_uav"]
+            line += ", per UAV mean {:.3f} ms max {:.2f} ms (slowest {} {:.3f} ms)".format(
+                s["uav_mean_ms"], s["uav_max_ms"], slowest, s["slowest_uav_mean_ms"])
+        return line
+
+
+class FixedRateLoop:
+
+    # ===== Constructor =====
+    # period: s
+    # stats: LoopStats to fill (default: a new one without UAV timing)
+    # now/sleep: loop clock, e.g. AirsimIO.simTime/simSleep for FakeAirsim (default: time.monotonic/time.sleep)
+    # log_interval: s (loop clock) between two log lines of the rolling stats, None: only at the end
+    def __init__(self, period, stats=None, now=None, sleep=None, name="Loop", log_interval=10.0, uav_names=None):
+        self.period = period
+        self.stats = stats if stats is not None else LoopStats(period)
+        self.now = now if now is not None else time.monotonic
+        self.sleep = sleep if sleep is not None else time.sleep
+        self.name = name
+        self.log_interval = log_interval
+        self.uav_names = uav_names
+
+    def getStats(self):
+        return self.stats
+
+    def logStats(self):
+        log.logReport("INFO", self.stats.summary(self.name, self.uav_names))
+
+    # Calls step() once per period until it returns something true, and returns that value
+    def run(self, step):
+        deadline = self.now()
+        last_log = deadline
+        while True:
+            start = self.now()
+            t0 = time.perf_counter()
+            result = step()
+            tick_time = time.perf_counter() - t0
+            end = self.now()
+            # Next deadline on the grid; after an overrun, the first one not yet passed
+            next_deadline = deadline + self.period
+            missed = max(0, math.ceil((end - next_deadline)/self.period)) if self.period > 0 else 0
+            self.stats.addTick(start, tick_time, max(0.0, start - deadline), end > next_deadline, missed)
+            deadline = next_deadline + missed*self.period
+            if self.log_interval is not None and end - last_log >= self.log_interval:
+                self.logStats()
+                last_log = end
+            if result:
+                break
+            if deadline > end:
+                self.sleep(deadline - end)
+        self.logStats()
+        return result
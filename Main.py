@@ -13,7 +13,6 @@ import logFunctions as log
 import AirsimIO
 import init
 
-import time
 import threading
 from RepeatedTimer import RepeatedTimer
 from Algorithms.Control.WaypointVisiting.WaypointVisiting import waypointVisiting, waypointVisitingAllUAVs
@@ -25,6 +24,7 @@ from Algorithms._path_follow import Follow_Path
 print("========================== Start ============================")
 log.resetLog()
 log.logReport("INFO","Initialisation started")
+# init.enableRpcProfiling() # RPC counts/latency per method and UAV, snapshots every 10 s, summary at cleanUpSimulation (before any RPC)
 
 # ===== Weather Settings =====
 # Using the default weather can make the simulation more fluent.
@@ -48,7 +48,7 @@ init.n_uavs = 5 # number of UAVs
 
 # Sensors on each UAV
 # 1: enable; 0: disable
-# init.camera_en = 0 # No camera yet. Camera needs special settings
+# init.camera_en = 0 # Camera needs special settings (see JsonSettings.py)
 init.barometer_en = 0
 init.imu_en = 0
 init.gps_en = 0
@@ -85,13 +85,10 @@ if __name__ == "__main__":
     path_following = Follow_Path(init.client, init.uavs)
     stop_simulation = path_following.runSimulation()
     
-    time.sleep(1)
-    AirsimIO.goHomeAllUAVs(init.client, init.uavs)
-    time.sleep(10)
-    AirsimIO.rotateAllUAVsTo(init.client, init.uavs, 0)
-    time.sleep(2)
-    AirsimIO.landAllUAVs(init.client, init.uavs)
-    time.sleep(3)
+    # Fleet commands return as soon as every UAV has completed (or on timeout)
+    AirsimIO.goHomeAllUAVs(init.client, init.uavs, timeout=60)
+    AirsimIO.rotateAllUAVsTo(init.client, init.uavs, 0, timeout=10)
+    AirsimIO.landAllUAVs(init.client, init.uavs, timeout=60)
 
 
     # rt.stop()
@@ -0,0 +1,254 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Mission files
+# A Mission holds the routes of all UAVs in flat arrays:
+#   waypoints (M,3) float64, World frame (NED)
+#   task      (M,)  uint8, 1: task point (hover there)
+#   UAV i owns rows wp_start[i] : wp_start[i]+wp_count[i]
+# plus a waypoint colour and a path colour per UAV. The UAVs
+# get views into these arrays, not nested lists.
+# Formats (chosen by extension):
+#   .csv      one row per waypoint, streamed line by line
+#             uav,x,y,z,task[,r,g,b,a][,wr,wg,wb,wa]  (path
+#             colour and waypoint colour of the UAV, taken
+#             from its first row; UAV defaults if missing)
+#   .json     {"uavs": [{"name": "UAV_1", "waypoints": [[x,y,z], ...],
+#               "task_points": [1, 3], "waypoint_color": [r,g,b,a],
+#               "path_color": [r,g,b,a]}, ...]}
+#   .mission  binary: magic, JSON header, then the raw arrays.
+#             Loaded with np.memmap, nothing is parsed or copied
+#             (100k+ waypoints in about a millisecond).
+# Usage Example
+# mission = loadMission("missions/survey.csv")
+# saveMission(mission, "missions/survey.mission")   # once
+# mission = loadMission("missions/survey.mission")
+# mission.applyToUAVs(init.uavs)
+# NOTE: waypoints loaded from a .mission file are read-only
+# views; use UAV.setWaypoints (not addWaypoint) to change them.
+# ========================================================= #
+
+import array
+import csv
+import json
+import os
+import numpy as np
+import logFunctions as log
+
+
+MAGIC = b"MRSMISSN"
+VERSION = 1
+ALIGNMENT = 64   # bytes, start of the array blocks in .mission files
+default_waypoint_color = [1.0, 0.0, 0.0, 1.0]   # Same defaults as UAV
+default_path_color = [0.0, 1.0, 0.0, 1.0]
+
+
+class Mission:
+
+    # ===== Constructor =====
+    # uav_names: N names, waypoints: (M,3), task: (M,), wp_count: N waypoints per UAV (rows in order of uav_names)
+    def __init__(self, uav_names, waypoints, task, wp_count, waypoint_colors=None, path_colors=None):
+        self.uav_names = list(uav_names)
+        self.waypoints = waypoints
+        self.task = task
+        self.wp_count = np.asarray(wp_count, dtype=np.int64)
+        self.wp_start = np.concatenate(([0], np.cumsum(self.wp_count)[:-1])).astype(np.int64)
+        n = len(self.uav_names)
+        self.waypoint_colors = [list(c) for c in waypoint_colors] if waypoint_colors is not None else [list(default_waypoint_color) for _ in range(n)]
+        self.path_colors = [list(c) for c in path_colors] if path_colors is not None else [list(default_path_color) for _ in range(n)]
+        self._slots = {name: i for i, name in enumerate(self.uav_names)}
+
+    def getUAVNames(self):
+        return self.uav_names
+
+    def getNumWaypoints(self):
+        return len(self.waypoints)
+
+    def _rows(self, uav_name):
+        i = self._slots[uav_name]
+        return slice(int(self.wp_start[i]), int(self.wp_start[i] + self.wp_count[i]))
+
+    # (K,3) view of the route of one UAV
+    def getWaypoints(self, uav_name):
+        return self.waypoints[self._rows(uav_name)]
+
+    # Indices (in the UAV route) of its task points
+    def getTaskPointsIndices(self, uav_name):
+        return np.flatnonzero(self.task[self._rows(uav_name)]).tolist()
+
+    def getWaypointColor(self, uav_name):
+        return self.waypoint_colors[self._slots[uav_name]]
+
+    def getPathColor(self, uav_name):
+        return self.path_colors[self._slots[uav_name]]
+
+    # Sets route, task points and colours of the UAVs found in the mission (matched by name)
+    # Returns the number of UAVs set
+    def applyToUAVs(self, uavs):
+        n_set = 0
+        for uav in uavs:
+            name = uav.getName()
+            if name not in self._slots:
+                log.logReport("WARNING", "No route for " + name + " in the mission")
+                continue
+            uav.setWaypoints(self.getWaypoints(name))
+            uav.setTaskPointsIndices(self.getTaskPointsIndices(name))
+            uav.setWaypointColor(self.getWaypointColor(name))
+            uav.setPathColor(self.getPathColor(name))
+            n_set += 1
+        return n_set
+
+
+# ===== Loading =====
+def loadMission(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        mission = loadMissionCSV(path)
+    elif extension == ".json":
+        mission = loadMissionJSON(path)
+    elif extension == ".mission":
+        mission = loadMissionBinary(path)
+    else:
+        raise ValueError("Unknown mission file format: " + path)
+    log.logReport("INFO", "Mission loaded: {} ({} UAVs, {} waypoints)".format(path, len(mission.uav_names), mission.getNumWaypoints()))
+    return mission
+
+
+# Streams the rows into one flat array per UAV (no per-waypoint Python lists)
+def loadMissionCSV(path):
+    coords = {}   # UAV name -> array('d') of x, y, z
+    tasks = {}    # UAV name -> array('B')
+    path_colors = {}
+    waypoint_colors = {}
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower() for column in next(reader)]
+        col = {name: k for k, name in enumerate(header)}
+        for name in ("uav", "x", "y", "z"):
+            if name not in col:
+                raise ValueError("Mission CSV without column '" + name + "': " + path)
+        i_uav, i_x, i_y, i_z = col["uav"], col["x"], col["y"], col["z"]
+        i_task = col.get("task")
+        i_path_color = [col[c] for c in ("r", "g", "b", "a")] if all(c in col for c in ("r", "g", "b", "a")) else None
+        i_wp_color = [col[c] for c in ("wr", "wg", "wb", "wa")] if all(c in col for c in ("wr", "wg", "wb", "wa")) else None
+        for row in reader:
+            if not row:
+                continue
+            name = row[i_uav].strip()
+            xyz = coords.get(name)
+            if xyz is None:
+                xyz = coords[name] = array.array("d")
+                tasks[name] = array.array("B")
+                if i_path_color is not None:
+                    path_colors[name] = [float(row[k]) for k in i_path_color]
+                if i_wp_color is not None:
+                    waypoint_colors[name] = [float(row[k]) for k in i_wp_color]
+            xyz.append(float(row[i_x]))
+            xyz.append(float(row[i_y]))
+            xyz.append(float(row[i_z]))
+            tasks[name].append(1 if i_task is not None and row[i_task].strip() not in ("", "0", "false", "False") else 0)
+    names = list(coords)
+    waypoints = np.concatenate([np.frombuffer(coords[name], dtype=np.float64) for name in names]).reshape(-1, 3) \
+        if names else np.zeros((0, 3))
+    task = np.concatenate([np.frombuffer(tasks[name], dtype=np.uint8) for name in names]) if names else np.zeros(0, dtype=np.uint8)
+    wp_count = [len(tasks[name]) for name in names]
+    return Mission(names, waypoints, task, wp_count,
+                   [waypoint_colors.get(name, default_waypoint_color) for name in names],
+                   [path_colors.get(name, default_path_color) for name in names])
+
+
+def loadMissionJSON(path):
+    with open(path) as file:
+        data = json.load(file)
+    names, blocks, task_blocks, wp_count, waypoint_colors, path_colors = [], [], [], [], [], []
+    for route in data["uavs"]:
+        waypoints = np.asarray(route.get("waypoints", []), dtype=np.float64).reshape(-1, 3)
+        task = np.zeros(len(waypoints), dtype=np.uint8)
+        task[np.asarray(route.get("task_points", []), dtype=np.int64)] = 1
+        names.append(route["name"])
+        blocks.append(waypoints)
+        task_blocks.append(task)
+        wp_count.append(len(waypoints))
+        waypoint_colors.append(route.get("waypoint_color", default_waypoint_color))
+        path_colors.append(route.get("path_color", default_path_color))
+    waypoints = np.concatenate(blocks) if blocks else np.zeros((0, 3))
+    task = np.concatenate(task_blocks) if task_blocks else np.zeros(0, dtype=np.uint8)
+    return Mission(names, waypoints, task, wp_count, waypoint_colors, path_colors)
+
+
+# Memory-maps the arrays of a .mission file. Only the header is read
+def loadMissionBinary(path):
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a mission file: " + path)
+        version, header_len = np.frombuffer(file.read(8), dtype="<u4")
+        if version != VERSION:
+            raise ValueError("Unsupported mission file version {}: {}".format(version, path))
+        header = json.loads(file.read(int(header_len)).decode("utf-8"))
+    n_waypoints = header["n_waypoints"]
+    if n_waypoints > 0:
+        waypoints = np.memmap(path, dtype="<f8", mode="r", offset=header["waypoints_offset"], shape=(n_waypoints, 3))
+        task = np.memmap(path, dtype=np.uint8, mode="r", offset=header["task_offset"], shape=(n_waypoints,))
+    else:
+        waypoints, task = np.zeros((0, 3)), np.zeros(0, dtype=np.uint8)
+    uavs = header["uavs"]
+    return Mission([uav["name"] for uav in uavs], waypoints, task, [uav["count"] for uav in uavs],
+                   [uav["waypoint_color"] for uav in uavs], [uav["path_color"] for uav in uavs])
+
+
+# ===== Saving =====
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def saveMission(mission, path):
+    n_waypoints = mission.getNumWaypoints()
+    header = {"n_waypoints": n_waypoints,
+              "uavs": [{"name": name, "count": int(count), "waypoint_color": wp_color, "path_color": path_color}
+                       for name, count, wp_color, path_color in zip(mission.uav_names, mission.wp_count,
+                                                                    mission.waypoint_colors, mission.path_colors)]}
+    # Offsets depend on the header length, which depends on the offsets: reserve room for them first
+    header["waypoints_offset"] = header["task_offset"] = 0
+    prefix_len = len(MAGIC) + 8 + len(json.dumps(header).encode("utf-8")) + 40
+    header["waypoints_offset"] = _align(prefix_len)
+    header["task_offset"] = _align(header["waypoints_offset"] + 24*n_waypoints)
+    header_bytes = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.array([VERSION, len(header_bytes)], dtype="<u4").tobytes())
+        file.write(header_bytes)
+        file.write(b"\0" * (header["waypoints_offset"] - file.tell()))
+        file.write(np.ascontiguousarray(mission.waypoints, dtype="<f8").tobytes())
+        file.write(b"\0" * (header["task_offset"] - file.tell()))
+        file.write(np.ascontiguousarray(mission.task, dtype=np.uint8).tobytes())
+    log.logReport("INFO", "Mission saved: {} ({} UAVs, {} waypoints)".format(path, len(mission.uav_names), n_waypoints))
+
+
+# Mission file in any format -> any format, e.g. convertMission("survey.csv", "survey.mission")
+def convertMission(source, destination):
+    mission = loadMission(source)
+    extension = os.path.splitext(destination)[1].lower()
+    if extension == ".mission":
+        saveMission(mission, destination)
+    elif extension == ".json":
+        data = {"uavs": [{"name": name,
+                          "waypoints": mission.getWaypoints(name).tolist(),
+                          "task_points": mission.getTaskPointsIndices(name),
+                          "waypoint_color": mission.getWaypointColor(name),
+                          "path_color": mission.getPathColor(name)} for name in mission.uav_names]}
+        with open(destination, "w") as file:
+            json.dump(data, file)
+    elif extension == ".csv":
+        with open(destination, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["uav", "x", "y", "z", "task", "r", "g", "b", "a", "wr", "wg", "wb", "wa"])
+            for name in mission.uav_names:
+                color = list(mission.getPathColor(name)) + list(mission.getWaypointColor(name))
+                rows = mission._rows(name)
+                for xyz, task in zip(mission.waypoints[rows], mission.task[rows]):
+                    writer.writerow([name, repr(float(xyz[0])), repr(float(xyz[1])), repr(float(xyz[2])), int(task)] + color)
+    else:
+        raise ValueError("Unknown mission file format: " + destination)
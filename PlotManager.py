@@ -0,0 +1,78 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Incremental path plotting
+# Paths are drawn as persistent markers and the geometry that
+# is already on screen is remembered, so update() only sends
+# what changed. Static missions cost no RPCs after the first
+# update.
+# Usage Example
+# plot_manager = PlotManager(init.client)
+# rt = RepeatedTimer(1, plot_manager.update, init.uavs)
+# NOTE: AirSim cannot delete single markers. When a drawn path
+# is modified or removed, all persistent markers are flushed
+# (simFlushPersistentMarkers) and every path is redrawn.
+# ========================================================= #
+
+import AirsimIO
+
+
+class PlotManager:
+
+    # ===== Constructor =====
+    def __init__(self, client, waypoint_size=5, path_thickness=2):
+        self.client = client
+        self.waypoint_size = waypoint_size
+        self.path_thickness = path_thickness
+        self.drawn = {}   # UAV name -> (waypoint color, path color, waypoints as tuples) currently on screen
+        self.rpc_count = 0
+
+    # Draws whatever changed since the last call. Returns the number of RPCs sent
+    def update(self, uavs, force=False):
+        current = {}
+        for uav in uavs:
+            waypoints = uav.getWaypoints()
+            if len(waypoints) > 0:
+                current[uav.getName()] = (tuple(uav.getWaypointColor()), tuple(uav.getPathColor()),
+                                          [tuple(wp[0:3]) for wp in waypoints])
+
+        # Anything drawn that is no longer valid forces a full redraw
+        redraw = force
+        for name, (wp_color, path_color, waypoints) in self.drawn.items():
+            new = current.get(name)
+            if new is None or new[0] != wp_color or new[1] != path_color or new[2][:len(waypoints)] != waypoints:
+                redraw = True
+                break
+
+        n_rpcs = 0
+        if redraw and self.drawn:
+            AirsimIO.cleanAllPersistentPlots(self.client)
+            self.drawn = {}
+            n_rpcs += 1
+
+        # New paths, and new waypoints appended to paths already drawn
+        points_by_color = {}
+        segments_by_color = {}
+        for name, (wp_color, path_color, waypoints) in current.items():
+            n_drawn = len(self.drawn[name][2]) if name in self.drawn else 0
+            if n_drawn == len(waypoints):
+                continue
+            points_by_color.setdefault(wp_color, []).extend(waypoints[n_drawn:])
+            segments = segments_by_color.setdefault(path_color, [])
+            for i in range(max(n_drawn, 1), len(waypoints)):
+                segments.append(waypoints[i-1])
+                segments.append(waypoints[i])
+        n_rpcs += AirsimIO.plotGroupedPaths(self.client, points_by_color, segments_by_color,
+                                            self.waypoint_size, self.path_thickness, -1.0, True)
+        self.drawn = current
+        self.rpc_count += n_rpcs
+        return n_rpcs
+
+    # Removes all persistent plots
+    def clear(self):
+        AirsimIO.cleanAllPersistentPlots(self.client)
+        self.drawn = {}
+        self.rpc_count += 1
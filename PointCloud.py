@@ -0,0 +1,73 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Lidar point clouds
+# AirSim returns a flat list [x0, y0, z0, x1, ...] in the
+# vehicle frame (DataFrame "VehicleInertialFrame", see
+# JsonSettings.py). It is converted to an (N,3) float32 array
+# in one call, then optionally:
+#   cropRange        keep points between min and max range
+#                    of the sensor
+#   voxelDownsample  one point (centroid) per occupied voxel
+#   toWorld          add the UAV init_pose, same as
+#                    AirsimIO.getUAVposWorld
+# Usage Example
+# points = processPointCloud(lidar_data, uav.getInitPose(), voxel_size=0.5, max_range=30)
+# points.shape   # (N,3) float32, World frame (NED)
+# ========================================================= #
+
+import numpy as np
+
+
+# (N,3) float32 array of a flat point list. AirSim sends [0.0] (or nothing) when no point was hit
+def toPoints(point_cloud):
+    points = np.asarray(point_cloud, dtype=np.float32)
+    if points.size < 3:
+        return np.zeros((0, 3), dtype=np.float32)
+    return points[:points.size - points.size % 3].reshape(-1, 3)
+
+
+# Points whose distance to origin is within [min_range, max_range] (max_range None: no upper limit)
+def cropRange(points, min_range=0.0, max_range=None, origin=(0.0, 0.0, 0.0)):
+    if min_range <= 0 and max_range is None:
+        return points
+    delta = points - np.asarray(origin, dtype=np.float32)
+    dist2 = np.einsum("ij,ij->i", delta, delta)
+    keep = dist2 >= min_range*min_range
+    if max_range is not None:
+        keep &= dist2 <= max_range*max_range
+    return points[keep]
+
+
+# Centroid of the points of each occupied voxel (cubes of voxel_size m, grid aligned with the origin)
+def voxelDownsample(points, voxel_size):
+    if voxel_size is None or voxel_size <= 0 or len(points) == 0:
+        return points
+    cells = np.floor(points / voxel_size).astype(np.int64)
+    cells -= cells.min(axis=0)
+    extent = cells.max(axis=0) + 1
+    keys = (cells[:, 0]*extent[1] + cells[:, 1])*extent[2] + cells[:, 2]
+    _, voxel, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    voxel = voxel.reshape(-1)
+    centroids = np.empty((len(counts), 3), dtype=np.float32)
+    for axis in range(3):
+        centroids[:, axis] = np.bincount(voxel, weights=points[:, axis], minlength=len(counts)) / counts
+    return centroids
+
+
+# Vehicle frame -> World frame (NED): adds the UAV start position
+def toWorld(points, init_pose):
+    return points + np.asarray(init_pose[0:3], dtype=np.float32)
+
+
+# Flat list of a LidarData -> cropped, downsampled (N,3) float32 points in the World frame
+# Cropping uses the lidar position (data.pose) as origin
+def processPointCloud(data, init_pose, voxel_size=None, min_range=0.0, max_range=None):
+    points = toPoints(data.point_cloud)
+    position = data.pose.position
+    points = cropRange(points, min_range, max_range, (position.x_val, position.y_val, position.z_val))
+    points = voxelDownsample(points, voxel_size)
+    return toWorld(points, init_pose)
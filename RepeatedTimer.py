@@ -4,7 +4,10 @@
 # ========================================================= #
 
 # ========================================================= #
-# Repeated Timer that can run in a separate thread
+# Repeated Timer that runs in the background
+# All RepeatedTimers share one Scheduler thread (Scheduler.py):
+# fixed-rate deadlines without drift, no overlapping runs,
+# overrun policies and per-timer stats (rt.getStats()).
 # To run this timer smoothly, ".join()" command in UAV operations should be avoided
 # Usage Example
 # rt = RepeatedTimer(1, AirsimIO.plotAllUAVsPaths, init.client, init.uavs, duration=1.1)
@@ -13,29 +16,36 @@
 # rt.stop()
 # ========================================================= #
 
-from threading import Timer
+import Scheduler
 
 class RepeatedTimer:
-    def __init__(self, interval, function, *args, **kwargs):
-        self._timer     = None
+    def __init__(self, interval, function, *args, policy="coalesce", scheduler=None, **kwargs):
         self.interval   = interval
         self.function   = function
         self.args       = args
         self.kwargs     = kwargs
         self.is_running = False
+        self.scheduler  = scheduler
+        self._job       = Scheduler.Job(interval, self._run, (), {}, policy, getattr(function, "__name__", None))
         # self.start()
 
+    # function/args can be changed while the timer is running
     def _run(self):
-        self.is_running = False
-        self.start()
         self.function(*self.args, **self.kwargs)
 
     def start(self):
         if not self.is_running:
-            self._timer = Timer(self.interval, self._run)
-            self._timer.start()
+            if self.scheduler is None:
+                self.scheduler = Scheduler.getDefaultScheduler()
+            self._job.interval = self.interval
+            self.scheduler.startJob(self._job)
             self.is_running = True
 
     def stop(self):
-        self._timer.cancel()
-        self.is_running = False
\ No newline at end of file
+        if self.scheduler is not None:
+            self.scheduler.removeJob(self._job)
+        self.is_running = False
+
+    # Runs, overruns, skipped deadlines and run times of this timer
+    def getStats(self):
+        return self._job.getStats()
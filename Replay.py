@@ -0,0 +1,277 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Replay of recorded missions
+# ReplayClient answers pose/collision/sensor requests from a
+# FlightRecorder recording instead of AirSim, and records the
+# commands it receives. The mission logic (Follow_Path,
+# waypointVisiting) runs on it tick by tick, as fast as the
+# CPU allows, and the commands it produces are compared with
+# the ones in the recording.
+# Usage Example
+# Record (live or FakeAirsim):
+#   recorder = FlightRecorder("flight_logs/run_1", uavs)
+#   Follow_Path(client, uavs, recorder=recorder).runSimulation()
+#   recorder.close()
+# Replay (same UAVs and waypoints, possibly changed logic):
+#   result = replayFollowPath("flight_logs/run_1", uavs)
+#   print(result.compareWithRecording())   # None: same command sequence
+#   continuous/separation missions: replayFollowPath(folder, uavs, continuous=True,
+#       separation=SeparationMonitor(uavs, 4.0)) with the recorded settings
+# NOTE: hover times are measured on the client clock, which
+# replays the recorded tick times, so task point hovers replay
+# exactly too.
+# ========================================================= #
+
+import math
+import numpy as np
+import AirsimIO
+import FakeAirsim
+import FleetState
+from FlightRecorder import FlightLog
+
+
+# Quaternion from pitch, roll, yaw (rad), same convention as airsim.to_quaternion
+def toQuaternion(pitch, roll, yaw):
+    t0 = math.cos(yaw * 0.5)
+    t1 = math.sin(yaw * 0.5)
+    t2 = math.cos(roll * 0.5)
+    t3 = math.sin(roll * 0.5)
+    t4 = math.cos(pitch * 0.5)
+    t5 = math.sin(pitch * 0.5)
+    return FakeAirsim.Quaternionr(t0*t3*t4 - t1*t2*t5,   # x
+                                  t0*t2*t5 + t1*t3*t4,   # y
+                                  t1*t2*t4 - t0*t3*t5,   # z
+                                  t0*t2*t4 + t1*t3*t5)   # w
+
+
+# Time of the current replay tick, used by AirsimIO.simTime()
+class ReplayClock:
+    def __init__(self, client):
+        self.client = client
+
+    def now(self):
+        return float(self.client.times[self.client.tick])
+
+    # Nothing to wait for in a replay
+    def sleep(self, dt):
+        pass
+
+
+# Future of a replayed command: the outcome is already in the recording
+class ReplayFuture:
+    def done(self):
+        return True
+
+    def join(self):
+        pass
+
+
+class ReplayClient:
+
+    # Requests are built with the FakeAirsim types (see AirsimIO.apiTypes)
+    api_types = FakeAirsim
+
+    # ===== Constructor =====
+    def __init__(self, flight_log):
+        self.flight_log = flight_log
+        names = flight_log.uav_names
+        self.slots = {name: i for i, name in enumerate(names)}
+        self.times = flight_log.getColumn("time")
+        self.world_pose = flight_log.getColumn("world_pose")
+        init_pose = np.asarray(flight_log.meta["init_poses"], dtype=float)
+        self.body_pose = self.world_pose - init_pose[np.newaxis, :, :]
+        self.collision = flight_log.getColumn("collision")
+        self.sensor_value = flight_log.getColumn("sensor_value")
+        if self.sensor_value.ndim == 3:
+            self.sensor_value = self.sensor_value[..., np.newaxis]   # Recordings without sensor_width: (T,N,S)
+        self.sensor_slots = [{sensor: s for s, sensor in enumerate(sensors)} for sensors in flight_log.meta["sensors"]]
+        self.clock = ReplayClock(self)
+        self.tick = 0
+        self.issued = [] # (tick, vehicle name, method) of every command received
+
+    def getNumTicks(self):
+        return len(self.times)
+
+    def setTick(self, tick):
+        self.tick = tick
+
+    def _command(self, method, vehicle_name):
+        self.issued.append((self.tick, vehicle_name, method))
+        return ReplayFuture()
+
+    # ===== Connection / control =====
+    def confirmConnection(self):
+        pass
+
+    def enableApiControl(self, is_enabled, vehicle_name=''):
+        pass
+
+    def armDisarm(self, arm, vehicle_name=''):
+        return True
+
+    def reset(self):
+        pass
+
+    # ===== Motions (recorded, not executed) =====
+    def takeoffAsync(self, timeout_sec=20, vehicle_name=''):
+        return self._command("takeoffAsync", vehicle_name)
+
+    def landAsync(self, timeout_sec=60, vehicle_name=''):
+        return self._command("landAsync", vehicle_name)
+
+    def hoverAsync(self, vehicle_name=''):
+        return self._command("hoverAsync", vehicle_name)
+
+    def goHomeAsync(self, timeout_sec=3e+38, vehicle_name=''):
+        return self._command("goHomeAsync", vehicle_name)
+
+    def rotateToYawAsync(self, yaw, timeout_sec=3e+38, margin=5, vehicle_name=''):
+        return self._command("rotateToYawAsync", vehicle_name)
+
+    def moveToPositionAsync(self, x, y, z, velocity, timeout_sec=3e+38, drivetrain=None, yaw_mode=None,
+                            lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        return self._command("moveToPositionAsync", vehicle_name)
+
+    def moveOnPathAsync(self, path, velocity, timeout_sec=3e+38, drivetrain=None, yaw_mode=None,
+                        lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        return self._command("moveOnPathAsync", vehicle_name)
+
+    def moveToZAsync(self, z, velocity, timeout_sec=3e+38, yaw_mode=None, lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        return self._command("moveToZAsync", vehicle_name)
+
+    def moveByVelocityZBodyFrameAsync(self, vx, vy, z, duration, drivetrain=None, yaw_mode=None, vehicle_name=''):
+        return self._command("moveByVelocityZBodyFrameAsync", vehicle_name)
+
+    # ===== State (from the recording) =====
+    def simGetVehiclePose(self, vehicle_name=''):
+        pose = self.body_pose[self.tick, self.slots[vehicle_name]]
+        pitch, roll, yaw = np.deg2rad(pose[3:6])
+        return FakeAirsim.Pose(FakeAirsim.Vector3r(*pose[0:3]), toQuaternion(pitch, roll, yaw))
+
+    def simGetCollisionInfo(self, vehicle_name=''):
+        return FakeAirsim.CollisionInfo(bool(self.collision[self.tick, self.slots[vehicle_name]]))
+
+    def getMultirotorState(self, vehicle_name=''):
+        flying = self.body_pose[self.tick, self.slots[vehicle_name], 2] < -0.1
+        return FakeAirsim.MultirotorState(FakeAirsim.LandedState.Flying if flying else FakeAirsim.LandedState.Landed,
+                                          int(self.clock.now() * 1e9))
+
+    def getDistanceSensorData(self, distance_sensor_name='', vehicle_name=''):
+        slot = self.slots[vehicle_name]
+        distance = self.sensor_value[self.tick, slot, self.sensor_slots[slot][distance_sensor_name], 0]
+        return FakeAirsim.DistanceSensorData(int(self.clock.now() * 1e9), float(distance), 0.0, float("inf"))
+
+    # ===== Plots (ignored) =====
+    def simPlotPoints(self, *args, **kwargs):
+        pass
+
+    def simPlotLineStrip(self, *args, **kwargs):
+        pass
+
+    def simPlotLineList(self, *args, **kwargs):
+        pass
+
+    def simPlotStrings(self, *args, **kwargs):
+        pass
+
+    def simFlushPersistentMarkers(self):
+        pass
+
+
+# Commands and waypoint indices produced by a replay, one row per tick
+class ReplayResult:
+
+    def __init__(self, flight_log, client, command, waypoint_index):
+        self.flight_log = flight_log
+        self.client = client
+        self.command = command
+        self.waypoint_index = waypoint_index
+
+    # Commands received by the client, in order: (tick, vehicle name, method)
+    def getIssuedCommands(self):
+        return self.client.issued
+
+    # First difference with the recorded commands/waypoint indices: (tick, uav name, column, recorded, replayed)
+    # None when the replay produced the same sequence
+    def compareWithRecording(self):
+        n_ticks = len(self.command)
+        for column, replayed in (("command", self.command), ("waypoint_index", self.waypoint_index)):
+            recorded = self.flight_log.getColumn(column)[:n_ticks]
+            mismatch = np.argwhere(recorded != replayed)
+            if len(mismatch):
+                tick, slot = mismatch[0]
+                return (int(tick), self.flight_log.uav_names[slot], column, int(recorded[tick, slot]), int(replayed[tick, slot]))
+        return None
+
+    # First difference with another replay (e.g. before/after a change): (tick, uav name, column, this, other)
+    def compare(self, other):
+        n_ticks = min(len(self.command), len(other.command))
+        for column, a, b in (("command", self.command, other.command), ("waypoint_index", self.waypoint_index, other.waypoint_index)):
+            mismatch = np.argwhere(a[:n_ticks] != b[:n_ticks])
+            if len(mismatch):
+                tick, slot = mismatch[0]
+                return (int(tick), self.flight_log.uav_names[slot], column, int(a[tick, slot]), int(b[tick, slot]))
+        if len(self.command) != len(other.command):
+            return (n_ticks, None, "length", len(self.command), len(other.command))
+        return None
+
+
+# Runs step(client, tick) once per recorded tick and captures the UAV commands after each step.
+# uavs: same names/init poses as the recording, with waypoints set. Their state must match the
+#       state before the first recorded tick (setup(client) can bring them there).
+def replay(folder, uavs, step, setup=None):
+    flight_log = folder if isinstance(folder, FlightLog) else FlightLog(folder)
+    client = ReplayClient(flight_log)
+    n_ticks = client.getNumTicks()
+    slots = [flight_log.uav_names.index(uav.getName()) for uav in uavs]
+    command = np.zeros((n_ticks, len(flight_log.uav_names)), dtype=np.int16)
+    waypoint_index = np.zeros((n_ticks, len(flight_log.uav_names)), dtype=np.int32)
+    if setup is not None:
+        setup(client)
+    for tick in range(n_ticks):
+        client.setTick(tick)
+        step(client, tick)
+        for uav, slot in zip(uavs, slots):
+            command[tick, slot] = FleetState.command_codes.get(uav.getCurrentCommand(), -1)
+            waypoint_index[tick, slot] = uav.getWaypointIndex()
+    return ReplayResult(flight_log, client, command, waypoint_index)
+
+
+# Replays a Follow_Path mission recorded with Follow_Path(..., recorder=...).runSimulation()
+# vectorized, continuous, lookahead: same as the recorded Follow_Path
+# separation: new Separation.SeparationMonitor with the recorded settings (its holds are replayed too)
+def replayFollowPath(folder, uavs, vectorized=False, continuous=False, separation=None, lookahead=-1, **follow_kwargs):
+    from Algorithms._path_follow import Follow_Path
+    path_following = {}
+
+    def setup(client):
+        # runSimulation: take off, then hover before the first tick
+        path_following["fp"] = Follow_Path(client, uavs, vectorized, separation=separation,
+                                           continuous=continuous, lookahead=lookahead)
+        for uav in uavs:
+            uav.setTakenOff(True)
+            AirsimIO.hoverUAV(client, uav)
+
+    # Same tick dispatch as the recorded run
+    def step(client, tick):
+        path_following["fp"].stepSimulation(**follow_kwargs)
+
+    return replay(folder, uavs, step, setup)
+
+
+# Replays a waypointVisitingAllUAVs mission recorded once per call of waypointVisitingAllUAVs
+def replayWaypointVisiting(folder, uavs, **visiting_kwargs):
+    from Algorithms.Control.WaypointVisiting.WaypointVisiting import waypointVisitingAllUAVs
+
+    def setup(client):
+        for uav in uavs:
+            AirsimIO.hoverUAV(client, uav)
+
+    def step(client, tick):
+        waypointVisitingAllUAVs(client, uavs, **visiting_kwargs)
+
+    return replay(folder, uavs, step, setup)
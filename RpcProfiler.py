@@ -0,0 +1,234 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# RPC profiling
+# ProfiledClient wraps an AirSim client (or FakeAirsim) and
+# records, for every RPC method and vehicle:
+#   calls, errors, payload bytes of the replies, total and
+#   max latency, latency histogram (buckets in seconds)
+# Disabled = not wrapped: the plain client is used and there
+# is no overhead at all (see init.enableRpcProfiling).
+# Snapshots are written as JSON or Prometheus text (chosen by
+# extension: .json, anything else is Prometheus).
+# Usage Example
+# profiler = RpcProfiler()
+# client = ProfiledClient(AirsimIO.initClient(), profiler)
+# ... run the mission with client ...
+# profiler.export("rpc_profile.prom")
+# log.logReport("INFO", profiler.summary())
+# NOTE: async commands (moveToPositionAsync, ...) are timed
+# until the command is sent, not until the UAV gets there.
+# NOTE: payload sizes are estimates of the msgpack reply
+# (raw bytes of images, 9 bytes per number), 0 for futures.
+# ========================================================= #
+
+import bisect
+import inspect
+import json
+import os
+import threading
+import time
+import numpy as np
+
+
+# Latency histogram upper bounds, s (last bucket: +Inf)
+buckets = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+# Approximate reply size in bytes (msgpack: 9 bytes per number)
+def payloadSize(obj, depth=0):
+    if obj is None:
+        return 1
+    if isinstance(obj, (bool, int, float)):
+        return 9
+    if isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return len(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (list, tuple)):
+        if not obj:
+            return 1
+        if isinstance(obj[0], (int, float)):
+            return 9*len(obj)
+        return sum(payloadSize(item, depth+1) for item in obj)
+    if depth > 3 or callable(getattr(obj, "join", None)):
+        return 0  # Futures: the reply arrives later
+    attributes = getattr(obj, "__dict__", None)
+    if attributes is None:
+        return 0
+    return sum(payloadSize(value, depth+1) for value in attributes.values())
+
+
+class RpcStats:
+
+    # ===== Constructor =====
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.payload_bytes = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.histogram = [0]*(len(buckets)+1)
+
+    def add(self, latency, payload_bytes, error=False):
+        self.calls += 1
+        self.errors += error
+        self.payload_bytes += payload_bytes
+        self.total_s += latency
+        if latency > self.max_s:
+            self.max_s = latency
+        self.histogram[bisect.bisect_left(buckets, latency)] += 1
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.payload_bytes += other.payload_bytes
+        self.total_s += other.total_s
+        self.max_s = max(self.max_s, other.max_s)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    # Upper bound of the bucket holding percentile p (max latency for the +Inf bucket)
+    def percentile(self, p):
+        rank = p/100.0*self.calls
+        count = 0
+        for k, n in enumerate(self.histogram):
+            count += n
+            if n and count >= rank:
+                return buckets[k] if k < len(buckets) else self.max_s
+        return 0.0
+
+    def toDict(self):
+        return {"calls": self.calls,
+                "errors": self.errors,
+                "payload_bytes": self.payload_bytes,
+                "total_s": self.total_s,
+                "mean_s": self.total_s/self.calls if self.calls else 0.0,
+                "max_s": self.max_s,
+                "histogram": {("+Inf" if k == len(buckets) else str(buckets[k])): n for k, n in enumerate(self.histogram)}}
+
+
+class RpcProfiler:
+
+    # ===== Constructor =====
+    def __init__(self):
+        self.stats = {}   # (method, vehicle) -> RpcStats
+        self.start_time = time.time()
+        self._lock = threading.Lock()   # ClientPool workers record concurrently
+
+    def record(self, method, vehicle, latency, payload_bytes, error=False):
+        key = (method, vehicle)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = RpcStats()
+            stats.add(latency, payload_bytes, error)
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.start_time = time.time()
+
+    # Stats summed over vehicles: method -> RpcStats
+    def getMethodStats(self):
+        methods = {}
+        with self._lock:
+            for (method, _), stats in self.stats.items():
+                methods.setdefault(method, RpcStats()).merge(stats)
+        return methods
+
+    # ===== Export =====
+    def snapshot(self):
+        with self._lock:
+            rows = [dict(method=method, vehicle=vehicle, **stats.toDict()) for (method, vehicle), stats in sorted(self.stats.items())]
+        return {"start_time": self.start_time, "time": time.time(), "rpcs": rows}
+
+    # Prometheus text format: one block per metric family (HELP, TYPE, then all its samples)
+    def toPrometheus(self):
+        with self._lock:
+            items = [('method="{}",vehicle="{}"'.format(method, vehicle), stats) for (method, vehicle), stats in sorted(self.stats.items())]
+            lines = []
+            for name, help_text, field in (("airsim_rpc_calls_total", "AirSim RPC calls", "calls"),
+                                           ("airsim_rpc_errors_total", "AirSim RPC calls that raised", "errors"),
+                                           ("airsim_rpc_payload_bytes_total", "Approximate AirSim RPC reply bytes", "payload_bytes")):
+                lines.append("# HELP {} {}".format(name, help_text))
+                lines.append("# TYPE {} counter".format(name))
+                for labels, stats in items:
+                    lines.append("{}{{{}}} {}".format(name, labels, getattr(stats, field)))
+            lines.append("# HELP airsim_rpc_latency_seconds AirSim RPC latency")
+            lines.append("# TYPE airsim_rpc_latency_seconds histogram")
+            for labels, stats in items:
+                count = 0
+                for k, n in enumerate(stats.histogram):
+                    count += n
+                    le = "+Inf" if k == len(buckets) else repr(buckets[k])
+                    lines.append('airsim_rpc_latency_seconds_bucket{{{},le="{}"}} {}'.format(labels, le, count))
+                lines.append("airsim_rpc_latency_seconds_sum{{{}}} {!r}".format(labels, stats.total_s))
+                lines.append("airsim_rpc_latency_seconds_count{{{}}} {}".format(labels, stats.calls))
+        return "\n".join(lines) + "\n"
+
+    # Writes a snapshot to path: JSON for .json, Prometheus text otherwise. The file is replaced atomically
+    def export(self, path):
+        text = json.dumps(self.snapshot(), indent=4) if path.lower().endswith(".json") else self.toPrometheus()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+
+    # One line per method, most time consuming first
+    def summary(self, top=15):
+        methods = sorted(self.getMethodStats().items(), key=lambda item: -item[1].total_s)
+        lines = ["RPC profile: {} calls, {:.3f} s in RPCs over {:.1f} s".format(
+            sum(s.calls for _, s in methods), sum(s.total_s for _, s in methods), time.time() - self.start_time)]
+        for method, s in methods[:top]:
+            lines.append("  {:<28} calls {:>8}  total {:>8.3f} s  mean {:>7.3f} ms  p50 <= {:>7.2f} ms  p99 <= {:>7.2f} ms  max {:>7.2f} ms  {:>10} B{}".format(
+                method, s.calls, s.total_s, 1000*s.total_s/s.calls, 1000*s.percentile(50), 1000*s.percentile(99),
+                1000*s.max_s, s.payload_bytes, "  errors {}".format(s.errors) if s.errors else ""))
+        return "\n".join(lines)
+
+
+# Position of the vehicle_name parameter of a method (None: no such parameter)
+def vehicleArgIndex(method):
+    try:
+        parameters = list(inspect.signature(method).parameters)
+    except (TypeError, ValueError):
+        return None
+    return parameters.index("vehicle_name") if "vehicle_name" in parameters else None
+
+
+class ProfiledClient:
+
+    # ===== Constructor =====
+    def __init__(self, client, profiler=None):
+        self._client = client
+        self._profiler = profiler if profiler is not None else RpcProfiler()
+
+    def getClient(self):
+        return self._client
+
+    def getProfiler(self):
+        return self._profiler
+
+    # Methods are wrapped on first access and cached on the instance, so later calls skip __getattr__
+    # The vehicle label is vehicle_name, passed by keyword or by position
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        record = self._profiler.record
+        index = vehicleArgIndex(attr)
+
+        def call(*args, **kwargs):
+            vehicle = kwargs.get("vehicle_name", args[index] if index is not None and index < len(args) else "")
+            t0 = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                record(name, vehicle, time.perf_counter() - t0, 0, True)
+                raise
+            record(name, vehicle, time.perf_counter() - t0, payloadSize(result))
+            return result
+        self.__dict__[name] = call
+        return call
@@ -0,0 +1,200 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Periodic scheduler running all jobs on one thread
+# Jobs are kept in a heap ordered by deadline. Deadlines are
+# fixed-rate (start + k*interval), so the period does not
+# drift by the runtime of the job, and a job never overlaps
+# itself. Jobs share the thread: keep them short.
+# Usage Example
+# scheduler = Scheduler.getDefaultScheduler()
+# job = scheduler.addJob(1, AirsimIO.plotAllUAVsPaths, init.client, init.uavs, duration=1.1)
+# ...
+# print(job.getStats())
+# scheduler.removeJob(job)
+# ========================================================= #
+
+import heapq
+import itertools
+import threading
+import time
+import logFunctions as log
+from LoopTimer import LoopStats
+
+
+# Overrun policies: what happens when a run finishes after one or more later deadlines have passed
+#   coalesce: run once immediately for all missed deadlines, then continue on the original grid
+#   skip:     drop the missed deadlines, continue at the next future deadline of the grid
+#   catchup:  run every missed deadline back-to-back
+policies = ("coalesce", "skip", "catchup")
+
+
+class Job:
+
+    # ===== Constructor =====
+    def __init__(self, interval, function, args, kwargs, policy="coalesce", name=None):
+        if policy not in policies:
+            raise ValueError("Unknown overrun policy: " + str(policy))
+        self.interval = interval
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.policy = policy
+        self.name = name if name is not None else getattr(function, "__name__", "job")
+        self.generation = 0   # Bumped on every (re)schedule, stale heap entries are ignored
+        self.active = False
+        self.resetStats()
+
+    def resetStats(self):
+        self.runs = 0
+        self.overruns = 0          # Runs that finished after the next deadline
+        self.skipped = 0           # Deadlines dropped by the skip/coalesce policies
+        self.errors = 0
+        self.total_run_time = 0.0  # s
+        self.max_run_time = 0.0    # s
+        self.max_lateness = 0.0    # s, start time - deadline
+        self.loop_stats = LoopStats(self.interval)  # Rolling rate and jitter
+
+    def getStats(self):
+        return {"name": self.name,
+                "rate_hz": self.loop_stats.getRate(),
+                "jitter": self.loop_stats.getJitter(),
+                "interval": self.interval,
+                "runs": self.runs,
+                "overruns": self.overruns,
+                "skipped": self.skipped,
+                "errors": self.errors,
+                "mean_run_time": self.total_run_time/self.runs if self.runs else 0.0,
+                "max_run_time": self.max_run_time,
+                "max_lateness": self.max_lateness}
+
+    # Next deadline after the run for 'deadline' finished at 'now'
+    def nextDeadline(self, deadline, now):
+        missed = int((now - deadline) // self.interval)  # Grid points passed during the run
+        if missed <= 0:
+            return deadline + self.interval
+        self.overruns += 1
+        if self.policy == "coalesce":
+            self.skipped += missed - 1
+            return deadline + missed * self.interval
+        elif self.policy == "skip":
+            self.skipped += missed
+            return deadline + (missed + 1) * self.interval
+        return deadline + self.interval
+
+
+class Scheduler:
+
+    # ===== Constructor =====
+    def __init__(self, name="Scheduler"):
+        self.name = name
+        self.jobs = []
+        self._heap = []
+        self._seq = itertools.count()  # Tie breaker for equal deadlines
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    # Adds a periodic job. First run after start_delay (default: one interval)
+    def addJob(self, interval, function, *args, policy="coalesce", name=None, start_delay=None, **kwargs):
+        job = Job(interval, function, args, kwargs, policy, name)
+        self.startJob(job, start_delay)
+        return job
+
+    # (Re)schedules an existing job
+    def startJob(self, job, start_delay=None):
+        with self._cond:
+            if job not in self.jobs:
+                self.jobs.append(job)
+            job.generation += 1
+            job.active = True
+            job.loop_stats.period = job.interval
+            delay = job.interval if start_delay is None else start_delay
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), job.generation, job))
+            self._cond.notify()
+        self.start()
+
+    # Stops a job. A run in progress is not interrupted
+    def removeJob(self, job):
+        with self._cond:
+            job.active = False
+            job.generation += 1
+            if job in self.jobs:
+                self.jobs.remove(job)
+            self._cond.notify()
+
+    def getStats(self):
+        return [job.getStats() for job in list(self.jobs)]
+
+    # One log line per job: achieved rate, jitter, run time, overruns
+    def logStats(self):
+        for job in list(self.jobs):
+            log.logReport("INFO", job.loop_stats.summary("Job " + job.name))
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    # Drop entries of removed/rescheduled jobs
+                    while self._heap and self._heap[0][2] != self._heap[0][3].generation:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                deadline, _, generation, job = heapq.heappop(self._heap)
+
+            start = time.monotonic()
+            try:
+                job.function(*job.args, **job.kwargs)
+            except Exception as e:
+                job.errors += 1
+                log.logReport("ERROR", "Scheduled job " + job.name + " failed: " + repr(e))
+            now = time.monotonic()
+            job.runs += 1
+            job.total_run_time += now - start
+            job.max_run_time = max(job.max_run_time, now - start)
+            job.max_lateness = max(job.max_lateness, start - deadline)
+            job.loop_stats.addTick(start, now - start, start - deadline)
+
+            with self._cond:
+                if job.active and job.generation == generation:
+                    heapq.heappush(self._heap, (job.nextDeadline(deadline, now), next(self._seq), generation, job))
+
+
+# ===== Shared scheduler =====
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+# Scheduler shared by all RepeatedTimers
+def getDefaultScheduler():
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = Scheduler("DefaultScheduler")
+        return _default_scheduler
@@ -13,6 +13,7 @@ class Sensor:
         self.sensor_type = sensor_type
         self.name = name
         self.pose = pose
+        self.timestamp = None # s (AirsimIO.simTime) of the last reading, None: never read
         print("Sensor Instantiated")
 
     # ===== Getters and setters for instance variables =====
@@ -51,4 +52,9 @@ class Sensor:
     def getValue(self):
         return self.value
 
+    # Time of the last reading
+    def setTimestamp(self, timestamp):
+        self.timestamp = timestamp
 
+    def getTimestamp(self):
+        return self.timestamp
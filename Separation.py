@@ -0,0 +1,198 @@
+# ========================================================= #
+# Multi-Robot Systems (MRS) Operation Framework
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Inter-UAV separation
+# SpatialGrid hashes the UAV world positions into a uniform
+# grid (rebuilt every tick, one sort) so that neighbour
+# queries only look at adjacent cells instead of all pairs.
+# SeparationMonitor estimates velocities from successive
+# positions and predicts, for every nearby pair, the time
+# and distance of closest approach over a short horizon.
+# Closing pairs predicted closer than min_separation are
+# conflicts; the UAV with the lower priority of each pair is
+# held. Pairs already moving apart are left alone.
+# Usage Example
+# monitor = SeparationMonitor(init.uavs, min_separation=3.0, horizon=3.0)
+# Follow_Path(init.client, init.uavs, separation=monitor).runSimulation()
+# monitor.getConflicts()   # arrays i, j, t_cpa, d_cpa, dist
+# ========================================================= #
+
+import numpy as np
+import logFunctions as log
+
+
+# ===== Spatial index =====
+class SpatialGrid:
+
+    # Offsets of a cell and its 26 neighbours
+    _neighbours = np.array([[dx, dy, dz] for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)], dtype=np.int64)
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.positions = np.zeros((0, 3))
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+
+    # Hashes (N,3) positions into the grid. cell_size: optional new cell size
+    def build(self, positions, cell_size=None):
+        if cell_size is not None:
+            self.cell_size = float(cell_size)
+        self.positions = np.asarray(positions, dtype=float)[:, 0:3]
+        if len(self.positions) == 0:
+            self.keys = self.order = self.sorted_keys = np.zeros(0, dtype=np.int64)
+            return
+        cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+        # One empty cell of padding on each side, so neighbour keys never wrap onto occupied cells
+        self.origin = cells.min(axis=0) - 1
+        self.dims = cells.max(axis=0) - self.origin + 2
+        self.keys = self._key(cells)
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+
+    def _key(self, cells):
+        c = cells - self.origin
+        return (c[..., 0]*self.dims[1] + c[..., 1])*self.dims[2] + c[..., 2]
+
+    # All pairs (i, j), i < j, closer than radius (radius <= cell_size). Returns (i, j, distance)
+    def queryPairs(self, radius):
+        n = len(self.positions)
+        if n < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        if radius > self.cell_size:
+            raise ValueError("Query radius larger than the grid cell size")
+        cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+        i_all, j_all = [], []
+        for offset in self._neighbours:
+            key = self._key(cells + offset)
+            left = np.searchsorted(self.sorted_keys, key, side="left")
+            counts = np.searchsorted(self.sorted_keys, key, side="right") - left
+            total = counts.sum()
+            if total == 0:
+                continue
+            i = np.repeat(np.arange(n), counts)
+            within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = self.order[np.repeat(left, counts) + within]
+            keep = i < j
+            i_all.append(i[keep])
+            j_all.append(j[keep])
+        i = np.concatenate(i_all) if i_all else np.zeros(0, dtype=np.int64)
+        j = np.concatenate(j_all) if j_all else np.zeros(0, dtype=np.int64)
+        dist = np.linalg.norm(self.positions[j] - self.positions[i], axis=1)
+        close = dist < radius
+        return i[close], j[close], dist[close]
+
+    # Indices of the positions closer than radius to point
+    def queryRadius(self, point, radius):
+        if len(self.positions) == 0:
+            return np.zeros(0, dtype=np.int64)
+        point = np.asarray(point, dtype=float)[0:3]
+        lo = np.floor((point - radius) / self.cell_size).astype(np.int64)
+        hi = np.floor((point + radius) / self.cell_size).astype(np.int64)
+        lo = np.maximum(lo, self.origin)
+        hi = np.minimum(hi, self.origin + self.dims - 1)
+        if np.any(hi < lo):
+            return np.zeros(0, dtype=np.int64)
+        grid = np.stack(np.meshgrid(*[np.arange(l, h+1) for l, h in zip(lo, hi)], indexing="ij"), axis=-1).reshape(-1, 3)
+        key = self._key(grid)
+        left = np.searchsorted(self.sorted_keys, key, side="left")
+        right = np.searchsorted(self.sorted_keys, key, side="right")
+        candidates = np.concatenate([self.order[l:r] for l, r in zip(left, right)])
+        if len(candidates) == 0:
+            return candidates
+        dist = np.linalg.norm(self.positions[candidates] - point, axis=1)
+        return np.sort(candidates[dist < radius])
+
+
+# ===== Closest approach =====
+# Time (s) in [0, horizon] and distance (m) of closest approach of pairs moving at constant velocity
+# p_i, p_j, v_i, v_j: (K,3)
+def closestApproach(p_i, p_j, v_i, v_j, horizon):
+    dp = p_j - p_i
+    dv = v_j - v_i
+    dv2 = np.einsum("ij,ij->i", dv, dv)
+    t = np.where(dv2 > 1e-12, -np.einsum("ij,ij->i", dp, dv) / np.maximum(dv2, 1e-12), 0.0)
+    t = np.clip(t, 0.0, horizon)
+    d = np.linalg.norm(dp + dv*t[:, np.newaxis], axis=1)
+    return t, d
+
+
+# ===== Separation monitor =====
+class SeparationMonitor:
+
+    # ===== Constructor =====
+    # min_separation: m, pairs predicted closer than this are conflicts
+    # horizon: s, prediction horizon of the closest approach
+    # max_speed: m/s, bound of the estimated UAV speeds. The search radius is
+    #            min_separation + 2*(fastest estimated speed, at most max_speed)*horizon
+    # priority: one value per UAV, the lower value keeps going (default: order of uavs)
+    def __init__(self, uavs, min_separation=3.0, horizon=3.0, max_speed=10.0, priority=None):
+        self.uavs = list(uavs)
+        n = len(self.uavs)
+        self.min_separation = min_separation
+        self.horizon = horizon
+        self.max_speed = max_speed
+        self.priority = np.arange(n) if priority is None else np.asarray(priority)
+        self.positions = np.zeros((n, 3))
+        self.velocities = np.zeros((n, 3))
+        self.grid = SpatialGrid(self.getSearchRadius())
+        self.last_time = None
+        self.held = np.zeros(n, dtype=bool)
+        self.conflicts = self._emptyConflicts()
+        self.active_pairs = set()
+
+    def getSearchRadius(self):
+        speeds = np.linalg.norm(self.velocities, axis=1)
+        fastest = min(float(speeds.max()), self.max_speed) if len(speeds) else 0.0
+        return self.min_separation + 2*fastest*self.horizon
+
+    @staticmethod
+    def _emptyConflicts():
+        return {"i": np.zeros(0, dtype=np.int64), "j": np.zeros(0, dtype=np.int64),
+                "t_cpa": np.zeros(0), "d_cpa": np.zeros(0), "dist": np.zeros(0)}
+
+    # Conflicts of the last update: dict of arrays, one entry per conflicting pair (i < j, UAV slots)
+    def getConflicts(self):
+        return self.conflicts
+
+    # Boolean mask of the UAVs to hold (lower priority side of a conflict)
+    def getHeld(self):
+        return self.held
+
+    # Rebuilds the index from (N,3) world positions at time t (s) and finds the conflicts
+    def update(self, positions=None, t=None):
+        if positions is None:
+            positions = [uav.getCurrWorldPose()[0:3] for uav in self.uavs]
+        positions = np.asarray(positions, dtype=float)[:, 0:3]
+        if t is not None and self.last_time is not None and t > self.last_time:
+            self.velocities = (positions - self.positions) / (t - self.last_time)
+        self.positions = positions.copy()
+        self.last_time = t
+
+        radius = self.getSearchRadius()
+        self.grid.build(positions, radius)
+        i, j, dist = self.grid.queryPairs(radius)
+        t_cpa, d_cpa = closestApproach(positions[i], positions[j], self.velocities[i], self.velocities[j], self.horizon)
+        # Closing pairs only: t_cpa = 0 means already moving apart (or both still)
+        conflict = (d_cpa < self.min_separation) & (t_cpa > 0)
+        self.conflicts = {"i": i[conflict], "j": j[conflict], "t_cpa": t_cpa[conflict],
+                          "d_cpa": d_cpa[conflict], "dist": dist[conflict]}
+
+        i, j = self.conflicts["i"], self.conflicts["j"]
+        yielding = np.where(self.priority[i] <= self.priority[j], j, i)
+        self.held[:] = False
+        self.held[yielding] = True
+        self._logNewConflicts()
+        return self.conflicts
+
+    def _logNewConflicts(self):
+        pairs = set(zip(self.conflicts["i"].tolist(), self.conflicts["j"].tolist()))
+        for k, (i, j) in enumerate(zip(self.conflicts["i"].tolist(), self.conflicts["j"].tolist())):
+            if (i, j) not in self.active_pairs:
+                log.logReport("WARNING", "Separation conflict {} - {}: {:.1f} m in {:.1f} s".format(
+                    self.uavs[i].getName(), self.uavs[j].getName(), self.conflicts["d_cpa"][k], self.conflicts["t_cpa"][k]))
+        self.active_pairs = pairs
@@ -3,7 +3,8 @@
 # Cranfield University - DARTeC                  
 # ========================================================= #
 import logFunctions as log
-from datetime import datetime
+import FleetState
+from LegTable import LegTable
 import numpy as np
 import math
 
@@ -41,8 +42,12 @@ class UAV:
         self.has_collided = False # flag of whethre the UAV has colided with anything
         self.destination = [0, 0, 0]  # World frame landing location
         self.curr_cmd = "" # takeoff, hover, rotateToYaw, land, moveToZ, moveToPosition, goHome ...
-        self.curr_cmd_start_time = datetime.now()
+        self.curr_cmd_start_time = 0.0 # s, AirsimIO.simTime when the current command was sent
         self.target_yaw = init_pose[-1] # World frame, target yaw angle for rotate cmd
+        self.fleet_state = None # FleetState this UAV is attached to (see attachFleetState)
+        self.fleet_slot = -1    # Row of this UAV in the fleet state arrays
+        self.leg_table = None   # Compiled route (see getLegTable), None: to be compiled
+        self.kp_vel = None      # Speed gain of the leg table, None: LegTable.Kp_vel
         print(name + " is created")
         log.logReport("INFO", name + " is created")
 
@@ -64,21 +69,31 @@ class UAV:
 
     # UAV initial pose
     def setInitPose(self, init_pose):
-        self.init_pose = init_pose
+        if self.fleet_state is not None:
+            self.init_pose[:] = init_pose
+        else:
+            self.init_pose = init_pose
+        self.leg_table = None
 
     def getInitPose(self):
         return self.init_pose
 
     # UAV current pose
     def setCurrPose(self, curr_pose):
-        self.curr_pose = curr_pose
+        if self.fleet_state is not None:
+            self.curr_pose[:] = curr_pose
+        else:
+            self.curr_pose = curr_pose
 
     def getCurrPose(self):
         return self.curr_pose
 
     # UAV current world pose
     def setCurrWorldPose(self, curr_world_pose):
-        self.curr_world_pose = curr_world_pose
+        if self.fleet_state is not None:
+            self.curr_world_pose[:] = curr_world_pose
+        else:
+            self.curr_world_pose = curr_world_pose
 
     def getCurrWorldPose(self):
         return self.curr_world_pose
@@ -103,6 +118,9 @@ class UAV:
     # UAV waypoints
     def setWaypoints(self, waypoints):
         self.waypoints = waypoints
+        self.leg_table = None
+        if self.fleet_state is not None:
+            self.fleet_state.markWaypointsDirty()
 
     def getWaypoints(self):
         return self.waypoints
@@ -112,11 +130,16 @@ class UAV:
             self.waypoints.insert(pos, waypoint)
         else:
             self.waypoints.append(waypoint)
+        self.leg_table = None
+        if self.fleet_state is not None:
+            self.fleet_state.markWaypointsDirty()
     # Remove waypoint?
     
     # UAV waypoint index
     def setWaypointIndex(self, waypoint_index):
         self.waypoint_index = waypoint_index
+        if self.fleet_state is not None:
+            self.fleet_state.waypoint_index[self.fleet_slot] = waypoint_index
 
     def getWaypointIndex(self):
         return self.waypoint_index
@@ -124,9 +147,28 @@ class UAV:
     # UAV task points indices
     def setTaskPointsIndices(self, task_points_indices):
         self.task_points_indices = task_points_indices
+        self.leg_table = None
 
     def getTaskPointsIndices(self):
         return self.task_points_indices
+
+    def isTaskPoint(self, waypoint_index):
+        return self.getLegTable().isTaskPoint(waypoint_index)
+
+    # Leg table of the route (see LegTable.py), compiled on first use after the waypoints,
+    # task points or initial pose change
+    def getLegTable(self):
+        if self.leg_table is None:
+            self.leg_table = LegTable(self.waypoints, self.init_pose, self.task_points_indices, self.kp_vel)
+        return self.leg_table
+
+    # UAV speed gain (P control on the leg length, see LegTable.py), None: LegTable.Kp_vel
+    def setKpVel(self, kp_vel):
+        self.kp_vel = kp_vel
+        self.leg_table = None
+
+    def getKpVel(self):
+        return self.kp_vel
     
     # UAV waypoints color
     def setWaypointColor(self, waypoint_color_rgba):
@@ -145,6 +187,8 @@ class UAV:
     # UAV collision
     def setCollision(self, has_collided):
         self.has_collided = has_collided
+        if self.fleet_state is not None:
+            self.fleet_state.collision[self.fleet_slot] = has_collided
 
     def getCollision(self):
         return self.has_collided
@@ -173,13 +217,15 @@ class UAV:
     # Current Command
     def setCurrentCommand(self, cmd):
         self.curr_cmd = cmd
+        if self.fleet_state is not None:
+            self.fleet_state.command[self.fleet_slot] = FleetState.command_codes.get(cmd, 0)
 
     def getCurrentCommand(self):
         return self.curr_cmd
     
     # Current Command Start Time
-    def setCurrentCommandStartTime(self, datetime):
-        self.curr_cmd_start_time = datetime
+    def setCurrentCommandStartTime(self, start_time):
+        self.curr_cmd_start_time = start_time
 
     def getCurrentCommandStartTime(self):
         return self.curr_cmd_start_time
@@ -187,6 +233,8 @@ class UAV:
     # Target Yaw Angle
     def setTargetYaw(self, yaw):
         self.target_yaw = yaw
+        if self.fleet_state is not None:
+            self.fleet_state.target_yaw[self.fleet_slot] = yaw
 
     def getTargetYaw(self):
         return self.target_yaw
@@ -194,4 +242,28 @@ class UAV:
     def calculateTargetYaw(self):
         target_yaw = np.rad2deg(math.atan2((self.waypoints[self.waypoint_index][1]-self.curr_world_pose[1]),(self.waypoints[self.waypoint_index][0]-self.curr_world_pose[0])))
         return target_yaw
+
+    # Fleet state (structure of arrays, see FleetState.py)
+    # Moves this UAV's pose, target yaw, waypoint index and command into row 'slot' of fleet_state.
+    # Afterwards the pose getters return views into the fleet arrays.
+    def attachFleetState(self, fleet_state, slot):
+        self.fleet_state = fleet_state
+        self.fleet_slot = slot
+        fleet_state.init_pose[slot] = self.init_pose
+        fleet_state.curr_pose[slot] = self.curr_pose
+        fleet_state.curr_world_pose[slot] = self.curr_world_pose
+        self.init_pose = fleet_state.init_pose[slot]
+        self.curr_pose = fleet_state.curr_pose[slot]
+        self.curr_world_pose = fleet_state.curr_world_pose[slot]
+        fleet_state.target_yaw[slot] = self.target_yaw
+        fleet_state.waypoint_index[slot] = self.waypoint_index
+        fleet_state.command[slot] = FleetState.command_codes.get(self.curr_cmd, 0)
+        fleet_state.collision[slot] = self.has_collided
+        fleet_state.markWaypointsDirty()
+
+    def getFleetState(self):
+        return self.fleet_state
+
+    def getFleetSlot(self):
+        return self.fleet_slot
         
\ No newline at end of file
@@ -9,10 +9,25 @@ import UAV
 import logFunctions as log
 import time
 from RepeatedTimer import RepeatedTimer
+from ClientPool import ClientPool, newAirsimClient
+from PlotManager import PlotManager
+from RpcProfiler import RpcProfiler, ProfiledClient
 
 
-# Create airsim client
-client = AirsimIO.initClient()
+# ======== RPC Profiling ========
+# 1: record calls, latency and payload of every RPC (see RpcProfiler.py); 0: plain client, no overhead
+# Set before the first RPC (see enableRpcProfiling). Summary in the log at cleanUpSimulation
+rpc_profiling_en = 0
+rpc_profile_file = "rpc_profile.prom" # .json: JSON snapshot, otherwise Prometheus text
+rpc_profiler = RpcProfiler()
+
+def profileClient(new_client):
+    return ProfiledClient(new_client, rpc_profiler) if rpc_profiling_en else new_client
+
+# Create airsim client. Connects to the simulator on first use, not on import
+client = AirsimIO.LazyClient(lambda: profileClient(AirsimIO.initClient()))
+# Optional pool of extra clients for concurrent status polling (see initClientPool)
+client_pool = None
 
 n_uavs = 5 # number of uavs
 uavs = []
@@ -23,7 +38,7 @@ path_thickness = 2
 
 # ======== Sensor Enablers ========
 # 1: enable; 0: disable
-# camera_en = 0    # Camera needs special settings
+camera_en = 0    # Camera needs special settings (see JsonSettings.py)
 barometer_en = 0
 imu_en = 0
 gps_en = 0
@@ -32,7 +47,8 @@ distance_en = 1
 lidar_en = 0
 
 # Sensor dictionary
-sensors = {"Barometer":[],
+sensors = {"Camera":[],
+           "Barometer":[],
            "Imu":[],
            "Gps":[],
            "Magnetometer":[],
@@ -56,8 +72,12 @@ weather = {"Rain":0,
 
 
 # ======== Repeated Timers ========
-rt_draw_paths = RepeatedTimer(1, AirsimIO.plotAllUAVsPaths, client, uavs, duration=1.01)
+# Paths are redrawn only when waypoints or colours change
+plot_manager = PlotManager(client, waypoint_size, path_thickness)
+rt_draw_paths = RepeatedTimer(1, plot_manager.update, uavs)
 rt_airsim_updates = RepeatedTimer(0.1, AirsimIO.updateUAVsStatus, client, uavs)
+# Periodic RPC profile snapshots, started by enableRpcProfiling
+rt_rpc_profile = RepeatedTimer(10, lambda: exportRpcProfile())
 
 
 # ======== Functions ========
@@ -101,7 +121,10 @@ def createUAVs():
 
 def initUAVs():
     createUAVs()
-    # No camera yet. Camera needs special settings
+    if camera_en:
+        createSensors("Camera")
+        for u in range(n_uavs):
+            uavs[u].addSensor(sensors["Camera"][u])
     if barometer_en:
         createSensors("Barometer")
         for u in range(n_uavs):
@@ -129,9 +152,47 @@ def initUAVs():
     # arm all UAVs
     # AirsimIO.armEnableAllUAVs(client, uavs)
 
+def initClientPool(n_workers=8):
+    # Poll UAV status concurrently, one AirSim client per worker thread.
+    # Recommended for large fleets (10+ UAVs)
+    # Same fake/real choice as client (AirsimIO.initClient): a fake world is in-process and thread safe,
+    # so every worker uses the main client instead of a connection of its own
+    global client_pool
+    if client_pool is None:
+        if AirsimIO.isFakeClient(client):
+            shared_client = client.getClient()
+            client_pool = ClientPool(n_workers, lambda: shared_client)
+        else:
+            client_pool = ClientPool(n_workers, lambda: profileClient(newAirsimClient()))
+    rt_airsim_updates.function = AirsimIO.updateUAVsStatusParallel
+    rt_airsim_updates.args = (client_pool, uavs)
+    return client_pool
+
+def enableRpcProfiling(export_interval=10):
+    # Profiles every client created from now on (call before the first RPC) and writes
+    # a snapshot to rpc_profile_file every export_interval s (None: only at cleanUpSimulation)
+    global rpc_profiling_en
+    rpc_profiling_en = 1
+    if export_interval is not None:
+        rt_rpc_profile.interval = export_interval
+        rt_rpc_profile.start()
+
+def exportRpcProfile(path=None):
+    if rpc_profiling_en:
+        rpc_profiler.export(path or rpc_profile_file)
+
 def cleanUpSimulation():
+    global client_pool
     log.logReport("INFO", "Cleaning Up Simulation")
+    if client_pool is not None:
+        client_pool.close()
+        client_pool = None
     # Cleanup
     AirsimIO.disarmResetDisableAllUAVs(client, uavs)
+    if rpc_profiling_en:
+        rt_rpc_profile.stop()
+        exportRpcProfile()
+        log.logReport("INFO", rpc_profiler.summary())
+        print(rpc_profiler.summary())
     print("\n=========================================\nCleanup:\n=========================================")
     time.sleep(5)
\ No newline at end of file
@@ -1,18 +1,241 @@
 # ========================================================= #
 # Multi-Robot Systems (MRS) Operation Framework
-# Cranfield University - DARTeC                  
+# Cranfield University - DARTeC
+# ========================================================= #
+
+# ========================================================= #
+# Log lines are put on a queue and written by one background
+# thread in batches, so logReport() never opens the file and
+# is safe to call from fleet loops and timer threads.
+# Usage Example
+# log.configure(level="DEBUG", json_format=True, rotate_bytes=10e6)
+# log.logReport("INFO", "All UAVs are armed")
+# log.flush()   # wait until everything queued is on disk
+# If the file cannot be opened or written (bad path, disk
+# full), the writer reports it on stderr and stops; lines are
+# dropped until the next flush/resetLog/configure, which start
+# a new writer and raise the error if it fails again.
 # ========================================================= #
 
 # ===== Import libraries =====
 from datetime import datetime
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+
+# ===== Settings =====
+log_file = "logs.log"
+levels = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+min_level = levels["INFO"]  # Lines below this level are dropped before being queued
+json_lines = False          # False: "time - TYPE - msg", True: one JSON object per line
+max_bytes = 0               # Rotate logs.log before it grows past this size. 0: never rotate
+backup_count = 3            # Number of rotated files kept: logs.log.1 ... logs.log.N
+flush_interval = 0.5        # s, max time a line waits in the queue
+batch_size = 1000           # Max lines per write
+control_timeout = 10.0      # s, max wait of flush/resetLog/configure for the writer
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+_writer_error = None   # OSError that stopped the writer, None: writer running or not started
+_STOP = object()
+
 
 # ===== Log Report Functions =====
 def logReport(type,msg):
-    f = open("logs.log","a")
-    f.write(str(datetime.now())+" - "+type+" - "+msg+"\n")
-    f.close()
-    
+    # Unknown types (custom tags) are treated as INFO
+    if levels.get(type, 20) < min_level or _writer_error is not None:
+        return
+    _queue.put((datetime.now(), type, msg))
+    if _writer is None:
+        _startWriter()
+
+
+# Cheap check for callers that build expensive messages, e.g.
+# if log.isEnabled("DEBUG"): log.logReport("DEBUG", str(big_object))
+def isEnabled(type):
+    return levels.get(type, 20) >= min_level
+
+
 def resetLog():
-    f = open("logs.log","w")
-    f.write('')
-    f.close()
\ No newline at end of file
+    # Anything queued before the reset is written first, then the file is emptied
+    _control("reset")
+
+
+# Blocks until every line queued so far has been written to the file
+def flush():
+    _control("flush")
+
+
+def setLevel(level):
+    global min_level
+    min_level = levels[level] if isinstance(level, str) else int(level)
+
+
+# Changes settings; only the given arguments are changed
+# json_format -> json_lines, rotate_bytes -> max_bytes, backups -> backup_count, interval -> flush_interval
+def configure(file=None, level=None, json_format=None, rotate_bytes=None, backups=None, interval=None):
+    global log_file, json_lines, max_bytes, backup_count, flush_interval
+    if level is not None:
+        setLevel(level)
+    if json_format is not None:
+        json_lines = json_format
+    if rotate_bytes is not None:
+        max_bytes = int(rotate_bytes)
+    if backups is not None:
+        backup_count = int(backups)
+    if interval is not None:
+        flush_interval = interval
+    if file is not None and file != log_file:
+        if _writer_error is None:
+            flush()
+        log_file = file
+        _control("reopen")
+
+
+# Writes pending lines and stops the writer thread (also called at exit)
+def shutdown():
+    global _writer
+    with _writer_lock:
+        writer = _writer
+        _writer = None
+    if writer is not None:
+        _queue.put(_STOP)
+        writer.join()
+
+
+# ===== Writer thread =====
+def _startWriter():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writerLoop, name="LogWriter", daemon=True)
+            _writer.start()
+
+
+# Sends a command to the writer thread and waits until it is done
+# Raises the OSError that stopped the writer, TimeoutError if it does not answer within control_timeout
+def _control(command):
+    global _writer_error
+    _writer_error = None
+    done = threading.Event()
+    _queue.put((command, done))
+    _startWriter()
+    if not done.wait(control_timeout):
+        raise TimeoutError("Log writer did not answer '" + command + "' within " + str(control_timeout) + " s")
+    if _writer_error is not None:
+        raise _writer_error
+
+
+def _formatLine(item):
+    time_stamp, type, msg = item
+    if json_lines:
+        return json.dumps({"time": str(time_stamp), "type": type, "msg": msg}) + "\n"
+    return str(time_stamp)+" - "+type+" - "+msg+"\n"
+
+
+def _rotate(f):
+    f.close()
+    for i in range(backup_count-1, 0, -1):
+        if os.path.exists(log_file+"."+str(i)):
+            os.replace(log_file+"."+str(i), log_file+"."+str(i+1))
+    if backup_count > 0:
+        os.replace(log_file, log_file+".1")
+    else:
+        os.remove(log_file)
+    return open(log_file, "a")
+
+
+# Writes lines to f, rotating before a line would take the file past max_bytes
+# (a single line longer than max_bytes gets a file of its own). Returns the file now open
+def _writeLines(f, lines):
+    if max_bytes <= 0:
+        f.write("".join(lines))
+        return f
+    size = f.tell()
+    chunk = []
+    for line in lines:
+        n = len(line.encode("utf-8"))
+        if size > 0 and size + n > max_bytes:
+            f.write("".join(chunk))
+            chunk = []
+            f = _rotate(f)
+            size = 0
+        chunk.append(line)
+        size += n
+    f.write("".join(chunk))
+    return f
+
+
+# Runs the writer; on a file error, drops what is queued, releases the waiting callers and stops
+def _writerLoop():
+    global _writer, _writer_error
+    batch = []   # Items taken from the queue and not processed yet
+    try:
+        _writeQueue(batch)
+    except OSError as error:
+        _writer_error = error
+        sys.stderr.write("Log writer stopped, lines are dropped: " + str(error) + "\n")
+        # Detached first: a command queued from now on is either drained below or finds no writer and starts one
+        with _writer_lock:
+            if _writer is threading.current_thread():
+                _writer = None
+        while True:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in batch:
+            if item is not _STOP and len(item) == 2:
+                item[1].set()
+
+
+# batch: filled with the items being processed, so that a failed batch can be released
+def _writeQueue(batch):
+    f = open(log_file, "a")
+    try:
+        running = True
+        while running:
+            try:
+                items = [_queue.get(timeout=flush_interval)]
+            except queue.Empty:
+                continue
+            # Drain whatever else is waiting, up to batch_size lines
+            while len(items) < batch_size:
+                try:
+                    items.append(_queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch[:] = items
+            lines = []
+            for item in items:
+                if item is _STOP:
+                    running = False
+                elif len(item) == 2:
+                    # Control command: write what came before it first
+                    if lines:
+                        f = _writeLines(f, lines)
+                        lines = []
+                    command, done = item
+                    f.flush()
+                    if command == "reset":
+                        f.close()
+                        f = open(log_file, "w")
+                    elif command == "reopen":
+                        f.close()
+                        f = open(log_file, "a")
+                    done.set()
+                else:
+                    lines.append(_formatLine(item))
+            if lines:
+                f = _writeLines(f, lines)
+            f.flush()
+            batch.clear()
+    finally:
+        f.close()
+
+
+atexit.register(shutdown)